@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,13 +28,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware
+    'rooms.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'rooms.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Needs request.user; removes itself unless PROFILING_ENABLED
+    'rooms.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,19 +65,175 @@ WSGI_APPLICATION = 'roombook.wsgi.application'
 
 import dj_database_url
 
+# Connection management
+# DB_CONN_MAX_AGE: seconds to keep a connection open between requests (0 closes after each request)
+# DB_POOL_MAX_SIZE: use psycopg 3's connection pool with this many connections (Postgres only;
+#   replaces persistent connections)
+# DB_STATEMENT_TIMEOUT_MS: abort queries running longer than this (Postgres only, 0 disables)
+# DB_SQLITE_TIMEOUT: seconds SQLite waits for a write lock before raising "database is locked"
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '0'))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '15000'))
+DB_SQLITE_TIMEOUT = int(os.environ.get('DB_SQLITE_TIMEOUT', '20'))
+
 # Use PostgreSQL if DATABASE_URL is available (Render), otherwise SQLite (local)
 if os.environ.get('DATABASE_URL'):
     DATABASES = {
-        'default': dj_database_url.parse(os.environ.get('DATABASE_URL'))
+        'default': dj_database_url.parse(
+            os.environ.get('DATABASE_URL'),
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=True,
+        )
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+_db = DATABASES['default']
+_db.setdefault('OPTIONS', {})
+if 'postgresql' in _db['ENGINE']:
+    if DB_STATEMENT_TIMEOUT_MS:
+        _db['OPTIONS']['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
+    if DB_POOL_MAX_SIZE:
+        # Django's built-in pool needs psycopg 3 and cannot be combined with CONN_MAX_AGE
+        _db['CONN_MAX_AGE'] = 0
+        _db['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+elif 'sqlite' in _db['ENGINE']:
+    _db['OPTIONS']['timeout'] = DB_SQLITE_TIMEOUT
+
+# Caching
+# CACHE_BACKEND selects the store: 'locmem' (per process, default), 'file' (shared by all
+# workers on one host, under CACHE_LOCATION), 'db' (shared table, run `manage.py createcachetable`)
+# or 'dummy' (disabled). Each feature gets its own namespace with its own default timeout.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache' / 'django'))
+CACHE_NAMESPACES = {
+    'default': 300,
+    'catalogue': 300,
+    'recommendations': 60 * 60,
+    'chatbot': 10 * 60,
+    'sessions': 14 * 24 * 60 * 60,
+}
+
+_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _cache_config(namespace, timeout):
+    if CACHE_BACKEND == 'file':
+        location = os.path.join(CACHE_LOCATION, namespace)
+    elif CACHE_BACKEND == 'db':
+        location = 'roombook_cache'
+    else:
+        location = namespace
+    return {
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': location,
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': namespace,
+    }
+
+
+CACHES = {namespace: _cache_config(namespace, timeout) for namespace, timeout in CACHE_NAMESPACES.items()}
+
+# Public catalogue responses (/api/rooms/) carry an ETag built from a version counter.
+# Workers re-read the counter at most every CATALOGUE_VERSION_TTL seconds. Browsers
+# and proxies revalidate (and get a cheap 304) unless CATALOGUE_MAX_AGE allows them
+# to reuse a response without asking; owners would then see their edits late.
+CATALOGUE_VERSION_TTL = int(os.environ.get('CATALOGUE_VERSION_TTL', '5'))
+CATALOGUE_MAX_AGE = int(os.environ.get('CATALOGUE_MAX_AGE', '0'))
+
+# Response compression (rooms.middleware.CompressionMiddleware). Brotli is used when the
+# optional brotli package is installed, gzip otherwise. Pages that vary on Cookie (session or
+# CSRF token) always get gzip, whose random padding mitigates BREACH.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '860'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_CONTENT_TYPES = (
+    'text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript', 'application/json',
+)
+
+# Request instrumentation (rooms.middleware.RequestMetricsMiddleware)
+# SERVER_TIMING: send a Server-Timing header (db, cache and third-party call timings);
+#   it exposes internals, so it is off in production unless asked for
+# SLOW_REQUEST_MS: requests at least this slow are logged with their SQL to rooms.slow_requests,
+#   SLOW_REQUEST_SAMPLE_RATE of them (0-1), with at most SLOW_REQUEST_MAX_QUERIES statements
+# SLOW_REQUEST_LOG: file for the slow-request log (stderr when empty)
+# REQUEST_LOG_LEVEL: 'INFO' logs one JSON line per request to rooms.requests, 'WARNING' silences it
+TESTING = sys.argv[1:2] == ['test']
+SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)).lower() == 'true'
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+SLOW_REQUEST_SAMPLE_RATE = float(os.environ.get('SLOW_REQUEST_SAMPLE_RATE', '1'))
+SLOW_REQUEST_MAX_QUERIES = int(os.environ.get('SLOW_REQUEST_MAX_QUERIES', '200'))
+SLOW_REQUEST_LOG = os.environ.get('SLOW_REQUEST_LOG', '')
+REQUEST_LOG_LEVEL = os.environ.get('REQUEST_LOG_LEVEL', 'WARNING' if TESTING else 'INFO')
+
+# Prometheus metrics at /metrics (rooms.metrics)
+# METRICS_TOKEN: bearer token the scraper sends; without one only superusers can read them
+# METRICS_DIR: directory where each worker process writes its samples so /metrics reports
+#   all gunicorn workers, not just the one answering; empty it before the server starts.
+#   Without it every process reports only itself.
+# METRICS_FLUSH_INTERVAL: seconds between a worker's writes to METRICS_DIR
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '1'))
+
+# On-demand request profiling for staff (rooms.middleware.ProfilingMiddleware)
+# PROFILING_ENABLED: off removes the middleware entirely; tokens come from `manage.py profiling_token`
+# PROFILING_RATE_LIMIT: profiles allowed per PROFILING_RATE_WINDOW seconds, across all workers
+#   (counted in the database)
+# PROFILING_DIR / PROFILING_MAX_PROFILES: where profiles are kept, and how many
+# PROFILING_SAMPLE_INTERVAL: seconds between stack samples of the sampling profiler
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_TOKEN_MAX_AGE = int(os.environ.get('PROFILING_TOKEN_MAX_AGE', '3600'))
+PROFILING_RATE_LIMIT = int(os.environ.get('PROFILING_RATE_LIMIT', '20'))
+PROFILING_RATE_WINDOW = int(os.environ.get('PROFILING_RATE_WINDOW', '600'))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', str(BASE_DIR / 'cache' / 'profiles'))
+PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', '100'))
+PROFILING_SAMPLE_INTERVAL = float(os.environ.get('PROFILING_SAMPLE_INTERVAL', '0.001'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+        'slow_requests': {
+            'class': 'logging.FileHandler', 'filename': SLOW_REQUEST_LOG, 'formatter': 'plain',
+        } if SLOW_REQUEST_LOG else {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'rooms': {'handlers': ['console'], 'level': os.environ.get('LOG_LEVEL', 'INFO')},
+        'rooms.requests': {'handlers': ['console'], 'level': REQUEST_LOG_LEVEL, 'propagate': False},
+        'rooms.slow_requests': {'handlers': ['slow_requests'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Sessions are read through the cache once it is shared between workers. With the
+# per-process locmem cache a logout in one worker would not reach the others.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if CACHE_BACKEND in ('file', 'db') else 'django.contrib.sessions.backends.db'
+)
+SESSION_CACHE_ALIAS = 'sessions'
+# Upper bound on how long another worker may serve an outdated /api/user/ snapshot
+USER_CONTEXT_CACHE_TIMEOUT = int(os.environ.get('USER_CONTEXT_CACHE_TIMEOUT', '300'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -100,7 +262,8 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STORAGES = {
     'default': {
-        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        # Uploads are named by content hash so their URLs can be cached as immutable
+        'BACKEND': 'rooms.storage.HashedMediaStorage',
     },
     'staticfiles': {
         'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
@@ -109,6 +272,9 @@ STORAGES = {
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Media directories served publicly under MEDIA_URL; everything else (invoices)
+# is only reachable through the permission-checked download views
+PUBLIC_MEDIA_PREFIXES = ['room_images/']
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -134,6 +300,42 @@ GOOGLE_OAUTH2_SCOPES = [
     'https://www.googleapis.com/auth/userinfo.profile'
 ]
 
+# View warm-up at WSGI start: 'none' imports each view module on first hit (smallest
+# workers), 'views' imports all view modules, 'all' also loads the ML/LLM/PDF stacks
+PRELOAD_VIEWS = os.environ.get('PRELOAD_VIEWS', 'none')
+
+# Invoice PDF rendering: number of background worker processes (0 renders inline)
+INVOICE_PDF_WORKERS = int(os.environ.get('INVOICE_PDF_WORKERS', '2'))
+
+# Batches of booking emails (bulk approve/reject): worker processes (0 sends inline)
+EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', '1'))
+
+# Room photo variants (thumb/card/full): worker processes (0 renders inline), how often
+# a failing image is retried, and the encodings produced, best first; formats Pillow
+# cannot write are skipped
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '1'))
+IMAGE_VARIANT_MAX_ATTEMPTS = int(os.environ.get('IMAGE_VARIANT_MAX_ATTEMPTS', '3'))
+IMAGE_VARIANT_FORMATS = [
+    fmt.strip().lower() for fmt in os.environ.get('IMAGE_VARIANT_FORMATS', 'avif,webp,jpeg').split(',') if fmt.strip()
+]
+
+# Invoice and payment numbers are reserved from the database in blocks of this size per worker
+SEQUENCE_BLOCK_SIZE = int(os.environ.get('SEQUENCE_BLOCK_SIZE', '50'))
+
+# Answer month-aligned availability searches from the per-room monthly occupancy
+# bitmap instead of scanning bookings. Bookings only keep it up to date while this
+# is on, so run `manage.py rebuild_occupancy` when turning it on
+AVAILABILITY_BITMAP = os.environ.get('AVAILABILITY_BITMAP', 'False').lower() == 'true'
+
+# Protected file downloads: '' streams from Django, 'nginx' uses X-Accel-Redirect
+# (SENDFILE_URL must map to an internal location aliasing MEDIA_ROOT), 'apache' uses X-Sendfile
+SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND', '')
+SENDFILE_URL = os.environ.get('SENDFILE_URL', '/protected-media/')
+
+# Rendered rental agreement PDFs, cached by content hash with LRU eviction
+AGREEMENT_CACHE_DIR = os.environ.get('AGREEMENT_CACHE_DIR', str(BASE_DIR / 'cache' / 'agreements'))
+AGREEMENT_CACHE_MAX_BYTES = int(os.environ.get('AGREEMENT_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
 # Razorpay Configuration
 RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', '')
 RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', '')
@@ -148,3 +350,10 @@ CORS_ALLOWED_ORIGINS = [
     "https://*.onrender.com",
     "https://ai-powered-asp-room-rental-system-7.onrender.com"
 ]
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rooms.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
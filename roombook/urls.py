@@ -1,12 +1,13 @@
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+from rooms.routing import lazy
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('rooms.urls')),
+    # Public room photos; content-hashed names are served as immutable
+    re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$", lazy('rooms.views.catalogue.serve_media'),
+            name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'roombook.settings')
 
 application = get_wsgi_application()
+
+# Optionally import the view modules now (e.g. under gunicorn --preload) instead of on first hit
+from rooms.routing import preload  # noqa: E402
+
+preload()
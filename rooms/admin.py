@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Room, Booking, UserProfile, Notification, Invoice, Payment
+from .models import Room, Booking, BookingTransition, UserProfile, Notification, Invoice, Payment
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
@@ -49,3 +49,15 @@ class PaymentAdmin(admin.ModelAdmin):
     list_filter = ['payment_method', 'status', 'payment_date', 'created_at']
     search_fields = ['transaction_id', 'invoice__invoice_number']
     readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(BookingTransition)
+class BookingTransitionAdmin(admin.ModelAdmin):
+    list_display = ['booking', 'from_status', 'to_status', 'actor', 'created_at']
+    list_filter = ['to_status', 'created_at']
+    search_fields = ['booking__room__title', 'actor__username']
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
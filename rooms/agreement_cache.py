@@ -0,0 +1,86 @@
+import glob
+import hashlib
+import os
+import tempfile
+from django.conf import settings
+from .metrics import PDF_RENDER
+
+
+def _cache_dir():
+    path = str(settings.AGREEMENT_CACHE_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def agreement_key(agreement_text, title):
+    """Content hash of everything that ends up in the PDF"""
+    digest = hashlib.sha256()
+    digest.update(title.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(agreement_text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _entry_path(key, booking_id=None):
+    # Booking agreements are tagged with the booking id so they can be invalidated
+    prefix = f"b{booking_id}" if booking_id else 'custom'
+    return os.path.join(_cache_dir(), f"{prefix}-{key}.pdf")
+
+
+def get_or_create_agreement_pdf(agreement_text, title, build, booking_id=None):
+    """Return the path of the cached PDF, building it with build(text, title) on a miss"""
+    path = _entry_path(agreement_key(agreement_text, title), booking_id)
+    if os.path.exists(path):
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+
+    with PDF_RENDER.time(document='agreement'):
+        pdf_bytes = build(agreement_text, title)
+    # Write to a temp file and rename so concurrent readers never see a partial PDF
+    fd, tmp_path = tempfile.mkstemp(dir=_cache_dir(), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+
+    evict()
+    return path
+
+
+def evict(max_bytes=None):
+    """Drop least recently used entries until the cache fits in AGREEMENT_CACHE_MAX_BYTES"""
+    if max_bytes is None:
+        max_bytes = settings.AGREEMENT_CACHE_MAX_BYTES
+
+    entries = []
+    total = 0
+    for path in glob.glob(os.path.join(_cache_dir(), '*.pdf')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def invalidate_bookings(booking_ids):
+    """Remove every cached agreement generated for the given bookings"""
+    for booking_id in booking_ids:
+        for path in glob.glob(os.path.join(_cache_dir(), f"b{booking_id}-*.pdf")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,10 +1,14 @@
 import json
+import logging
 import os
 from django.conf import settings
 from openai import OpenAI
+from .instrumentation import external_call
 from .models import Room, Booking
 from .ml_models import PriceRecommendationSystem
 
+logger = logging.getLogger(__name__)
+
 class AINegotiationAssistant:
     """AI-powered rent negotiation assistant that acts as a smart mediator"""
     
@@ -20,7 +24,7 @@ class AINegotiationAssistant:
             if api_key:
                 self.client = OpenAI(api_key=api_key)
         except Exception as e:
-            print(f"OpenAI setup failed: {e}")
+            logger.warning("OpenAI setup failed: %s", e)
     
     def get_market_price(self, room_id):
         """Get market price for the room using ML prediction"""
@@ -91,13 +95,13 @@ class AINegotiationAssistant:
                     response = self._generate_openai_response(analysis, negotiation_tone)
                     return response
                 except Exception as e:
-                    print(f"OpenAI error: {e}")
+                    logger.warning("OpenAI error: %s", e)
             
             # Fallback to rule-based response
             return self._generate_fallback_response(analysis)
             
         except Exception as e:
-            print(f"Negotiation error: {e}")
+            logger.exception("Negotiation error: %s", e)
             return "I encountered an error while analyzing the negotiation. Please try again."
     
     def _generate_openai_response(self, analysis, tone):
@@ -123,15 +127,16 @@ Provide a response that:
 Keep the response concise but comprehensive (2-3 sentences).
 """
         
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional rent negotiation mediator helping both parties reach a fair agreement."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.7
-        )
+        with external_call('openai'):
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a professional rent negotiation mediator helping both parties reach a fair agreement."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=200,
+                temperature=0.7
+            )
         
         return response.choices[0].message.content.strip()
     
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from .models import Booking, RoomOccupancy
+
+
+def parse_period(available_from, available_to, months=None):
+    """Parse a YYYY-MM-DD period, ending either at available_to or after a number of months.
+
+    Without either end the period is the single day available_from. Returns None
+    when no period was asked for and raises ValueError on bad input.
+    """
+    if not available_from and not available_to:
+        return None
+    if not available_from:
+        raise ValueError('available_from is required with available_to')
+    start = datetime.strptime(available_from, '%Y-%m-%d').date()
+    if available_to:
+        end = datetime.strptime(available_to, '%Y-%m-%d').date()
+    elif months:
+        months = int(months)
+        if months < 1 or months > 24:
+            raise ValueError('months must be between 1 and 24')
+        end = start + relativedelta(months=months)
+    else:
+        end = start + timedelta(days=1)
+    if end <= start:
+        raise ValueError('available_to must be after available_from')
+    return start, end
+
+
+def overlapping_bookings(start, end):
+    """Approved bookings sharing at least one day with [start, end).
+
+    A booking ends on the day the next one may start, matching how end_date is
+    computed from start_date and the number of months.
+    """
+    return Booking.objects.filter(status='approved', start_date__lt=end, end_date__gt=start)
+
+
+def available_rooms(rooms, start, end):
+    """Narrow a Room queryset to rooms with no approved booking in [start, end)"""
+    if settings.AVAILABILITY_BITMAP and is_month_aligned(start, end):
+        for year, mask in month_masks(start, end).items():
+            busy = RoomOccupancy.objects.filter(room_id=OuterRef('pk'), year=year).annotate(
+                hit=F('months').bitand(mask)
+            ).exclude(hit=0)
+            rooms = rooms.filter(~Exists(busy))
+        return rooms
+    busy = overlapping_bookings(start, end).filter(room_id=OuterRef('pk'))
+    return rooms.filter(~Exists(busy))
+
+
+def is_available(room_id, start, end, exclude_booking_id=None):
+    bookings = overlapping_bookings(start, end).filter(room_id=room_id)
+    if exclude_booking_id:
+        bookings = bookings.exclude(id=exclude_booking_id)
+    return not bookings.exists()
+
+
+def booked_periods(room_id, start, end):
+    """Approved periods of one room that intersect [start, end), in date order"""
+    return list(overlapping_bookings(start, end)
+                .filter(room_id=room_id)
+                .order_by('start_date')
+                .values('start_date', 'end_date'))
+
+
+# Monthly occupancy bitmap. For periods that start and end on the first of a
+# month, a room is free exactly when none of the period's month bits are set,
+# so the check is a bitwise AND per year instead of a scan over bookings.
+
+def is_month_aligned(start, end):
+    return start.day == 1 and end.day == 1
+
+
+def month_masks(start, end):
+    """{year: bitmask} of every month touched by [start, end)"""
+    masks = defaultdict(int)
+    month = date(start.year, start.month, 1)
+    while month < end:
+        masks[month.year] |= 1 << (month.month - 1)
+        month += relativedelta(months=1)
+    return dict(masks)
+
+
+def rebuild_occupancy(room_id):
+    """Recompute a room's bitmap rows from its approved bookings"""
+    masks = defaultdict(int)
+    for start, end in Booking.objects.filter(room_id=room_id, status='approved').values_list('start_date', 'end_date'):
+        for year, mask in month_masks(start, end).items():
+            masks[year] |= mask
+    with transaction.atomic():
+        RoomOccupancy.objects.filter(room_id=room_id).delete()
+        RoomOccupancy.objects.bulk_create([
+            RoomOccupancy(room_id=room_id, year=year, months=mask) for year, mask in masks.items()
+        ])
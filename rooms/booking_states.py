@@ -0,0 +1,167 @@
+from django.db import transaction, IntegrityError
+from django.db.models.signals import post_save
+from .metrics import NOTIFICATIONS
+from .availability import is_available, overlapping_bookings
+from .models import Room, Booking, BookingTransition, Notification
+from .notifications import _send_booking_notification_email, enqueue_booking_emails
+
+# Every status a booking can move to from each status. Anything not listed is final.
+TRANSITIONS = {
+    'pending': {'approved', 'rejected', 'cancelled'},
+}
+
+
+class TransitionError(Exception):
+    """A booking could not change status; code is 'invalid' or 'conflict'"""
+
+    def __init__(self, message, code='invalid'):
+        super().__init__(message)
+        self.code = code
+
+
+def _notification(booking, to_status, actor):
+    if to_status == 'cancelled':
+        return Notification(
+            user_id=booking.owner_id,
+            title='Booking cancelled',
+            message=f"{actor.username} cancelled their booking for '{booking.room.title}'.",
+            link='/owner/bookings/'
+        )
+    return Notification(
+        user_id=booking.user_id,
+        title=f'Booking {to_status}',
+        message=f"Your booking for '{booking.room.title}' has been {to_status}.",
+        link='/my-bookings/'
+    )
+
+
+def transition(booking, to_status, actor):
+    """Move a booking to to_status, or raise TransitionError.
+
+    The status is changed with a conditional UPDATE on the status the booking
+    was read with, so of two concurrent requests only one can win. The log
+    entry and notification are written in the same transaction and the email
+    is only sent once it commits.
+    """
+    from_status = booking.status
+    if to_status not in TRANSITIONS.get(from_status, ()):
+        raise TransitionError(f'Cannot change a booking that is already {from_status}')
+
+    try:
+        with transaction.atomic():
+            if to_status == 'approved':
+                # Serialize approvals per room so the overlap check cannot race
+                Room.objects.select_for_update().filter(id=booking.room_id).first()
+                if not is_available(booking.room_id, booking.start_date, booking.end_date,
+                                    exclude_booking_id=booking.id):
+                    raise TransitionError('Another approved booking overlaps these dates', code='conflict')
+
+            updated = Booking.objects.filter(id=booking.id, status=from_status).update(status=to_status)
+            if not updated:
+                booking.refresh_from_db(fields=['status'])
+                raise TransitionError(f'Booking was already {booking.status}', code='conflict')
+            booking.status = to_status
+            booking._saved_status = from_status
+
+            # update() skips model signals; the cache and occupancy receivers still need to run
+            post_save.send(sender=Booking, instance=booking, created=False,
+                           update_fields=frozenset(['status']), raw=False, using=booking._state.db)
+            BookingTransition.objects.create(booking=booking, from_status=from_status,
+                                             to_status=to_status, actor=actor)
+            _notification(booking, to_status, actor).save()
+            if to_status in ('approved', 'rejected'):
+                transaction.on_commit(lambda: _send_booking_notification_email(booking, to_status))
+    except IntegrityError:
+        # Raised by the Postgres exclusion constraint when a concurrent approval won
+        raise TransitionError('Another approved booking overlaps these dates', code='conflict')
+    return booking
+
+
+class _LostRace(Exception):
+    pass
+
+
+def _overlaps(booking, periods):
+    return any(start < booking.end_date and booking.start_date < end for start, end in periods)
+
+
+def bulk_transition(bookings, to_status, actor):
+    """Move many bookings to to_status at once; returns {booking_id: error message or None}.
+
+    Bookings that cannot move are reported and skipped. The rest change in one
+    conditional UPDATE, with their log entries and notifications bulk-inserted
+    and the emails handed to the email workers after commit. If another request
+    changed one of them meanwhile, the batch is retried one booking at a time.
+    """
+    results = {}
+    candidates = []
+    for booking in bookings:
+        if to_status not in TRANSITIONS.get(booking.status, ()):
+            results[booking.id] = f'Cannot change a booking that is already {booking.status}'
+        else:
+            candidates.append(booking)
+    if not candidates:
+        return results
+
+    try:
+        with transaction.atomic():
+            if to_status == 'approved':
+                candidates = _without_overlaps(candidates, results)
+            from_statuses = {booking.id: booking.status for booking in candidates}
+            by_status = {}
+            for booking_id, from_status in from_statuses.items():
+                by_status.setdefault(from_status, []).append(booking_id)
+            updated = sum(
+                Booking.objects.filter(id__in=ids, status=from_status).update(status=to_status)
+                for from_status, ids in by_status.items()
+            )
+            if updated != len(candidates):
+                raise _LostRace()
+
+            for booking in candidates:
+                booking.status = to_status
+                booking._saved_status = from_statuses[booking.id]
+                results[booking.id] = None
+                post_save.send(sender=Booking, instance=booking, created=False,
+                               update_fields=frozenset(['status']), raw=False, using=booking._state.db)
+            BookingTransition.objects.bulk_create([
+                BookingTransition(booking=booking, from_status=from_statuses[booking.id], to_status=to_status,
+                                  actor=actor)
+                for booking in candidates
+            ])
+            notifications = Notification.objects.bulk_create(
+                [_notification(booking, to_status, actor) for booking in candidates])
+            # bulk_create sends no post_save, so these are not counted by the signal
+            for notification in notifications:
+                NOTIFICATIONS.inc(title=notification.title)
+            if to_status in ('approved', 'rejected'):
+                transaction.on_commit(lambda: enqueue_booking_emails(candidates, to_status))
+    except (_LostRace, IntegrityError):
+        for booking in candidates:
+            booking.refresh_from_db(fields=['status'])
+            try:
+                transition(booking, to_status, actor)
+                results[booking.id] = None
+            except TransitionError as e:
+                results[booking.id] = str(e)
+    return results
+
+
+def _without_overlaps(bookings, results):
+    """Drop bookings that overlap an approved booking or an earlier one in the batch"""
+    room_ids = {booking.room_id for booking in bookings}
+    list(Room.objects.select_for_update().filter(id__in=room_ids))
+    approved = {}
+    existing = overlapping_bookings(min(b.start_date for b in bookings), max(b.end_date for b in bookings))
+    for room_id, start, end in existing.filter(room_id__in=room_ids).values_list('room_id', 'start_date', 'end_date'):
+        approved.setdefault(room_id, []).append((start, end))
+
+    accepted = []
+    for booking in sorted(bookings, key=lambda b: (b.start_date, b.id)):
+        periods = approved.setdefault(booking.room_id, [])
+        if _overlaps(booking, periods):
+            results[booking.id] = 'Another approved booking overlaps these dates'
+            continue
+        periods.append((booking.start_date, booking.end_date))
+        accepted.append(booking)
+    return accepted
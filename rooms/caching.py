@@ -0,0 +1,131 @@
+import hashlib
+import re
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .instrumentation import record_cache
+from .models import NumberSequence
+
+VERSION_KEY = 'namespace-version'
+# Characters that may not appear in the readable part of a key
+UNSAFE_KEY_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def get_cache(namespace):
+    return caches[namespace]
+
+
+def namespace_version(namespace):
+    """Current version of a namespace; bumping it orphans every key built before"""
+    cache = get_cache(namespace)
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_namespace(namespace):
+    """Invalidate a whole namespace at once"""
+    cache = get_cache(namespace)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # No version stored yet (or it was evicted): start past the default
+        cache.set(VERSION_KEY, 2, None)
+        return 2
+
+
+def versioned_key(namespace, *parts):
+    """Build a cache key scoped to the namespace's current version.
+
+    Parts can be raw user input (search terms, filters), so they are always
+    hashed; only a sanitized first part stays readable, e.g. 'v3:user:<sha256>'.
+    This keeps keys short and valid for memcached whatever the input.
+    """
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+    label = UNSAFE_KEY_CHARS.sub('', str(parts[0]))[:40] if parts else ''
+    return f"v{namespace_version(namespace)}:{label}:{digest}"
+
+
+def cached_call(namespace, key_parts, fill, timeout=None, lock_timeout=30):
+    """Return fill() through the namespace cache, with stampede protection.
+
+    Entries are stored with a soft expiry. When an entry goes stale, the caller
+    that wins the lock recomputes it and the others keep serving the stale value.
+    When there is nothing cached yet, the others wait for the winner instead of
+    all running fill() at the same time.
+    """
+    cache = get_cache(namespace)
+    if timeout is None:
+        timeout = cache.default_timeout
+    key = versioned_key(namespace, *key_parts)
+    lock_key = f"lock:{key}"
+
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None and entry['expires'] > now:
+        record_cache(True)
+        return entry['value']
+    record_cache(False)
+
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = fill()
+            # Keep the entry around past its soft expiry so stale reads are possible
+            cache.set(key, {'value': value, 'expires': time.time() + timeout}, timeout + lock_timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry['value']
+
+    # Someone else is filling an empty entry: wait for it, up to lock_timeout
+    deadline = now + lock_timeout
+    delay = 0.02
+    while time.time() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    return fill()
+
+
+# The catalogue version lives in the database so every worker agrees on it and
+# it survives restarts, which makes it safe to expose as an ETag.
+CATALOGUE_SEQUENCE = 'catalogue'
+CATALOGUE_VERSION_KEY = 'catalogue-version'
+
+
+def catalogue_version():
+    """(version, last modified) of the public room catalogue"""
+    cache = get_cache('catalogue')
+    current = cache.get(CATALOGUE_VERSION_KEY)
+    record_cache(current is not None)
+    if current is None:
+        row, _ = NumberSequence.objects.get_or_create(name=CATALOGUE_SEQUENCE, defaults={'value': 1})
+        current = (row.value, row.updated_at)
+        # Other workers notice a bump within this many seconds
+        cache.set(CATALOGUE_VERSION_KEY, current, settings.CATALOGUE_VERSION_TTL)
+    return current
+
+
+def bump_catalogue_version():
+    updated = NumberSequence.objects.filter(name=CATALOGUE_SEQUENCE).update(
+        value=F('value') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        NumberSequence.objects.get_or_create(name=CATALOGUE_SEQUENCE, defaults={'value': 1})
+    _forget_catalogue_version()
+    # Again once the bump is visible to other connections
+    transaction.on_commit(_forget_catalogue_version)
+
+
+def _forget_catalogue_version():
+    get_cache('catalogue').delete(CATALOGUE_VERSION_KEY)
+    bump_namespace('catalogue')
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli to enable Content-Encoding: br
+    brotli = None
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts, ignoring any given q=0"""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if name and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.lower())
+    return accepted
+
+
+def carries_secrets(request, response):
+    """Whether a page may reflect a secret (CSRF token, per-user data) next to request input.
+
+    Such pages are open to BREACH, which brotli has no defence against. Both
+    the session and the CSRF middleware add Vary: Cookie to the responses
+    they touch, and have done so by the time CompressionMiddleware runs.
+    """
+    return 'cookie' in response.get('Vary', '').lower()
+
+
+def choose_encoding(request, secrets=False):
+    """Best coding this server can produce for the request, or None
+
+    Pages with secrets only get gzip, whose random header padding mitigates BREACH.
+    """
+    accepted = accepted_encodings(request)
+    if brotli is not None and 'br' in accepted and not secrets:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding, random_padding=True):
+    if encoding == 'br':
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # Random padding in the gzip header mitigates BREACH on pages carrying secrets
+    return compress_string(body, max_random_bytes=100 if random_padding else None)
+
+
+def precompress(body):
+    """{encoding: bytes} for a public body that will be served many times.
+
+    'identity' is always present; compressed variants only when they are worth it.
+    """
+    bodies = {'identity': body}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        for encoding in ('br', 'gzip') if brotli is not None else ('gzip',):
+            compressed = compress(body, encoding, random_padding=False)
+            if len(compressed) < len(body):
+                bodies[encoding] = compressed
+    return bodies
@@ -0,0 +1,134 @@
+import os
+import re
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """Strong ETag built from the file's size and modification time"""
+    return quote_etag(f"{stat.st_size:x}-{int(stat.st_mtime):x}")
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header.split(',')]
+    # Weak comparison is fine for If-None-Match
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single byte range, None if absent, or False if unsatisfiable"""
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _set_validators(response, etag, mtime, cache_control):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+
+
+def _set_disposition(response, filename):
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+
+def serve_file(request, path, content_type, filename=None, storage_name=None, cache_control='private, no-cache'):
+    """Serve a file from disk with conditional GET and single Range support.
+
+    Memory use is constant: the body is streamed in chunks, or handed to the
+    front proxy entirely when SENDFILE_BACKEND is configured. Without a
+    filename the file is served inline instead of as a download.
+    """
+    stat = os.stat(path)
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = file_etag(stat)
+    # Validators and ranges only apply to reads; a POST always gets the full file
+    safe = request.method in ('GET', 'HEAD')
+
+    if safe and _not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+        _set_validators(response, etag, mtime, cache_control)
+        return response
+
+    backend = settings.SENDFILE_BACKEND
+
+    if backend == 'nginx' and storage_name:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.SENDFILE_URL.rstrip('/')}/{storage_name.lstrip('/')}"
+        _set_disposition(response, filename)
+        _set_validators(response, etag, mtime, cache_control)
+        return response
+
+    if backend == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = os.path.abspath(path)
+        _set_disposition(response, filename)
+        _set_validators(response, etag, mtime, cache_control)
+        return response
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if safe and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_read_range(path, start, length), status=206, content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    _set_disposition(response, filename)
+    _set_validators(response, etag, mtime, cache_control)
+    return response
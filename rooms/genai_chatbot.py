@@ -1,9 +1,13 @@
 import json
+import logging
 import os
 from django.conf import settings
 from openai import OpenAI
+from .instrumentation import external_call
 from .models import Room, Booking
 
+logger = logging.getLogger(__name__)
+
 class RoomBookChatbot:
     """GenAI-powered chatbot for RoomBook platform"""
     
@@ -19,7 +23,7 @@ class RoomBookChatbot:
             if api_key:
                 self.client = OpenAI(api_key=api_key)
         except Exception as e:
-            print(f"OpenAI setup failed: {e}")
+            logger.warning("OpenAI setup failed: %s", e)
     
     def get_system_prompt(self):
         """Get the system prompt for the chatbot"""
@@ -151,27 +155,28 @@ Please provide a helpful response based on the context and your knowledge about
 """
                     
                     # Generate response
-                    response = self.client.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_message}
-                        ],
-                        max_tokens=500,
-                        temperature=0.7
-                    )
+                    with external_call('openai'):
+                        response = self.client.chat.completions.create(
+                            model="gpt-3.5-turbo",
+                            messages=[
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": user_message}
+                            ],
+                            max_tokens=500,
+                            temperature=0.7
+                        )
                     
                     return response.choices[0].message.content.strip()
                     
                 except Exception as openai_error:
-                    print(f"OpenAI API error: {openai_error}")
+                    logger.warning("OpenAI API error: %s", openai_error)
                     # Fall back to rule-based responses
             
             # Use fallback response system
             return self.get_fallback_response(message)
             
         except Exception as e:
-            print(f"Chatbot error: {e}")
+            logger.exception("Chatbot error: %s", e)
             return self.get_fallback_response(message)
     
     def get_fallback_response(self, message):
@@ -0,0 +1,178 @@
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection
+from . import metrics
+from .caching import bump_catalogue_version
+from .models import Room
+from .storage import is_static_fallback
+
+logger = logging.getLogger(__name__)
+
+# Longest side of each variant, smallest first
+VARIANT_WIDTHS = {'thumb': 320, 'card': 640, 'full': 1600}
+FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+SAVE_OPTIONS = {
+    'avif': {'quality': 60, 'speed': 6},
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+_executor = None
+
+
+def _get_executor():
+    """Create the image process pool on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+def read_source(name):
+    """Bytes of a room image, whether uploaded or one of the bundled static photos"""
+    if is_static_fallback(name):
+        path = finders.find(f"images/about/{name.lstrip('/')}")
+        if not path:
+            raise FileNotFoundError(name)
+        with open(path, 'rb') as f:
+            return f.read()
+    with default_storage.open(name, 'rb') as f:
+        return f.read()
+
+
+def available_formats():
+    from PIL import features
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+
+def build_image_variants(source, formats):
+    """Resize and encode one image; returns {variant: {'width', 'height', 'files': {format: bytes}}}"""
+    # Pillow is only imported by processes that actually resize images
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(source)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    variants = {}
+    last_width = None
+    for variant, max_side in VARIANT_WIDTHS.items():
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        if resized.width == last_width:
+            # Never upscale: small originals simply get fewer variants
+            continue
+        last_width = resized.width
+        files = {}
+        for fmt in formats:
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+            files[fmt] = buffer.getvalue()
+        variants[variant] = {'width': resized.width, 'height': resized.height, 'files': files}
+    return variants
+
+
+def render_source(name, formats):
+    """Read and resize one stored image, for save_image_variants"""
+    return build_image_variants(read_source(name), formats)
+
+
+def _variant_names(image_variants):
+    return {name for variant in (image_variants or {}).get('variants', {}).values()
+            for name in variant['files'].values()}
+
+
+def delete_variant_files(image_variants, keep=None):
+    """Delete stored variant files, except those also referenced by keep"""
+    # Content-hashed names mean re-rendering the same image yields the same files
+    for name in _variant_names(image_variants) - _variant_names(keep):
+        default_storage.delete(name)
+
+
+def save_image_variants(room_id, source_name, rendered):
+    """Store rendered variants and point the room at them, unless its image changed meanwhile"""
+    variants = {}
+    for variant, data in rendered.items():
+        files = {
+            # The media storage fingerprints each file with its own content hash
+            fmt: default_storage.save(f"room_images/variants/{room_id}/{variant}.{FORMAT_EXTENSIONS[fmt]}",
+                                      ContentFile(content))
+            for fmt, content in data['files'].items()
+        }
+        variants[variant] = {'width': data['width'], 'height': data['height'], 'files': files}
+
+    previous = Room.objects.filter(id=room_id).values_list('image_variants', flat=True).first()
+    image_variants = {'source': source_name, 'variants': variants}
+    updated = Room.objects.filter(id=room_id, image=source_name).update(image_variants=image_variants)
+    if not updated:
+        delete_variant_files(image_variants, keep=previous)
+        return None
+    if previous:
+        delete_variant_files(previous, keep=image_variants)
+    bump_catalogue_version()
+    return image_variants
+
+
+def mark_failed(room_id, source_name, error):
+    """Record the failure, counting attempts at the same source so needs_variants can give up"""
+    logger.warning("Image variants failed for room %s: %s", room_id, error, exc_info=error)
+    previous = Room.objects.filter(id=room_id).values_list('image_variants', flat=True).first() or {}
+    attempts = previous.get('attempts', 1) + 1 if previous.get('source') == source_name and 'error' in previous else 1
+    Room.objects.filter(id=room_id, image=source_name).update(
+        image_variants={'source': source_name, 'error': str(error), 'attempts': attempts}
+    )
+
+
+def _on_variants_rendered(room_id, source_name, future):
+    """Executor callback: runs in the parent process once the worker is done"""
+    metrics.BACKGROUND_JOBS.dec(queue='image_variants')
+    close_old_connections()
+    try:
+        error = future.exception()
+        if error is not None:
+            mark_failed(room_id, source_name, error)
+        else:
+            save_image_variants(room_id, source_name, future.result())
+    except Exception as e:
+        mark_failed(room_id, source_name, e)
+    finally:
+        connection.close()
+
+
+def needs_variants(room):
+    """True for new images, and for failed ones until IMAGE_VARIANT_MAX_ATTEMPTS is reached"""
+    if not room.image:
+        return False
+    variants = room.image_variants
+    if variants.get('source') != room.image.name:
+        return True
+    return 'error' in variants and variants.get('attempts', 1) < settings.IMAGE_VARIANT_MAX_ATTEMPTS
+
+
+def enqueue_image_variants(room):
+    """Schedule variant generation for the room's current image.
+
+    With IMAGE_WORKERS = 0 the variants are rendered inline, like invoice PDFs.
+    """
+    source_name = room.image.name
+    try:
+        source = read_source(source_name)
+    except Exception as e:
+        mark_failed(room.id, source_name, e)
+        return
+    formats = available_formats()
+
+    if settings.IMAGE_WORKERS <= 0:
+        try:
+            save_image_variants(room.id, source_name, build_image_variants(source, formats))
+        except Exception as e:
+            mark_failed(room.id, source_name, e)
+        return
+
+    metrics.BACKGROUND_JOBS.inc(queue='image_variants')
+    future = _get_executor().submit(build_image_variants, source, formats)
+    future.add_done_callback(lambda f: _on_variants_rendered(room.id, source_name, f))
@@ -0,0 +1,102 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from . import metrics
+
+# Metrics of the request being handled in this thread (or task); None outside requests
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters collected while one request is handled, see RequestMetricsMiddleware"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        # (sql, milliseconds), only kept up to SLOW_REQUEST_MAX_QUERIES
+        self.queries = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # service -> [calls, seconds]
+        self.external = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def record_query(self, sql, duration):
+        self.db_count += 1
+        self.db_time += duration
+        if len(self.queries) < settings.SLOW_REQUEST_MAX_QUERIES:
+            self.queries.append((sql, round(duration * 1000, 2)))
+
+    def record_external(self, service, duration):
+        calls = self.external.setdefault(service, [0, 0.0])
+        calls[0] += 1
+        calls[1] += duration
+
+
+def current_metrics():
+    return _current.get()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_cache(hit):
+    """Count a cache lookup, also against the current request if any"""
+    metrics.CACHE_LOOKUPS.inc(result='hit' if hit else 'miss')
+    request_metrics = _current.get()
+    if request_metrics is not None:
+        if hit:
+            request_metrics.cache_hits += 1
+        else:
+            request_metrics.cache_misses += 1
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to a third-party service ('openai', 'razorpay', 'google', 'smtp')"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.EXTERNAL_CALL_ERRORS.inc(service=service)
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        metrics.EXTERNAL_CALL_DURATION.observe(duration, service=service)
+        request_metrics = _current.get()
+        if request_metrics is not None:
+            request_metrics.record_external(service, duration)
+
+
+def timed_external(service):
+    """Decorator form of external_call"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with external_call(service):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def query_timer(execute, sql, params, many, context):
+    """Connection.execute_wrapper that times every query of the current request"""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.record_query(sql, time.perf_counter() - start)
@@ -0,0 +1,196 @@
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection
+from . import metrics
+from .models import Invoice, Notification
+from .notifications import _send_invoice_notification_email, _send_invoice_to_host_email
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    """Create the PDF process pool on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.INVOICE_PDF_WORKERS)
+    return _executor
+
+
+def invoice_pdf_data(invoice):
+    """Collect the plain values the PDF needs so the worker never touches the DB"""
+    booking = invoice.booking
+    return {
+        'invoice_number': invoice.invoice_number,
+        'issued_date': invoice.issued_date.strftime('%Y-%m-%d'),
+        'due_date': invoice.due_date.strftime('%Y-%m-%d'),
+        'status': invoice.status,
+        'room_title': booking.room.title,
+        'room_location': booking.room.location,
+        'start_date': str(booking.start_date),
+        'end_date': str(booking.end_date),
+        'months': booking.months,
+        'subtotal': f"{invoice.subtotal:.2f}",
+        'tax_amount': f"{invoice.tax_amount:.2f}",
+        'total_amount': f"{invoice.total_amount:.2f}",
+    }
+
+
+def build_invoice_pdf(data):
+    """Render the invoice PDF from plain data and return the bytes"""
+    # ReportLab is only imported by processes that actually render PDFs
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Title
+    title_style = styles['Title']
+    title = Paragraph("INVOICE", title_style)
+    story.append(title)
+    story.append(Spacer(1, 12))
+
+    # Invoice details table
+    invoice_data = [
+        ['Invoice Number:', data['invoice_number']],
+        ['Issued Date:', data['issued_date']],
+        ['Due Date:', data['due_date']],
+        ['Status:', data['status'].upper()],
+    ]
+
+    invoice_table = Table(invoice_data, colWidths=[2*inch, 3*inch])
+    invoice_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ]))
+    story.append(invoice_table)
+    story.append(Spacer(1, 20))
+
+    # Booking details
+    booking_data = [
+        ['Room:', data['room_title']],
+        ['Location:', data['room_location']],
+        ['Period:', f"{data['start_date']} to {data['end_date']}"],
+        ['Duration:', f"{data['months']} month(s)"],
+    ]
+
+    booking_table = Table(booking_data, colWidths=[1.5*inch, 4*inch])
+    booking_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    story.append(booking_table)
+    story.append(Spacer(1, 20))
+
+    # Billing details
+    billing_data = [
+        ['Description', 'Amount'],
+        ['Room Rent', f"${data['subtotal']}"],
+        ['Tax', f"${data['tax_amount']}"],
+        ['Total', f"${data['total_amount']}"],
+    ]
+
+    billing_table = Table(billing_data, colWidths=[3*inch, 2*inch])
+    billing_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('LINEBELOW', (0, 0), (-1, -1), 1, colors.black),
+        ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
+    ]))
+    story.append(billing_table)
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_invoice_pdf(data):
+    """build_invoice_pdf, timed; this is what the worker processes run"""
+    with metrics.PDF_RENDER.time(document='invoice'):
+        pdf_bytes = build_invoice_pdf(data)
+    # Worker processes serve no requests, so nothing else would write out their samples
+    metrics.flush(force=True)
+    return pdf_bytes
+
+
+def save_invoice_pdf(invoice_id, pdf_bytes):
+    """Attach a rendered PDF to the invoice, mark it sent and notify both parties"""
+    invoice = Invoice.objects.select_related('booking__room__owner', 'booking__user').get(id=invoice_id)
+    invoice.pdf_file.save(f"invoice_{invoice.invoice_number}.pdf", ContentFile(pdf_bytes), save=False)
+    invoice.status = 'sent'
+    invoice.pdf_status = 'ready'
+    invoice.save()
+
+    # Send email notification to user
+    _send_invoice_notification_email(invoice)
+
+    # Send email notification to host/owner
+    _send_invoice_to_host_email(invoice)
+
+    Notification.objects.create(
+        user=invoice.booking.user,
+        title='Invoice ready',
+        message=f"Invoice {invoice.invoice_number} is ready to download and pay.",
+        link='/my-bookings/'
+    )
+    return invoice
+
+
+def _mark_pdf_failed(invoice_id, error):
+    logger.warning("Invoice PDF generation failed for invoice %s: %s", invoice_id, error, exc_info=error)
+    Invoice.objects.filter(id=invoice_id).update(pdf_status='failed')
+
+
+def _on_pdf_rendered(invoice_id, future):
+    """Executor callback: runs in the parent process once the worker is done"""
+    metrics.BACKGROUND_JOBS.dec(queue='invoice_pdf')
+    close_old_connections()
+    try:
+        error = future.exception()
+        if error is not None:
+            _mark_pdf_failed(invoice_id, error)
+        else:
+            save_invoice_pdf(invoice_id, future.result())
+    except Exception as e:
+        _mark_pdf_failed(invoice_id, e)
+    finally:
+        connection.close()
+
+
+def enqueue_invoice_pdf(invoice):
+    """Schedule PDF rendering for a draft invoice.
+
+    With INVOICE_PDF_WORKERS = 0 the PDF is rendered inline, which keeps tests
+    and single-process dev servers simple.
+    """
+    data = invoice_pdf_data(invoice)
+    if settings.INVOICE_PDF_WORKERS <= 0:
+        try:
+            save_invoice_pdf(invoice.id, render_invoice_pdf(data))
+        except Exception as e:
+            _mark_pdf_failed(invoice.id, e)
+        return
+
+    metrics.BACKGROUND_JOBS.inc(queue='invoice_pdf')
+    future = _get_executor().submit(render_invoice_pdf, data)
+    future.add_done_callback(lambda f: _on_pdf_rendered(invoice.id, f))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from .models import Invoice
+from .sequences import next_invoice_number
+
+# Standard GST rate applied to room rent
+TAX_RATE = Decimal('18.00')
+# Days a tenant has to pay an invoice
+PAYMENT_TERMS_DAYS = 7
+
+
+def build_invoice(booking, invoice_number=None):
+    """Return an unsaved draft Invoice for an approved booking"""
+    subtotal = booking.total_rent
+    tax_amount = subtotal * TAX_RATE / Decimal('100')
+    return Invoice(
+        booking=booking,
+        invoice_number=invoice_number or next_invoice_number(),
+        due_date=timezone.now().date() + timedelta(days=PAYMENT_TERMS_DAYS),
+        subtotal=subtotal,
+        tax_rate=TAX_RATE,
+        tax_amount=tax_amount,
+        total_amount=subtotal + tax_amount,
+        status='draft'
+    )
@@ -0,0 +1,66 @@
+import statistics
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request latency with and without persistent database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per run')
+        parser.add_argument('--url', default='/api/rooms/',
+                            help='Endpoint to request; caches are cleared before each request so it hits the database')
+        parser.add_argument('--conn-max-age', type=int, default=60,
+                            help='CONN_MAX_AGE used for the persistent run')
+
+    def _run(self, url, count, conn_max_age):
+        db = connections['default']
+        db.close()
+        db.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+        client = Client()
+        # Warm up URL resolution, imports and the first connection
+        client.get(url)
+
+        timings = []
+        for _ in range(count):
+            # A cached response would never touch the connection being compared
+            for alias in settings.CACHES:
+                caches[alias].clear()
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url} returned {response.status_code}')
+
+        db.close()
+        timings.sort()
+        return {
+            'p50': statistics.median(timings),
+            'p95': timings[int(len(timings) * 0.95) - 1],
+            'mean': statistics.fmean(timings),
+        }
+
+    def handle(self, *args, **options):
+        db = connections['default']
+        original = db.settings_dict['CONN_MAX_AGE']
+        url, count = options['url'], options['requests']
+
+        self.stdout.write(f"{db.vendor}: {count} x GET {url}")
+        try:
+            results = [
+                ('new connection per request', self._run(url, count, 0)),
+                (f"persistent (CONN_MAX_AGE={options['conn_max_age']})", self._run(url, count, options['conn_max_age'])),
+            ]
+        finally:
+            db.settings_dict['CONN_MAX_AGE'] = original
+
+        for label, stats in results:
+            self.stdout.write(
+                f"  {label:<40} p50 {stats['p50']:7.2f} ms   p95 {stats['p95']:7.2f} ms   mean {stats['mean']:7.2f} ms"
+            )
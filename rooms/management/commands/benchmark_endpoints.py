@@ -0,0 +1,229 @@
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rooms.models import Booking, Notification, Room
+
+# (name, user, method, url, data); user is one of the accounts picked by _users()
+SCENARIOS = [
+    ('api_rooms', None, 'get', '/api/rooms/', {}),
+    ('api_rooms?q', None, 'get', '/api/rooms/', {'q': 'furnished'}),
+    ('api_rooms?location', None, 'get', '/api/rooms/', {'location': 'Bangalore'}),
+    ('api_rooms?min_price&max_price', None, 'get', '/api/rooms/', {'min_price': '5000', 'max_price': '12000'}),
+    ('api_rooms?sort=price_asc', None, 'get', '/api/rooms/', {'sort': 'price_asc'}),
+    ('api_rooms?sort=price_desc', None, 'get', '/api/rooms/', {'sort': 'price_desc'}),
+    ('api_rooms?available_from&months', None, 'get', '/api/rooms/', {'available_from': '2026-01-01', 'months': '6'}),
+    ('api_rooms?view=card', None, 'get', '/api/rooms/', {'view': 'card'}),
+    ('api_rooms?fields', None, 'get', '/api/rooms/', {'fields': 'id,title,price'}),
+    ('api_my_bookings', 'tenant', 'get', '/api/bookings/my/', {}),
+    ('api_received_bookings', 'owner', 'get', '/api/bookings/received/', {}),
+    ('api_notifications', 'reader', 'get', '/api/notifications/', {}),
+    ('api_unread_notifications_count', 'reader', 'get', '/api/notifications/unread-count/', {}),
+    ('api_admin_users', 'admin', 'get', '/api/admin/users/', {}),
+    ('api_ml_recommendations', 'tenant', 'get', '/api/ml/recommendations/', {}),
+    ('api_ml_predict_price', 'admin', 'post', '/api/ml/predict-price/',
+     {'title': 'Furnished Studio in Koramangala', 'location': 'Koramangala, Bangalore', 'description': 'Near metro'}),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _RequestFailed(Exception):
+    pass
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile"""
+    return sorted_values[max(math.ceil(len(sorted_values) * fraction) - 1, 0)]
+
+
+def _environment():
+    """Latency is only comparable with a baseline recorded on the same machine and stack"""
+    return {
+        'host': platform.node(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the hot API endpoints in-process (query counts, p50/p95 latency, peak allocations) '
+            'and fail on regressions against a JSON baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'endpoints.json'),
+                            help='Baseline JSON file')
+        parser.add_argument('--update-baseline', action='store_true', help='Record this run as the new baseline')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed relative growth of p95 latency and allocations (default 0.25)')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint')
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Keep caches between requests instead of clearing them before each one')
+        parser.add_argument('--existing', action='store_true',
+                            help='Use the current database instead of a generated dataset (rolled back afterwards)')
+        parser.add_argument('--only', action='append', help='Only scenarios whose name starts with this (repeatable)')
+        for name, default in (('users', 2000), ('rooms', 500), ('bookings', 5000), ('notifications', 10000)):
+            parser.add_argument(f'--{name}', type=int, default=default, help=f'Generated {name} (default {default})')
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                dataset = self._dataset(options)
+                # The price model is trained and saved on first use; keep it out of the project directory
+                with tempfile.TemporaryDirectory() as ml_dir, override_settings(BASE_DIR=ml_dir):
+                    results = self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        report = {'environment': _environment(), 'dataset': dataset,
+                  'cache': 'warm' if options['warm_cache'] else 'cold', 'results': results}
+        self._print(results)
+        if options['update_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']) or '.', exist_ok=True)
+            with open(options['baseline'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+        self._compare(report, options)
+
+    def _dataset(self, options):
+        if not options['existing']:
+            call_command('generate_load_data', users=options['users'], rooms=options['rooms'],
+                         bookings=options['bookings'], notifications=options['notifications'],
+                         prefix='bench', seed=0, stdout=io.StringIO())
+        return {model.__name__: model.objects.count() for model in (User, Room, Booking, Notification)}
+
+    def _users(self):
+        """Accounts with the most data behind each per-user endpoint"""
+        def busiest(queryset, field):
+            row = queryset.values(field).annotate(n=Count('id')).order_by('-n', field).first()
+            return User.objects.get(id=row[field]) if row else User.objects.order_by('id').first()
+
+        admin = User.objects.create(username='bench-admin', is_staff=True, is_superuser=True)
+        return {
+            'tenant': busiest(Booking.objects.all(), 'user'),
+            'owner': busiest(Booking.objects.all(), 'owner'),
+            'reader': busiest(Notification.objects.all(), 'user'),
+            'admin': admin,
+        }
+
+    def _run(self, options):
+        users = self._users()
+        results = {}
+        for name, role, method, url, data in SCENARIOS:
+            if options['only'] and not any(name.startswith(prefix) for prefix in options['only']):
+                continue
+            client = Client()
+            if role:
+                client.force_login(users[role])
+            try:
+                results[name] = self._measure(client, method, url, data, options)
+            except _RequestFailed as e:
+                # Reported, and a regression if the baseline had numbers for it
+                results[name] = {'error': str(e)}
+        return results
+
+    def _measure(self, client, method, url, data, options):
+        def request():
+            if not options['warm_cache']:
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            response = getattr(client, method)(url, data)
+            if response.status_code != 200:
+                raise _RequestFailed(f'{method.upper()} {url} returned {response.status_code}')
+            return response
+
+        for _ in range(options['warmup']):
+            request()
+
+        # With DEBUG on, the bounded query log may already be full, which would hide new entries
+        reset_queries()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Read now: later requests reset the query log the capture refers to
+        query_count = len(queries)
+
+        timings = []
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            'queries': query_count,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def _print(self, results):
+        self.stdout.write(f"{'endpoint':<36} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>10}")
+        for name, r in results.items():
+            if 'error' in r:
+                self.stdout.write(self.style.ERROR(f"{name:<36} {r['error']}"))
+                continue
+            self.stdout.write(f"{name:<36} {r['queries']:>7} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['peak_kib']:>10.1f}")
+
+    def _compare(self, report, options):
+        try:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(
+                f"No baseline at {options['baseline']}; record one with --update-baseline"))
+            return
+        if baseline['dataset'] != report['dataset'] or baseline['cache'] != report['cache']:
+            raise CommandError('Baseline was recorded against a different dataset or cache mode; '
+                               're-record it with the same options')
+        compare_latency = baseline['environment'] == report['environment']
+        if not compare_latency:
+            self.stdout.write(self.style.WARNING('Baseline comes from another environment; latency not compared'))
+
+        threshold = options['threshold']
+        regressions = []
+        for name, current in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None or 'error' in before:
+                continue
+            if 'error' in current:
+                regressions.append(f"{name}: {current['error']}")
+                continue
+            # Query counts are deterministic for a given dataset, so any increase is a regression
+            if current['queries'] > before['queries']:
+                regressions.append(f"{name}: {before['queries']} -> {current['queries']} queries")
+            # Small absolute differences are noise, whatever the ratio
+            if current['peak_kib'] > before['peak_kib'] * (1 + threshold) and current['peak_kib'] - before['peak_kib'] > 64:
+                regressions.append(f"{name}: peak {before['peak_kib']} -> {current['peak_kib']} KiB")
+            if compare_latency and current['p95_ms'] > before['p95_ms'] * (1 + threshold) \
+                    and current['p95_ms'] - before['p95_ms'] > 1:
+                regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {threshold:.0%} against {options['baseline']}"))
@@ -0,0 +1,73 @@
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rooms.models import Room
+from rooms.renderers import ORJSONRenderer
+from rooms.serializers import RoomSerializer, serialize_room_rows
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare RoomSerializer + JSONRenderer with the values() + orjson path on a generated catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=10000,
+                            help='Temporary rooms to generate (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per path; the best one is reported')
+
+    def _best(self, fn, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        owners = [
+            User.objects.create(username=f'bench-owner-{i}', first_name='Bench', last_name=str(i))
+            for i in range(10)
+        ]
+        Room.objects.bulk_create([
+            Room(owner=owners[i % len(owners)], title=f'Room {i}', description='Bright room near the metro',
+                 price=1000 + i, location=f'Sector {i % 50}', phone='9999999999', email='owner@example.com',
+                 image=f'r{i % 11 + 1}.jpg' if i % 2 else f'room_images/room_{i}.jpg')
+            for i in range(options['rooms'])
+        ], batch_size=1000)
+
+        request = RequestFactory().get('/api/rooms/')
+        rooms = Room.objects.order_by('-created_at', '-id')
+
+        def current():
+            data = RoomSerializer(rooms, many=True, context={'request': request}).data
+            return JSONRenderer().render(data)
+
+        def lean():
+            return ORJSONRenderer().render(serialize_room_rows(rooms, request))
+
+        count = rooms.count()
+        self.stdout.write(f'{count} rooms, best of {options["repeat"]}')
+        current_time, current_body = self._best(current, options['repeat'])
+        lean_time, lean_body = self._best(lean, options['repeat'])
+
+        self.stdout.write(f'  RoomSerializer + JSONRenderer   {current_time * 1000:9.1f} ms  {len(current_body)} bytes')
+        self.stdout.write(f'  values() rows + ORJSONRenderer  {lean_time * 1000:9.1f} ms  {len(lean_body)} bytes')
+        if current_body != lean_body:
+            raise CommandError('Outputs differ')
+        self.stdout.write(self.style.SUCCESS(f'Identical output, {current_time / lean_time:.1f}x faster'))
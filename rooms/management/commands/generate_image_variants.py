@@ -0,0 +1,46 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from rooms.image_worker import available_formats, mark_failed, needs_variants, render_source, save_image_variants
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = 'Generate resized AVIF/WebP/JPEG variants for room images that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants for every room with an image')
+        parser.add_argument('--workers', type=int, default=1, help='Resize in this many processes (default 1)')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Rooms handed to the workers at a time (default 100)')
+        parser.add_argument('--room', type=int, action='append', dest='rooms',
+                            help='Only this room (repeatable)')
+
+    def handle(self, *args, **options):
+        rooms = Room.objects.exclude(image='').exclude(image__isnull=True).order_by('id')
+        if options['rooms']:
+            rooms = rooms.filter(id__in=options['rooms'])
+        rooms = [room for room in rooms.only('id', 'image', 'image_variants')
+                 if options['force'] or needs_variants(room)]
+        formats = available_formats()
+        self.stdout.write(f"{len(rooms)} room(s) to process, formats: {', '.join(formats)}")
+
+        batch_size = max(options['batch_size'], 1)
+        generated = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            for start in range(0, len(rooms), batch_size):
+                generated += self._render_batch(executor, rooms[start:start + batch_size], formats)
+                self.stdout.write(f'  {min(start + batch_size, len(rooms))}/{len(rooms)} rooms')
+        self.stdout.write(self.style.SUCCESS(f'Generated image variants for {generated} room(s)'))
+
+    def _render_batch(self, executor, rooms, formats):
+        """Render one batch; only this many futures and their results are held at once"""
+        # Workers read the originals themselves so the command never holds them all in memory
+        futures = [(room, executor.submit(render_source, room.image.name, formats)) for room in rooms]
+        generated = 0
+        for room, future in futures:
+            try:
+                if save_image_variants(room.id, room.image.name, future.result()):
+                    generated += 1
+            except Exception as e:
+                mark_failed(room.id, room.image.name, e)
+        return generated
@@ -0,0 +1,180 @@
+import multiprocessing
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+from rooms.models import Booking, Invoice, Notification
+from rooms.invoicing import build_invoice
+from rooms.sequences import invoice_sequence, format_invoice_number
+from rooms.invoice_worker import build_invoice_pdf, invoice_pdf_data
+from rooms.notifications import _send_invoice_notification_email, _send_invoice_to_host_email
+
+
+def _render(item):
+    """Pool worker: render one invoice PDF, never raising"""
+    invoice_id, data = item
+    try:
+        return invoice_id, build_invoice_pdf(data), None
+    except Exception as e:
+        return invoice_id, None, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Create invoices and PDFs for all approved bookings that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Invoices created and rendered per batch')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='Processes used to render PDFs')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Only process this many bookings')
+        parser.add_argument('--no-email', action='store_true',
+                            help='Skip invoice emails (in-app notifications are still created)')
+        parser.add_argument('--stale-after', type=int, default=30,
+                            help='Re-render pending PDFs untouched for this many minutes (default 30)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many bookings would be invoiced')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # One query for every eligible booking
+        bookings = (Booking.objects
+                    .filter(status='approved', invoice__isnull=True)
+                    .order_by('id')
+                    .values_list('id', flat=True))
+        if options['limit']:
+            bookings = bookings[:options['limit']]
+        booking_ids = list(bookings)
+
+        self.stdout.write(f'{len(booking_ids)} approved booking(s) without an invoice')
+        if options['dry_run']:
+            return
+
+        created_ids = []
+        for start in range(0, len(booking_ids), batch_size):
+            created_ids += self._create_batch(booking_ids[start:start + batch_size])
+            self.stdout.write(f'  created {len(created_ids)}/{len(booking_ids)} invoices')
+        created = len(created_ids)
+
+        # Render the new invoices, plus those a previous run or the web workers left
+        # behind, which makes reruns resume
+        pending_ids = sorted(created_ids + self._claim_leftovers(options['stale_after']))
+        self.stdout.write(f'{len(pending_ids)} invoice PDF(s) to render')
+
+        rendered = failed = 0
+        for start in range(0, len(pending_ids), batch_size):
+            ok, errors = self._render_batch(pending_ids[start:start + batch_size], options)
+            rendered += ok
+            failed += errors
+            self.stdout.write(f'  rendered {rendered + failed}/{len(pending_ids)} PDFs ({failed} failed)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {created} invoice(s) created, {rendered} PDF(s) rendered, {failed} failed'
+        ))
+
+    def _claim_leftovers(self, stale_after):
+        """Claim failed PDFs and pending ones nobody has touched for stale_after minutes.
+
+        Recently pending invoices may still be rendering in a web worker's pool, and
+        rendering them here too would email both parties twice. Each leftover is
+        claimed with a conditional UPDATE, so concurrent runs never share one.
+        """
+        now = timezone.now()
+        stale = Q(pdf_status='pending', updated_at__lt=now - timedelta(minutes=stale_after))
+        leftovers = (Invoice.objects
+                     .filter(status='draft', booking__status='approved')
+                     .filter(Q(pdf_status='failed') | stale)
+                     .order_by('id')
+                     .values_list('id', 'pdf_status', 'updated_at'))
+        return [
+            invoice_id for invoice_id, pdf_status, updated_at in leftovers
+            if Invoice.objects.filter(id=invoice_id, pdf_status=pdf_status, updated_at=updated_at)
+                              .update(pdf_status='pending', updated_at=now)
+        ]
+
+    def _create_batch(self, booking_ids):
+        """Create invoices for the bookings; returns the ids of those created here"""
+        bookings = list(Booking.objects.filter(id__in=booking_ids, invoice__isnull=True))
+        # One reservation for the whole batch instead of one per invoice
+        numbers = invoice_sequence.take(len(bookings)) if bookings else []
+        invoices = [
+            build_invoice(booking, invoice_number=format_invoice_number(number))
+            for booking, number in zip(bookings, numbers)
+        ]
+        try:
+            with transaction.atomic():
+                Invoice.objects.bulk_create(invoices)
+            return [invoice.id for invoice in invoices]
+        except IntegrityError:
+            # A tenant created some of these invoices meanwhile; fall back to one row at a time
+            created_ids = []
+            for invoice in invoices:
+                try:
+                    with transaction.atomic():
+                        invoice.save()
+                    created_ids.append(invoice.id)
+                except IntegrityError:
+                    pass
+            return created_ids
+
+    def _render_batch(self, invoice_ids, options):
+        invoices = {
+            invoice.id: invoice
+            for invoice in Invoice.objects.filter(id__in=invoice_ids)
+                                          .select_related('booking__room__owner', 'booking__user')
+        }
+        items = [(invoice.id, invoice_pdf_data(invoice)) for invoice in invoices.values()]
+
+        # Forked workers must not inherit the open database connection
+        connection.close()
+        with multiprocessing.Pool(processes=max(options['workers'], 1)) as pool:
+            results = pool.map(_render, items)
+
+        now = timezone.now()
+        done, failed = [], []
+        for invoice_id, pdf_bytes, error in results:
+            invoice = invoices[invoice_id]
+            if error:
+                self.stderr.write(f'  {invoice.invoice_number}: {error}')
+                invoice.pdf_status = 'failed'
+                failed.append(invoice)
+                continue
+            invoice.pdf_file.name = default_storage.save(
+                f'invoices/invoice_{invoice.invoice_number}.pdf', ContentFile(pdf_bytes)
+            )
+            invoice.status = 'sent'
+            invoice.pdf_status = 'ready'
+            invoice.updated_at = now
+            done.append(invoice)
+
+        Invoice.objects.bulk_update(done, ['pdf_file', 'status', 'pdf_status', 'updated_at'])
+        Invoice.objects.bulk_update(failed, ['pdf_status'])
+
+        Notification.objects.bulk_create([
+            Notification(
+                user=invoice.booking.user,
+                title='Invoice ready',
+                message=f"Invoice {invoice.invoice_number} is ready to download and pay.",
+                link='/my-bookings/'
+            )
+            for invoice in done
+        ])
+
+        if not options['no_email'] and done:
+            # One SMTP connection for the whole batch
+            mail_connection = get_connection(fail_silently=True)
+            mail_connection.open()
+            try:
+                for invoice in done:
+                    _send_invoice_notification_email(invoice, connection=mail_connection)
+                    _send_invoice_to_host_email(invoice, connection=mail_connection)
+            finally:
+                mail_connection.close()
+
+        return len(done), len(failed)
@@ -0,0 +1,343 @@
+import logging
+import math
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from rooms.availability import month_masks
+from rooms.caching import bump_catalogue_version, bump_namespace
+from rooms.invoicing import PAYMENT_TERMS_DAYS, TAX_RATE
+from rooms.models import Booking, Invoice, Notification, Payment, Room, RoomOccupancy, UserProfile
+from rooms.sequences import format_invoice_number, invoice_sequence, payment_sequence
+
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = ['Aarav', 'Ananya', 'Rohan', 'Priya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Isha',
+               'John', 'Sarah', 'Mike', 'Emma', 'David', 'Olivia', 'Karan', 'Meera', 'Sanjay', 'Nisha']
+LAST_NAMES = ['Sharma', 'Patel', 'Singh', 'Kumar', 'Gupta', 'Reddy', 'Iyer', 'Nair', 'Mehta', 'Joshi',
+              'Smith', 'Johnson', 'Brown', 'Williams', 'Das', 'Rao', 'Kapoor', 'Chopra', 'Verma', 'Bose']
+# Ordered by popularity: listings and bookings follow a Zipf distribution over this list
+LOCATIONS = ['Koramangala, Bangalore', 'Andheri West, Mumbai', 'Hauz Khas, Delhi', 'Indiranagar, Bangalore',
+             'Powai, Mumbai', 'Gachibowli, Hyderabad', 'Viman Nagar, Pune', 'Salt Lake, Kolkata',
+             'Anna Nagar, Chennai', 'Sector 62, Noida', 'Bandra East, Mumbai', 'Whitefield, Bangalore',
+             'Banjara Hills, Hyderabad', 'Kothrud, Pune', 'Adyar, Chennai', 'Malviya Nagar, Jaipur',
+             'Navrangpura, Ahmedabad', 'Gomti Nagar, Lucknow', 'Kakkanad, Kochi', 'Downtown', 'Uptown', 'Old town']
+ROOM_KINDS = ['Studio', 'Single Room', 'Shared Room', '1BHK Apartment', '2BHK Apartment', 'PG Room', 'Loft',
+              'Suite']
+ADJECTIVES = ['Cozy', 'Spacious', 'Bright', 'Modern', 'Furnished', 'Quiet', 'Affordable', 'Premium']
+SENTENCES = [
+    'Fully furnished with a comfortable bed, wardrobe and study table.',
+    'High-speed WiFi and power backup included in the rent.',
+    'Walking distance to the metro station and bus stops.',
+    'Attached bathroom with 24x7 hot water.',
+    'Shared kitchen with refrigerator, microwave and RO water purifier.',
+    'Housekeeping twice a week and laundry service available.',
+    'Gated society with security, CCTV and visitor parking.',
+    'Close to IT parks, colleges, hospitals and shopping malls.',
+    'Balcony with plenty of natural light and cross ventilation.',
+    'Ideal for students and working professionals.',
+]
+BOOKING_STATUSES = {'approved': 55, 'pending': 20, 'rejected': 15, 'cancelled': 10}
+INVOICE_STATUSES = {'paid': 70, 'sent': 20, 'overdue': 10}
+PAYMENT_METHODS = {'razorpay': 70, 'card': 20, 'bank_transfer': 10}
+BOOKING_MONTHS = {1: 15, 3: 25, 6: 30, 11: 20, 12: 10}
+NOTIFICATION_TITLES = ['New booking request', 'Booking approved', 'Booking rejected', 'Booking cancelled',
+                       'Invoice generated', 'Payment received']
+# Models whose auto_now/auto_now_add fields are filled with generated history instead
+TIMESTAMPED_MODELS = [Room, Booking, Notification, Invoice, Payment]
+
+
+@contextmanager
+def explicit_timestamps():
+    """Let bulk_create keep the created_at/updated_at values set on each object"""
+    fields = [field for model in TIMESTAMPED_MODELS for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _zipf_weights(count, exponent=1.0):
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def _choice(rng, table):
+    return rng.choices(list(table), weights=list(table.values()))[0]
+
+
+def _split(total, parts, index):
+    """Share of total handled by one of parts workers"""
+    return total // parts + (1 if index < total % parts else 0)
+
+
+class _Shard:
+    """Generates one worker's slice of the dataset: its own users, rooms and their history"""
+
+    def __init__(self, index, options, log):
+        self.index = index
+        self.options = options
+        self.log = log
+        self.rng = random.Random(options['seed'] * 1000 + index)
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options['days'])
+        self.counts = {}
+
+    def _when(self):
+        """Uniformly random moment in the generated history"""
+        return self.start + (self.now - self.start) * self.rng.random()
+
+    def _insert(self, model, objs):
+        # One transaction per batch: far fewer fsyncs, and a failure loses only that batch
+        with transaction.atomic():
+            created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(objs)
+        return created
+
+    def run(self):
+        workers = self.options['workers']
+        users = _split(self.options['users'], workers, self.index)
+        rooms = _split(self.options['rooms'], workers, self.index)
+        bookings = _split(self.options['bookings'], workers, self.index)
+        notifications = _split(self.options['notifications'], workers, self.index)
+        if not users:
+            return self.counts
+
+        owners = max(1, math.ceil(users * self.options['owner_ratio']))
+        user_ids = self._users(users, owners)
+        owner_ids, tenant_ids = user_ids[:owners], user_ids[owners:] or user_ids
+        room_rows = self._rooms(rooms, owner_ids)
+        self._bookings(bookings, room_rows, tenant_ids)
+        self._notifications(notifications, user_ids)
+        return self.counts
+
+    def _users(self, count, owners):
+        prefix = self.options['prefix']
+        # Hashing is deliberately slow; every generated account shares one password
+        password = make_password('loadtest123')
+        ids = []
+        for offset in range(0, count, self.batch_size):
+            batch = []
+            for i in range(offset, min(offset + self.batch_size, count)):
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                username = f'{prefix}{self.index}-{i}'
+                # Listing rooms and managing their bookings requires staff status
+                batch.append(User(username=username, email=f'{username}@example.com', first_name=first,
+                                  last_name=last, password=password, is_staff=i < owners, date_joined=self._when()))
+            created = self._insert(User, batch)
+            self._insert(UserProfile, [
+                UserProfile(user_id=user.id, phone=f'9{self.rng.randrange(10 ** 9):09d}',
+                            email_verified=self.rng.random() < 0.9,
+                            staff_requested=offset + n < owners, staff_approved=offset + n < owners)
+                for n, user in enumerate(created)
+            ])
+            ids.extend(user.id for user in created)
+        self.log(f'  worker {self.index}: {len(ids)} users')
+        return ids
+
+    def _rooms(self, count, owner_ids):
+        """Insert rooms; returns (id, owner_id, price, popularity) per room"""
+        # A few owners list most rooms, and a few areas attract most listings
+        owner_weights = list(accumulate(_zipf_weights(len(owner_ids), 0.8)))
+        location_weights = list(accumulate(_zipf_weights(len(LOCATIONS))))
+        rows = []
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            owners = self.rng.choices(owner_ids, cum_weights=owner_weights, k=size)
+            batch = []
+            for owner_id in owners:
+                kind, location = self.rng.choice(ROOM_KINDS), self.rng.choices(LOCATIONS, cum_weights=location_weights)[0]
+                price = min(max(round(self.rng.lognormvariate(math.log(9000), 0.5) / 50) * 50, 1500), 150000)
+                created_at = self._when()
+                batch.append(Room(
+                    owner_id=owner_id,
+                    title=f'{self.rng.choice(ADJECTIVES)} {kind} in {location.split(",")[0]}',
+                    description=' '.join(self.rng.sample(SENTENCES, self.rng.randint(1, 6))),
+                    price=Decimal(price),
+                    location=location,
+                    # Half the rooms use the bundled photos, like rooms fixed by fix_room_images
+                    image=f'r{self.rng.randint(1, 11)}.jpg' if self.rng.random() < 0.5 else '',
+                    phone=f'9{self.rng.randrange(10 ** 9):09d}',
+                    email=f'owner{owner_id}@example.com',
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+            created = self._insert(Room, batch)
+            # Popularity drives the number of bookings a room receives (heavy tail)
+            rows.extend((room.id, room.owner_id, room.price, self.rng.paretovariate(1.5)) for room in created)
+        self.log(f'  worker {self.index}: {len(rows)} rooms')
+        return rows
+
+    def _bookings(self, count, room_rows, tenant_ids):
+        """Per room, a sequence of non-overlapping bookings; approved ones get invoices and payments"""
+        if not room_rows or not count:
+            return
+        per_room = [0] * len(room_rows)
+        popularity = list(accumulate(row[3] for row in room_rows))
+        for index in self.rng.choices(range(len(room_rows)), cum_weights=popularity, k=count):
+            per_room[index] += 1
+
+        pending, occupancy = [], []
+        for (room_id, owner_id, price, _), booking_count in zip(room_rows, per_room):
+            masks = {}
+            cursor = (self.start + timedelta(days=self.rng.randint(0, 90))).date()
+            for _ in range(booking_count):
+                months = _choice(self.rng, BOOKING_MONTHS)
+                # Most tenancies start on the 1st, which the availability bitmap relies on
+                start = cursor.replace(day=1) + relativedelta(months=1) if self.rng.random() < 0.6 else cursor
+                end = start + relativedelta(months=months)
+                status = _choice(self.rng, BOOKING_STATUSES)
+                requested = start - timedelta(days=self.rng.randint(1, 45))
+                created_at = (timezone.make_aware(datetime.combine(requested, datetime.min.time()))
+                              + timedelta(seconds=self.rng.randrange(86400)))
+                pending.append(Booking(room_id=room_id, user_id=self.rng.choice(tenant_ids), owner_id=owner_id,
+                                       start_date=start, end_date=end, months=months, total_rent=price * months,
+                                       status=status, created_at=created_at))
+                if status == 'approved':
+                    for year, mask in month_masks(start, end).items():
+                        masks[year] = masks.get(year, 0) | mask
+                cursor = end + timedelta(days=self.rng.randint(0, 60))
+            occupancy.extend(RoomOccupancy(room_id=room_id, year=year, months=mask) for year, mask in masks.items())
+
+            if len(pending) >= self.batch_size:
+                self._flush_bookings(pending)
+                pending = []
+            if len(occupancy) >= self.batch_size:
+                self._insert(RoomOccupancy, occupancy)
+                occupancy = []
+        if pending:
+            self._flush_bookings(pending)
+        if occupancy:
+            self._insert(RoomOccupancy, occupancy)
+        self.log(f"  worker {self.index}: {self.counts.get('Booking', 0)} bookings")
+
+    def _flush_bookings(self, bookings):
+        created = self._insert(Booking, bookings)
+        approved = [b for b in created if b.status == 'approved' and self.rng.random() < 0.9]
+        if not approved:
+            return
+        numbers = invoice_sequence.take(len(approved))
+        invoices = []
+        for booking, number in zip(approved, numbers):
+            tax_amount = booking.total_rent * TAX_RATE / Decimal('100')
+            issued = booking.created_at + timedelta(days=self.rng.randint(0, 3))
+            invoices.append(Invoice(
+                booking_id=booking.id, invoice_number=format_invoice_number(number),
+                issued_date=issued, due_date=issued.date() + timedelta(days=PAYMENT_TERMS_DAYS),
+                subtotal=booking.total_rent, tax_rate=TAX_RATE, tax_amount=tax_amount,
+                total_amount=booking.total_rent + tax_amount, status=_choice(self.rng, INVOICE_STATUSES),
+                created_at=issued, updated_at=issued,
+            ))
+        invoices = self._insert(Invoice, invoices)
+
+        payments = []
+        for invoice in invoices:
+            if invoice.status != 'paid':
+                continue
+            paid_at = invoice.issued_date + timedelta(hours=self.rng.randint(1, 24 * PAYMENT_TERMS_DAYS))
+            if self.rng.random() < 0.1:
+                # Some tenants need a second attempt
+                payments.append(Payment(invoice_id=invoice.id, payment_method=_choice(self.rng, PAYMENT_METHODS),
+                                        amount=invoice.total_amount, status='failed',
+                                        created_at=paid_at - timedelta(minutes=10), updated_at=paid_at))
+            payments.append(Payment(invoice_id=invoice.id, payment_method=_choice(self.rng, PAYMENT_METHODS),
+                                    amount=invoice.total_amount, status='completed', payment_date=paid_at,
+                                    created_at=paid_at, updated_at=paid_at))
+        completed = [p for p in payments if p.status == 'completed']
+        for payment, number in zip(completed, payment_sequence.take(len(completed))):
+            payment.transaction_id = f"TXN-{payment.payment_date.strftime('%Y%m%d')}-{number:09d}"
+        self._insert(Payment, payments)
+
+    def _notifications(self, count, user_ids):
+        # Active users receive most notifications
+        weights = list(accumulate(self.rng.paretovariate(1.2) for _ in user_ids))
+        for offset in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - offset)
+            batch = []
+            for user_id in self.rng.choices(user_ids, cum_weights=weights, k=size):
+                title = self.rng.choice(NOTIFICATION_TITLES)
+                batch.append(Notification(user_id=user_id, title=title, message=f'{title}.',
+                                          link='/my-bookings/', is_read=self.rng.random() < 0.75,
+                                          created_at=self._when()))
+            self._insert(Notification, batch)
+        self.log(f'  worker {self.index}: {count} notifications')
+
+
+def _run_shard(index, options):
+    """Worker process entry point; Django is already set up in the forked child.
+
+    Progress goes through logging: the child cannot share the command's stdout wrapper.
+    """
+    with explicit_timestamps():
+        counts = _Shard(index, options, logger.info).run()
+    connections.close_all()
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Generate a production-scale dataset of users, rooms, bookings, notifications, invoices and payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--rooms', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=200000,
+                            help='Invoices and payments follow from the approved bookings')
+        parser.add_argument('--notifications', type=int, default=300000)
+        parser.add_argument('--owner-ratio', type=float, default=0.1, help='Share of users who list rooms')
+        parser.add_argument('--days', type=int, default=730, help='Length of the generated history')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1, help='Parallel worker processes')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='load', help='Username prefix of the generated accounts')
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError('The database must return primary keys from bulk inserts')
+        if User.objects.filter(username__startswith=f"{options['prefix']}0-").exists():
+            raise CommandError(f"Users with prefix '{options['prefix']}' already exist; pass another --prefix")
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite allows one writer at a time; using a single worker'))
+            options['workers'] = 1
+        options['workers'] = max(options['workers'], 1)
+
+        # bulk_create sends no model signals, so the state the receivers keep in sync
+        # (occupancy bitmap, catalogue version) is written or bumped explicitly
+        started = time.perf_counter()
+        if options['workers'] == 1:
+            with explicit_timestamps():
+                results = [_Shard(0, options, self.stdout.write).run()]
+        else:
+            # Children must open their own connections rather than share the parent's sockets
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['workers']) as pool:
+                results = pool.starmap(_run_shard, [(index, options) for index in range(options['workers'])])
+        elapsed = time.perf_counter() - started
+
+        bump_catalogue_version()
+        bump_namespace('recommendations')
+
+        totals = {}
+        for counts in results:
+            for model, rows in counts.items():
+                totals[model] = totals.get(model, 0) + rows
+        for model, rows in totals.items():
+            self.stdout.write(f'  {model:<15} {rows:>10} rows')
+        total = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {total} rows in {elapsed:.1f}s with {options['workers']} worker(s): "
+            f'{total / max(elapsed, 1e-9):,.0f} rows/s'
+        ))
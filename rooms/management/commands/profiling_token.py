@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rooms.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = 'Print a token that lets a staff user profile requests (X-Profile header)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Staff user the token is valid for')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+        if not user.is_staff:
+            raise CommandError(f'{user.username} is not staff')
+        if not settings.PROFILING_ENABLED:
+            self.stderr.write(self.style.WARNING('PROFILING_ENABLED is off: requests will not be profiled'))
+        self.stdout.write(make_token(user))
+        self.stderr.write(f'Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds, only in {user.username}\'s session')
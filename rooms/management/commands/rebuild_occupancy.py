@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from rooms.availability import rebuild_occupancy
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly occupancy bitmap used by month-aligned availability searches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room', type=int, action='append', dest='rooms',
+                            help='Only rebuild this room (repeatable)')
+
+    def handle(self, *args, **options):
+        room_ids = options['rooms'] or list(Room.objects.order_by('id').values_list('id', flat=True))
+        for index, room_id in enumerate(room_ids, 1):
+            rebuild_occupancy(room_id)
+            if index % 1000 == 0:
+                self.stdout.write(f'  {index}/{len(room_ids)} rooms')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt occupancy for {len(room_ids)} room(s)'))
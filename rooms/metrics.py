@@ -0,0 +1,281 @@
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+# Request latency buckets in seconds, as used by the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry[name] = self
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _reset(self):
+        self._values = {}
+
+    def _snapshot(self):
+        return [[dict(zip(self.labelnames, key)), value] for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Current value per process; across processes only live ones are summed"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                entry = self._values[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            entry['buckets'][index] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent inside the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _snapshot(self):
+        return [[dict(zip(self.labelnames, key)), {**value, 'buckets': list(value['buckets'])}]
+                for key, value in self._values.items()]
+
+
+# --- Application metrics -----------------------------------------------------
+
+REQUEST_DURATION = Histogram('roombook_http_request_duration_seconds',
+                             'Time to handle a request, by URL name', ['view', 'method'])
+REQUESTS = Counter('roombook_http_requests_total', 'Requests handled, by URL name and status class',
+                   ['view', 'method', 'status'])
+REQUEST_QUERIES = Histogram('roombook_http_request_db_queries', 'Database queries per request, by URL name',
+                            ['view'], buckets=QUERY_COUNT_BUCKETS)
+DB_QUERIES = Counter('roombook_db_queries_total', 'Database queries run while handling requests', ['view'])
+DB_QUERY_SECONDS = Counter('roombook_db_query_seconds_total', 'Time spent in database queries during requests',
+                           ['view'])
+CACHE_LOOKUPS = Counter('roombook_cache_lookups_total', 'Application cache lookups', ['result'])
+EXTERNAL_CALL_DURATION = Histogram('roombook_external_call_duration_seconds',
+                                   'Calls to third-party services (openai, razorpay, google, smtp)', ['service'])
+EXTERNAL_CALL_ERRORS = Counter('roombook_external_call_errors_total',
+                               'Third-party calls that raised an exception', ['service'])
+ML_MODEL_LOAD = Histogram('roombook_ml_model_load_seconds', 'Loading the price prediction model from disk')
+ML_PREDICT = Histogram('roombook_ml_predict_seconds', 'Price predictions, including a model load on first use')
+RECOMMENDATIONS_BUILD = Histogram('roombook_recommendations_build_seconds',
+                                  'Building a user\'s room recommendations (cache misses only)')
+PDF_RENDER = Histogram('roombook_pdf_render_seconds', 'Rendering a PDF document', ['document'])
+BACKGROUND_JOBS = Gauge('roombook_background_jobs_pending',
+                        'Jobs handed to a worker pool and not finished yet', ['queue'])
+EMAIL_QUEUE = Gauge('roombook_email_queue_depth', 'Emails of a batch still waiting to be sent')
+NOTIFICATIONS = Counter('roombook_notifications_created_total', 'Notifications created, by title', ['title'])
+
+
+# --- Multiprocess aggregation -------------------------------------------------
+#
+# With METRICS_DIR set, every process writes its samples to its own JSON file
+# there (at most every METRICS_FLUSH_INTERVAL seconds) and /metrics adds up the
+# files of all processes: counters and histograms from every process that ever
+# ran, gauges only from live ones. Empty the directory when the server starts.
+
+_pid = os.getpid()
+_file_name = None
+_last_flush = 0.0
+
+
+def _after_fork():
+    """A forked worker starts from zero instead of re-reporting its parent's samples"""
+    global _lock, _pid, _file_name, _last_flush
+    # Another thread may have held the lock at fork time
+    _lock = threading.Lock()
+    _pid = os.getpid()
+    _file_name = None
+    _last_flush = 0.0
+    for metric in _registry.values():
+        metric._reset()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _snapshot():
+    with _lock:
+        return {
+            name: {'type': metric.kind, 'help': metric.documentation,
+                   'buckets': list(getattr(metric, 'buckets', ())), 'samples': metric._snapshot()}
+            for name, metric in _registry.items()
+        }
+
+
+def flush(force=False):
+    """Write this process's samples to METRICS_DIR (no-op without one)"""
+    global _file_name, _last_flush
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    if _file_name is None:
+        # The start time keeps a recycled pid from overwriting a dead process's totals
+        _file_name = f"{_pid}-{int(time.time() * 1000)}.json"
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'pid': _pid, 'metrics': _snapshot()}, f)
+    os.replace(tmp_path, os.path.join(directory, _file_name))
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush(force=True)
+    except Exception:
+        pass
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_processes():
+    directory = settings.METRICS_DIR
+    processes = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as f:
+                processes.append(json.load(f))
+        except (OSError, ValueError):
+            # Removed or half-written meanwhile
+            continue
+    return processes
+
+
+def collect():
+    """{name: {'type', 'help', 'buckets', 'samples'}} for this process or all of them"""
+    if not settings.METRICS_DIR:
+        return _snapshot()
+    flush(force=True)
+    merged = {}
+    for process in _read_processes():
+        live = None
+        for name, metric in process['metrics'].items():
+            if metric['type'] == 'gauge':
+                live = _is_alive(process['pid']) if live is None else live
+                if not live:
+                    continue
+            target = merged.setdefault(name, {**metric, 'samples': {}})
+            for labels, value in metric['samples']:
+                key = tuple(sorted(labels.items()))
+                if metric['type'] == 'histogram':
+                    total = target['samples'].setdefault(
+                        key, [labels, {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0}])[1]
+                    total['buckets'] = [a + b for a, b in zip(total['buckets'], value['buckets'])]
+                    total['sum'] += value['sum']
+                    total['count'] += value['count']
+                else:
+                    target['samples'].setdefault(key, [labels, 0])[1] += value
+    for metric in merged.values():
+        metric['samples'] = list(metric['samples'].values())
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels, **extra):
+    pairs = [*labels.items(), *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def render(metrics=None):
+    """Prometheus text exposition format (version 0.0.4)"""
+    metrics = collect() if metrics is None else metrics
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric['samples'], key=lambda sample: sorted(sample[0].items())):
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric['buckets'], math.inf], value['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {_number(cumulative)}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(value['count'])}")
+    return '\n'.join(lines) + '\n'
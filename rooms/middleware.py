@@ -0,0 +1,176 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from . import metrics as app_metrics
+from .compression import carries_secrets, choose_encoding, compress
+from .instrumentation import current_metrics, end_request, query_timer, start_request
+
+request_logger = logging.getLogger('rooms.requests')
+slow_request_logger = logging.getLogger('rooms.slow_requests')
+
+
+class RequestMetricsMiddleware:
+    """Time each request, its queries, cache lookups and third-party calls.
+
+    The totals go out as a Server-Timing header (when SERVER_TIMING is on) and
+    as one JSON line on the rooms.requests logger. Requests slower than
+    SLOW_REQUEST_MS are sampled into rooms.slow_requests together with their SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_timer))
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+
+        duration = metrics.elapsed()
+        if settings.SERVER_TIMING:
+            response.headers['Server-Timing'] = self._server_timing(metrics, duration)
+        entry = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'db_queries': metrics.db_count,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'external': {service: {'calls': calls, 'ms': round(seconds * 1000, 2)}
+                         for service, (calls, seconds) in metrics.external.items()},
+        }
+        request_logger.info(json.dumps(entry))
+        self._export(request, response, metrics, duration)
+        if duration * 1000 >= settings.SLOW_REQUEST_MS and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE:
+            entry['queries'] = [{'sql': sql, 'ms': ms} for sql, ms in metrics.queries]
+            entry['queries_truncated'] = metrics.db_count > len(metrics.queries)
+            slow_request_logger.warning(json.dumps(entry))
+        return response
+
+    def _export(self, request, response, metrics, duration):
+        match = request.resolver_match
+        # URL names keep the label set small; unnamed routes fall back to their pattern
+        view = (match.view_name or match.route) if match else 'unmatched'
+        app_metrics.REQUEST_DURATION.observe(duration, view=view, method=request.method)
+        app_metrics.REQUESTS.inc(view=view, method=request.method, status=f'{response.status_code // 100}xx')
+        app_metrics.REQUEST_QUERIES.observe(metrics.db_count, view=view)
+        app_metrics.DB_QUERIES.inc(metrics.db_count, view=view)
+        app_metrics.DB_QUERY_SECONDS.inc(metrics.db_time, view=view)
+        app_metrics.flush()
+
+    def _server_timing(self, metrics, duration):
+        timings = [
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_count} queries"',
+            f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+        ]
+        for service, (calls, seconds) in metrics.external.items():
+            timings.append(f'{service};dur={seconds * 1000:.1f};desc="{calls} calls"')
+        return ', '.join(timings)
+
+
+class ProfilingMiddleware:
+    """Profile single requests on demand for staff.
+
+    A request carrying a token from `manage.py profiling_token` in the
+    X-Profile header runs under cProfile, or the sampling profiler with
+    X-Profiler: sampling. The token is only read from the header, so it never
+    reaches access logs or cache keys built from the query string. The
+    profile and the request's SQL are stored in PROFILING_DIR and the response
+    names them in X-Profile-Id. Unless PROFILING_ENABLED is on the middleware
+    removes itself at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.headers.get('X-Profile')
+        if not token:
+            return self.get_response(request)
+
+        from . import profiling
+        profiler_name = request.headers.get('X-Profiler') or 'cprofile'
+        if profiler_name not in profiling.PROFILERS or not profiling.check_token(token, request.user):
+            return self._skipped(request, 'forbidden')
+        if not profiling.acquire():
+            return self._skipped(request, 'busy')
+        if not profiling.allow():
+            profiling.release()
+            return self._skipped(request, 'rate-limited')
+        try:
+            metrics = current_metrics()
+            first_query = len(metrics.queries) if metrics else 0
+            start = time.perf_counter()
+            profiler = profiling.start(profiler_name)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+            queries = metrics.queries[first_query:] if metrics else []
+            truncated = bool(metrics) and metrics.db_count > len(metrics.queries)
+            response['X-Profile-Id'] = profiling.save(profiler, profiler_name, request, response, duration,
+                                                      queries, truncated)
+            return response
+        finally:
+            profiling.release()
+
+    def _skipped(self, request, reason):
+        response = self.get_response(request)
+        response['X-Profile-Skipped'] = reason
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Brotli (when installed) or gzip for HTML and JSON responses over COMPRESSION_MIN_SIZE.
+
+    Streaming responses (file downloads, WhiteNoise static files) are left alone,
+    as are responses a view already encoded, e.g. pre-compressed catalogue bodies.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            self._weaken_etag(response)
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, secrets=carries_secrets(request, response))
+        if not encoding:
+            return response
+
+        compressed = compress(response.content, encoding)
+        # Return the compressed content only if it's actually shorter
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        self._weaken_etag(response)
+        return response
+
+    def _weaken_etag(self, response):
+        # A strong ETag must not be shared between encodings (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"') and response.get('Content-Encoding') in ('gzip', 'br'):
+            response.headers['ETag'] = 'W/' + etag
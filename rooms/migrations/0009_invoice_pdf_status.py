@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+def mark_existing_pdfs_ready(apps, schema_editor):
+    Invoice = apps.get_model('rooms', 'Invoice')
+    Invoice.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True).update(pdf_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0008_alter_payment_payment_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='pdf_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_pdfs_ready, migrations.RunPython.noop),
+    ]
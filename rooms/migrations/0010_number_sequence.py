@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+SEQUENCES = ['invoice', 'payment']
+
+
+def create_sequences(apps, schema_editor):
+    NumberSequence = apps.get_model('rooms', 'NumberSequence')
+    for name in SEQUENCES:
+        NumberSequence.objects.get_or_create(name=name)
+    if schema_editor.connection.vendor == 'postgresql':
+        for name in SEQUENCES:
+            schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS rooms_{name}_seq')
+
+
+def drop_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for name in SEQUENCES:
+            schema_editor.execute(f'DROP SEQUENCE IF EXISTS rooms_{name}_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0009_invoice_pdf_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_sequences, drop_sequences),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+OVERLAP_CONSTRAINT = 'rooms_booking_no_overlap'
+
+
+def add_overlap_constraint(apps, schema_editor):
+    # Postgres enforces non-overlapping approved bookings itself. Other databases
+    # rely on the check in rooms.availability.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.id, b.id FROM rooms_booking a JOIN rooms_booking b"
+            " ON a.room_id = b.room_id AND a.id < b.id"
+            " AND a.start_date < b.end_date AND b.start_date < a.end_date"
+            " WHERE a.status = 'approved' AND b.status = 'approved' ORDER BY a.id, b.id"
+        )
+        overlaps = cursor.fetchall()
+    if overlaps:
+        # Migrating without the constraint would silently leave double bookings possible
+        pairs = ', '.join(f'{a}/{b}' for a, b in overlaps[:50])
+        more = f' and {len(overlaps) - 50} more' if len(overlaps) > 50 else ''
+        raise RuntimeError(
+            f"Cannot add {OVERLAP_CONSTRAINT}: these approved bookings overlap: {pairs}{more}. "
+            "Reject or cancel one booking of each pair, then run migrate again."
+        )
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f"ALTER TABLE rooms_booking ADD CONSTRAINT {OVERLAP_CONSTRAINT} EXCLUDE USING gist "
+        "(room_id WITH =, daterange(start_date, end_date, '[)') WITH &&) WHERE (status = 'approved')"
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'ALTER TABLE rooms_booking DROP CONSTRAINT IF EXISTS {OVERLAP_CONSTRAINT}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0010_number_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['room', 'start_date', 'end_date'], name='booking_approved_period_idx'),
+        ),
+        migrations.RunPython(add_overlap_constraint, drop_overlap_constraint),
+    ]
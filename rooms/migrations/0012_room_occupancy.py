@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from dateutil.relativedelta import relativedelta
+
+
+def build_occupancy(apps, schema_editor):
+    Booking = apps.get_model('rooms', 'Booking')
+    RoomOccupancy = apps.get_model('rooms', 'RoomOccupancy')
+    masks = {}
+    for room_id, start, end in Booking.objects.filter(status='approved').values_list('room_id', 'start_date', 'end_date'):
+        month = start.replace(day=1)
+        while month < end:
+            key = (room_id, month.year)
+            masks[key] = masks.get(key, 0) | 1 << (month.month - 1)
+            month += relativedelta(months=1)
+    RoomOccupancy.objects.bulk_create([
+        RoomOccupancy(room_id=room_id, year=year, months=mask) for (room_id, year), mask in masks.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0011_booking_availability'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('months', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['price'], name='room_price_idx'),
+        ),
+        migrations.AddField(
+            model_name='roomoccupancy',
+            name='room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='rooms.room'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomoccupancy',
+            constraint=models.UniqueConstraint(fields=('room', 'year'), name='room_occupancy_year_unique'),
+        ),
+        migrations.RunPython(build_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_catalogue_version(apps, schema_editor):
+    NumberSequence = apps.get_model('rooms', 'NumberSequence')
+    NumberSequence.objects.get_or_create(name='catalogue', defaults={'value': 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0013_booking_transition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='numbersequence',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(create_catalogue_version, migrations.RunPython.noop),
+    ]
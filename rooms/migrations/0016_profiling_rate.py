@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:05
+
+from django.db import migrations
+
+
+def create_profiling_rate(apps, schema_editor):
+    # Created up front so concurrent profiled requests never race to insert it
+    NumberSequence = apps.get_model('rooms', 'NumberSequence')
+    NumberSequence.objects.get_or_create(name='profiling-rate', defaults={'value': 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0015_room_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_profiling_rate, migrations.RunPython.noop),
+    ]
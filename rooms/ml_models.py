@@ -9,6 +9,7 @@ import joblib
 import os
 from django.conf import settings
 from django.db import models
+from .metrics import ML_MODEL_LOAD, ML_PREDICT
 from .models import Room, Booking
 
 class PriceRecommendationSystem:
@@ -90,9 +91,10 @@ class PriceRecommendationSystem:
                 else:
                     df_processed[f'{col}_encoded'] = self.encoders[col].transform(df_processed[col].astype(str))
         
-        # Select feature columns
-        feature_columns = [col for col in df_processed.columns if col != self.target_column]
-        feature_columns = [col for col in feature_columns if not col.endswith('_encoded') or col.replace('_encoded', '') in categorical_columns]
+        # Select feature columns: numeric ones only, categorical columns go in encoded (once)
+        feature_columns = [col for col in df_processed.columns
+                           if col != self.target_column and col not in categorical_columns
+                           and not col.endswith('_encoded')]
         
         # Add encoded columns
         for col in categorical_columns:
@@ -158,6 +160,10 @@ class PriceRecommendationSystem:
     
     def predict_price(self, room_features):
         """Predict optimal price for a room"""
+        with ML_PREDICT.time():
+            return self._predict_price(room_features)
+
+    def _predict_price(self, room_features):
         try:
             if not hasattr(self, 'best_model'):
                 self.load_models()
@@ -165,6 +171,9 @@ class PriceRecommendationSystem:
             # Prepare features
             df = pd.DataFrame([room_features])
             
+            if 'title' in room_features:
+                df['title_length'] = len(room_features['title'])
+            
             # Extract location features
             if 'location' in room_features:
                 location_features = self._extract_location_features(room_features['location'])
@@ -183,8 +192,8 @@ class PriceRecommendationSystem:
                     else:
                         df[f'{col}_encoded'] = 0
             
-            # Select and scale features
-            X = df[self.feature_columns].fillna(0)
+            # Select and scale features; booking history is unknown for a new room
+            X = df.reindex(columns=self.feature_columns).fillna(0)
             X_scaled = self.scalers['scaler'].transform(X)
             
             # Make prediction
@@ -218,6 +227,10 @@ class PriceRecommendationSystem:
     
     def load_models(self):
         """Load trained models from disk"""
+        with ML_MODEL_LOAD.time():
+            return self._load_models()
+
+    def _load_models(self):
         try:
             models_dir = os.path.join(settings.BASE_DIR, 'ml_models')
             
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Room(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rooms')
@@ -8,11 +9,19 @@ class Room(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     location = models.CharField(max_length=300)
     image = models.ImageField(upload_to='room_images/', null=True, blank=True)
+    # Resized copies of image written by rooms.image_worker:
+    # {'source': image name, 'variants': {'thumb': {'width': .., 'files': {'webp': name, ...}}, ...}}
+    image_variants = models.JSONField(default=dict, blank=True)
     phone = models.CharField(max_length=20, blank=True)
     email = models.EmailField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['price'], name='room_price_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -34,6 +43,13 @@ class Booking(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Availability lookups only ever look at approved bookings of one room
+            models.Index(fields=['room', 'start_date', 'end_date'], condition=models.Q(status='approved'),
+                         name='booking_approved_period_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.room.title} ({self.status})"
 
@@ -78,6 +94,11 @@ class Invoice(models.Model):
         ('overdue', 'Overdue'),
     ], default='draft')
     pdf_file = models.FileField(upload_to='invoices/', null=True, blank=True)
+    pdf_status = models.CharField(max_length=20, choices=[
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ], default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -112,3 +133,51 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment {self.id} - {self.invoice.invoice_number} ({self.status})"
+
+class NumberSequence(models.Model):
+    """Counter row used to hand out invoice and payment numbers on databases without sequences.
+
+    Also holds version counters such as the catalogue version behind the room list ETags, and
+    the profiling rate limit counter.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class RoomOccupancy(models.Model):
+    """Months of one year in which a room has an approved booking, one bit per month (January is bit 0)"""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='occupancy')
+    year = models.PositiveSmallIntegerField()
+    months = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'year'], name='room_occupancy_year_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} {self.year}: {self.months:012b}"
+
+
+class BookingTransition(models.Model):
+    """Append-only log of booking status changes"""
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='booking_transitions')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Booking transitions cannot be changed once recorded')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Booking {self.booking_id}: {self.from_status} -> {self.to_status}"
@@ -0,0 +1,299 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.core import mail
+from django.conf import settings
+import logging
+import random
+from . import metrics
+from .instrumentation import external_call, timed_external
+
+logger = logging.getLogger(__name__)
+
+# Time spent talking to the mail server shows up in the request metrics
+send_mail = timed_external('smtp')(mail.send_mail)
+
+_executor = None
+
+
+def _get_executor():
+    """Create the email process pool on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.EMAIL_WORKERS)
+    return _executor
+
+
+def email_configured():
+    """False when the SMTP backend has no credentials; emails are skipped then"""
+    if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+        return bool(settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD)
+    return True
+
+
+def _generate_otp():
+    return f"{random.randint(0, 999999):06d}"
+
+def _send_otp_email(to_email, otp):
+    if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+        if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+            raise RuntimeError('Email is not configured. Set EMAIL_HOST_USER and EMAIL_HOST_PASSWORD in environment variables.')
+    send_mail(
+        subject='RoomBook Email Verification OTP',
+        message=f"Your RoomBook OTP is: {otp}. It will expire in 10 minutes.",
+        from_email=settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+        recipient_list=[to_email],
+        fail_silently=False,
+    )
+
+def _booking_notification_message(booking, status):
+    """(subject, message, from_email, recipient_list) telling the user about a booking status change"""
+    subject = f'RoomBook - Booking {status.title()}'
+    message = f"""
+Dear {booking.user.get_full_name() or booking.user.username},
+
+Your booking for "{booking.room.title}" has been {status}.
+
+Booking Details:
+- Room: {booking.room.title}
+- Location: {booking.room.location}
+- Start Date: {booking.start_date}
+- End Date: {booking.end_date}
+- Total Rent: ${booking.total_rent}
+
+{status == 'approved' and 'You can now create an invoice and proceed with payment.' or 'Please contact the room owner for more information.'}
+
+Thank you for using RoomBook!
+"""
+    return subject, message, settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER, [booking.user.email]
+
+def _send_booking_notification_email(booking, status, connection=None):
+    """Send email notification to user about booking status change"""
+    try:
+        if not email_configured():
+            # Skip email if not configured, but don't raise error
+            return
+        
+        subject, message, from_email, recipient_list = _booking_notification_message(booking, status)
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipient_list=recipient_list,
+            fail_silently=True,  # Don't fail the booking process if email fails
+            connection=connection,
+        )
+    except Exception as e:
+        # Log error but don't fail the booking process
+        logger.warning("Failed to send booking notification email: %s", e)
+
+def send_messages(messages):
+    """Send (subject, message, from_email, recipient_list) tuples over one SMTP connection"""
+    with external_call('smtp'):
+        return mail.send_mass_mail(messages, fail_silently=True)
+
+def _on_emails_sent(count, future):
+    """Executor callback: runs in the parent process once the worker is done"""
+    metrics.BACKGROUND_JOBS.dec(queue='email')
+    metrics.EMAIL_QUEUE.dec(count)
+    error = future.exception()
+    if error is not None:
+        logger.warning("Failed to send %s booking notification emails: %s", count, error, exc_info=error)
+
+def enqueue_booking_emails(bookings, status):
+    """Send the status emails of a batch of bookings from the email worker pool.
+
+    The messages are built here, so the worker never touches the DB. With
+    EMAIL_WORKERS = 0 they are sent inline.
+    """
+    if not email_configured():
+        return
+    messages = [_booking_notification_message(booking, status) for booking in bookings]
+    metrics.EMAIL_QUEUE.inc(len(messages))
+    if settings.EMAIL_WORKERS <= 0:
+        try:
+            send_messages(messages)
+        except Exception as e:
+            logger.warning("Failed to send %s booking notification emails: %s", len(messages), e)
+        finally:
+            metrics.EMAIL_QUEUE.dec(len(messages))
+        return
+
+    metrics.BACKGROUND_JOBS.inc(queue='email')
+    future = _get_executor().submit(send_messages, messages)
+    future.add_done_callback(lambda f: _on_emails_sent(len(messages), f))
+
+def _send_invoice_to_host_email(invoice, connection=None):
+    """Send email notification to host/owner about invoice creation"""
+    try:
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+            if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+                # Skip email if not configured, but don't raise error
+                return
+        
+        booking = invoice.booking
+        subject = f'RoomBook - New Invoice Created for {booking.room.title}'
+        message = f"""
+Dear {booking.room.owner.get_full_name() or booking.room.owner.username},
+
+An invoice has been generated for your approved booking.
+
+Booking Details:
+- Room: {booking.room.title}
+- Guest: {booking.user.get_full_name() or booking.user.username}
+- Email: {booking.user.email}
+- Period: {booking.start_date} to {booking.end_date}
+- Duration: {booking.months} month(s)
+
+Invoice Details:
+- Invoice Number: {invoice.invoice_number}
+- Subtotal: ${invoice.subtotal:.2f}
+- Tax Amount: ${invoice.tax_amount:.2f}
+- Total Amount: ${invoice.total_amount:.2f}
+- Due Date: {invoice.due_date}
+
+The guest has been notified and can proceed with payment via Razorpay.
+
+Thank you for using RoomBook!
+"""
+        
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+            recipient_list=[booking.room.owner.email],
+            fail_silently=True,  # Don't fail the invoice process if email fails
+            connection=connection,
+        )
+    except Exception as e:
+        # Log error but don't fail the invoice process
+        logger.warning("Failed to send host invoice notification email: %s", e)
+
+def _send_payment_confirmation_email(payment):
+    """Send tax invoice email after successful payment"""
+    try:
+        logger.debug("Email backend: %s", settings.EMAIL_BACKEND)
+        
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+            if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+                logger.warning("Email credentials not configured")
+                return
+        
+        invoice = payment.invoice
+        subject = f'TAX INVOICE - {invoice.invoice_number}'
+        message = f"""
+-----------------------------------------
+                TAX INVOICE
+-----------------------------------------
+
+Room Rental System
+Address
+Phone | Email
+
+Invoice No: {invoice.invoice_number}
+Date: {invoice.issued_date.strftime('%d-%m-%Y')}
+
+Customer Details:
+-----------------------------------------
+Name: {invoice.booking.user.get_full_name() or invoice.booking.user.username}
+Room No: {invoice.booking.room.room_number if hasattr(invoice.booking.room, 'room_number') else invoice.booking.room.title}
+Room Type: {invoice.booking.room.room_type if hasattr(invoice.booking.room, 'room_type') else 'Standard'}
+
+Stay Duration:
+-----------------------------------------
+Check-in: {invoice.booking.check_in.strftime('%d-%m-%Y')}
+Check-out: {invoice.booking.check_out.strftime('%d-%m-%Y')}
+Total Nights: {(invoice.booking.check_out - invoice.booking.check_in).days}
+
+Final Charges:
+-----------------------------------------
+Room Rent                     ${invoice.subtotal:.2f}
+Tax Amount                    ${invoice.tax_amount:.2f}
+-----------------------------------------
+Grand Total                   ${invoice.total_amount:.2f}
+
+Payment Details:
+-----------------------------------------
+Payment Mode: {payment.get_payment_method_display()}
+Payment Status: PAID
+Transaction ID: {payment.transaction_id or 'N/A'}
+Payment Date: {payment.payment_date.strftime('%d-%m-%Y %H:%M:%S') if payment.payment_date else 'N/A'}
+
+Thank You for Staying With Us!
+
+Authorized Signature
+-----------------------------------------
+"""
+        
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+            recipient_list=[invoice.booking.user.email],
+            fail_silently=False,
+        )
+        logger.debug("Tax invoice email sent for invoice %s", invoice.invoice_number)
+    except Exception as e:
+        logger.warning("Failed to send tax invoice email: %s", e)
+
+def _send_invoice_notification_email(invoice, connection=None):
+    """Send proforma invoice email to user about invoice creation"""
+    try:
+        logger.debug("Email backend: %s", settings.EMAIL_BACKEND)
+        
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+            if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+                logger.warning("Email credentials not configured")
+                return
+        
+        subject = f'PROFORMA INVOICE - {invoice.invoice_number}'
+        message = f"""
+-----------------------------------------
+            PROFORMA INVOICE
+-----------------------------------------
+
+Room Rental System
+Address
+Phone | Email
+
+Proforma Invoice No: {invoice.invoice_number}
+Date: {invoice.issued_date.strftime('%d-%m-%Y')}
+
+Customer Name: {invoice.booking.user.get_full_name() or invoice.booking.user.username}
+Contact Number: {invoice.booking.user.phone_number if hasattr(invoice.booking.user, 'phone_number') else 'N/A'}
+Email: {invoice.booking.user.email}
+
+Room Details:
+-----------------------------------------
+Room Number: {invoice.booking.room.room_number if hasattr(invoice.booking.room, 'room_number') else invoice.booking.room.title}
+Room Type: {invoice.booking.room.room_type if hasattr(invoice.booking.room, 'room_type') else 'Standard'}
+Check-in Date: {invoice.booking.check_in.strftime('%d-%m-%Y')}
+Check-out Date: {invoice.booking.check_out.strftime('%d-%m-%Y')}
+Total Nights: {(invoice.booking.check_out - invoice.booking.check_in).days}
+
+Charges:
+-----------------------------------------
+Room Rent                     ${invoice.subtotal:.2f}
+Tax Amount                    ${invoice.tax_amount:.2f}
+-----------------------------------------
+Total Estimated Amount        ${invoice.total_amount:.2f}
+
+Note:
+• This is a Proforma Invoice
+• Amount is subject to change
+• Payment required to confirm booking
+• Status: NOT PAID
+
+Authorized Signature
+-----------------------------------------
+"""
+        
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER,
+            recipient_list=[invoice.booking.user.email],
+            fail_silently=False,
+            connection=connection,
+        )
+        logger.debug("Proforma invoice email sent for invoice %s", invoice.invoice_number)
+    except Exception as e:
+        logger.warning("Failed to send proforma invoice email: %s", e)
@@ -0,0 +1,217 @@
+import cProfile
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import NumberSequence
+
+TOKEN_SALT = 'rooms.profiling'
+# NumberSequence row counting the profiles of the current rate window, which started at its updated_at
+RATE_SEQUENCE = 'profiling-rate'
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$')
+PROFILERS = ('cprofile', 'sampling')
+# Extension of the profile file written by each profiler
+PROFILE_EXTENSIONS = {'cprofile': '.pstats', 'sampling': '.speedscope.json'}
+
+# cProfile allows one active profiler per process, and one profile at a time is plenty
+_busy = threading.Lock()
+
+
+def make_token(user):
+    """Signed token that lets this staff user profile requests for PROFILING_TOKEN_MAX_AGE seconds"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def check_token(token, user):
+    try:
+        user_pk = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return user.is_authenticated and user.is_staff and user_pk == str(user.pk)
+
+
+def allow():
+    """Count a profile against PROFILING_RATE_LIMIT per PROFILING_RATE_WINDOW, shared by all workers"""
+    now = timezone.now()
+    with transaction.atomic():
+        # Update first so SQLite takes its write lock up front; other backends lock the row
+        restarted = NumberSequence.objects.filter(
+            name=RATE_SEQUENCE, updated_at__lte=now - timedelta(seconds=settings.PROFILING_RATE_WINDOW)
+        ).update(value=1, updated_at=now)
+        if not restarted and not NumberSequence.objects.filter(name=RATE_SEQUENCE).update(value=F('value') + 1):
+            # Migration 0016 creates the row; this only runs if it was deleted since
+            try:
+                with transaction.atomic():
+                    NumberSequence.objects.create(name=RATE_SEQUENCE, value=1, updated_at=now)
+            except IntegrityError:
+                # A concurrent request created it first
+                NumberSequence.objects.filter(name=RATE_SEQUENCE).update(value=F('value') + 1)
+        count = NumberSequence.objects.get(name=RATE_SEQUENCE).value
+    return count <= settings.PROFILING_RATE_LIMIT
+
+
+def acquire():
+    return _busy.acquire(blocking=False)
+
+
+def release():
+    _busy.release()
+
+
+class SamplingProfiler:
+    """Samples the profiled thread's stack from a helper thread every PROFILING_SAMPLE_INTERVAL.
+
+    Unlike cProfile it does not slow down every function call, so timings of
+    the profiled request stay close to the real ones.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or settings.PROFILING_SAMPLE_INTERVAL
+        self.frames = []
+        self._frame_index = {}
+        self.samples = []
+        self.weights = []
+
+    def enable(self):
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._start = self._last = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+        self._end = time.perf_counter()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append(now - self._last)
+            self._last = now
+
+    def _frame(self, code):
+        key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({'name': key[0], 'file': key[1], 'line': key[2]})
+        return index
+
+    def speedscope(self, name):
+        """Profile in speedscope's file format (https://www.speedscope.app)"""
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'roombook',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled', 'name': name, 'unit': 'seconds',
+                'startValue': 0, 'endValue': self._end - self._start,
+                'samples': self.samples, 'weights': self.weights,
+            }],
+        }
+
+
+def start(profiler_name):
+    profiler = cProfile.Profile() if profiler_name == 'cprofile' else SamplingProfiler()
+    profiler.enable()
+    return profiler
+
+
+def _profile_dir():
+    path = str(settings.PROFILING_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save(profiler, profiler_name, request, response, duration, queries, truncated):
+    """Write the profile and its metadata (with the SQL) to PROFILING_DIR; returns the profile id"""
+    profile_id = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    directory = _profile_dir()
+    name = f"{request.method} {request.path}"
+    if profiler_name == 'cprofile':
+        profiler.dump_stats(os.path.join(directory, profile_id + PROFILE_EXTENSIONS['cprofile']))
+    else:
+        with open(os.path.join(directory, profile_id + PROFILE_EXTENSIONS['sampling']), 'w') as f:
+            json.dump(profiler.speedscope(name), f)
+    metadata = {
+        'id': profile_id,
+        'profiler': profiler_name,
+        'method': request.method,
+        'path': request.path,
+        'query_string': request.META.get('QUERY_STRING', ''),
+        'user': request.user.username,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'created_at': timezone.now().isoformat(),
+        'queries': [{'sql': sql, 'ms': ms} for sql, ms in queries],
+        'queries_truncated': truncated,
+    }
+    # Metadata last: list_profiles only shows profiles whose files are complete
+    with open(os.path.join(directory, f"{profile_id}.json"), 'w') as f:
+        json.dump(metadata, f)
+    prune()
+    return profile_id
+
+
+def _metadata_files():
+    return sorted(glob.glob(os.path.join(_profile_dir(), '*.json')))
+
+
+def _is_metadata(path):
+    return PROFILE_ID_RE.match(os.path.basename(path)[:-len('.json')])
+
+
+def prune():
+    """Delete all but the newest PROFILING_MAX_PROFILES profiles"""
+    stale = [path for path in _metadata_files() if _is_metadata(path)][:-settings.PROFILING_MAX_PROFILES or None]
+    for path in stale:
+        profile_id = os.path.basename(path)[:-len('.json')]
+        for extension in ('.json', *PROFILE_EXTENSIONS.values()):
+            try:
+                os.remove(os.path.join(_profile_dir(), profile_id + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """Metadata of the stored profiles, newest first"""
+    profiles = []
+    for path in reversed(_metadata_files()):
+        if not _is_metadata(path):
+            continue
+        try:
+            with open(path) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_file(profile_id):
+    """(path, profiler) of a stored profile, or None"""
+    if not PROFILE_ID_RE.match(profile_id or ''):
+        return None
+    for profiler_name, extension in PROFILE_EXTENSIONS.items():
+        path = os.path.join(_profile_dir(), profile_id + extension)
+        if os.path.exists(path):
+            return path, profiler_name
+    return None
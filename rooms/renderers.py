@@ -0,0 +1,20 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# Dates and times go through DRF's encoder so they are formatted exactly as before
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in JSONRenderer that encodes with orjson; indented output still uses the stdlib encoder"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        ret = orjson.dumps(data, default=encoder.default, option=ORJSON_OPTIONS)
+        # Same as JSONRenderer: these are valid JSON but break JavaScript string literals
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,73 @@
+import threading
+from importlib import import_module
+from django.conf import settings
+
+
+class LazyView:
+    """URL callback that imports its view module on the first request.
+
+    Attribute lookups (csrf_exempt, cls, ...) are forwarded to the real view,
+    so middleware sees the same flags it would on an eagerly imported view.
+    """
+
+    def __init__(self, dotted_path):
+        self.dotted_path = dotted_path
+        self.__module__, self.__name__ = dotted_path.rsplit('.', 1)
+        self.__qualname__ = self.__name__
+        self._view = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = getattr(import_module(self.__module__), self.__name__)
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Dunder lookups and view_class (used by URL introspection) must not force an import
+        if name.startswith('__') or (name == 'view_class' and self._view is None):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        return f"<LazyView {self.dotted_path}>"
+
+
+_registry = []
+
+
+def lazy(dotted_path):
+    view = LazyView(dotted_path)
+    _registry.append(view)
+    return view
+
+
+# Third-party stacks only needed by some views; 'all' warm-up imports them too
+HEAVY_MODULES = [
+    'rooms.ml_models',
+    'rooms.genai_chatbot',
+    'rooms.ai_negotiation',
+    'reportlab.platypus',
+]
+
+
+def preload(level=None):
+    """Import view modules ahead of the first request.
+
+    level is PRELOAD_VIEWS by default: 'none' keeps the minimal footprint,
+    'views' imports every view module, 'all' also imports the ML, LLM and PDF
+    stacks so forked workers share them copy-on-write.
+    """
+    level = level or settings.PRELOAD_VIEWS
+    if level not in ('views', 'all'):
+        return
+    import_module(settings.ROOT_URLCONF)
+    for view in _registry:
+        view.resolve()
+    if level == 'all':
+        for module in HEAVY_MODULES:
+            import_module(module)
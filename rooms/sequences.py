@@ -0,0 +1,83 @@
+import os
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import NumberSequence
+
+
+def _reserve_from_sequence(name, count):
+    """Postgres: nextval() is non-transactional, so values are never handed out twice"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s) FROM generate_series(1, %s)', [f'rooms_{name}_seq', count])
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _reserve_from_table(name, count):
+    """Other databases: bump the counter row under a write lock and return the new range"""
+    with transaction.atomic():
+        # Update first so SQLite takes its write lock up front; other backends lock the row
+        updated = NumberSequence.objects.filter(name=name).update(value=F('value') + count)
+        if not updated:
+            NumberSequence.objects.create(name=name, value=count)
+        end = NumberSequence.objects.get(name=name).value
+    return list(range(end - count + 1, end + 1))
+
+
+def reserve(name, count):
+    """Reserve count fresh values of the named sequence straight from the database"""
+    if connection.vendor == 'postgresql':
+        return _reserve_from_sequence(name, count)
+    return _reserve_from_table(name, count)
+
+
+class BlockAllocator:
+    """Hands out sequence values from a block reserved per worker process.
+
+    Only one database round trip is needed per SEQUENCE_BLOCK_SIZE values, so
+    busy workers never contend on the counter row. Values left in a block when
+    a worker exits are skipped, leaving gaps but never duplicates.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pid = None
+        self._values = []
+
+    def take(self, count=1):
+        # Reservations inside a transaction could be rolled back on databases
+        # without real sequences, so those are never cached for later use
+        if connection.in_atomic_block and connection.vendor != 'postgresql':
+            return reserve(self.name, count)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not reuse its parent's block
+                self._pid = os.getpid()
+                self._values = []
+            if len(self._values) < count:
+                needed = count - len(self._values)
+                self._values.extend(reserve(self.name, max(needed, settings.SEQUENCE_BLOCK_SIZE)))
+            taken, self._values = self._values[:count], self._values[count:]
+            return taken
+
+    def next(self):
+        return self.take(1)[0]
+
+
+invoice_sequence = BlockAllocator('invoice')
+payment_sequence = BlockAllocator('payment')
+
+
+def format_invoice_number(value):
+    return f"INV-{timezone.now().strftime('%Y%m')}-{value:07d}"
+
+
+def next_invoice_number():
+    return format_invoice_number(invoice_sequence.next())
+
+
+def next_transaction_id():
+    return f"TXN-{timezone.now().strftime('%Y%m%d')}-{payment_sequence.next():09d}"
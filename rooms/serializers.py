@@ -1,7 +1,10 @@
 from rest_framework import serializers
-from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db.models.functions import Substr
+from django.utils.encoding import filepath_to_uri, iri_to_uri
 from django.contrib.auth.models import User
 from .models import Room, Booking, UserProfile, Notification, Invoice, Payment
+from .storage import is_static_fallback, static_fallback_url
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -13,12 +16,15 @@ class RoomSerializer(serializers.ModelSerializer):
     owner_phone = serializers.CharField(source='phone', read_only=True)
     owner_email = serializers.CharField(source='email', read_only=True)
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Room
-        fields = ['id', 'title', 'description', 'price', 'location', 'image', 'image_url',
-                  'phone', 'email', 'owner', 'owner_name', 'owner_phone', 'owner_email', 'created_at']
-        read_only_fields = ['owner', 'created_at', 'image_url', 'owner_name', 'owner_phone', 'owner_email']
+        fields = ['id', 'title', 'description', 'price', 'location', 'image', 'image_url', 'thumbnail_url',
+                  'image_srcset', 'phone', 'email', 'owner', 'owner_name', 'owner_phone', 'owner_email', 'created_at']
+        read_only_fields = ['owner', 'created_at', 'image_url', 'thumbnail_url', 'image_srcset',
+                            'owner_name', 'owner_phone', 'owner_email']
     
     def get_owner_name(self, obj):
         return f"{obj.owner.first_name} {obj.owner.last_name}".strip() or obj.owner.username
@@ -28,16 +34,169 @@ class RoomSerializer(serializers.ModelSerializer):
             return None
 
         request = self.context.get('request')
-        name = (getattr(obj.image, 'name', '') or '').lstrip('/')
+        name = getattr(obj.image, 'name', '') or ''
 
-        if name and '/' not in name and name.lower().startswith('r') and name.lower().endswith('.jpg'):
-            rel = f"images/about/{name}"
-            url = f"{settings.STATIC_URL}{rel}"
+        if is_static_fallback(name):
+            url = static_fallback_url(name)
             return request.build_absolute_uri(url) if request else url
 
         url = obj.image.url
         return request.build_absolute_uri(url) if request else url
 
+    def _variant_url(self, name):
+        request = self.context.get('request')
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    def get_thumbnail_url(self, obj):
+        return thumbnail_url(current_variants(obj.image_variants, obj.image.name), self._variant_url)
+
+    def get_image_srcset(self, obj):
+        return image_srcset(current_variants(obj.image_variants, obj.image.name), self._variant_url)
+
+
+def current_variants(image_variants, image_name):
+    """Resized variants of image_name; those of a replaced image are ignored until the new ones exist"""
+    if not image_variants or image_variants.get('source') != image_name:
+        return {}
+    return image_variants.get('variants', {})
+
+
+# Formats an <img> can fall back to, most widely supported first
+THUMBNAIL_FORMATS = ('jpeg', 'webp', 'avif')
+
+
+def thumbnail_url(variants, url):
+    """URL of the smallest variant, as JPEG when it was generated; None to use the original image"""
+    for variant in variants.values():
+        files = variant['files']
+        fmt = next((fmt for fmt in THUMBNAIL_FORMATS if fmt in files), next(iter(files), None))
+        return url(files[fmt]) if fmt else None
+    return None
+
+
+def image_srcset(variants, url):
+    """{format: 'url 320w, url 640w, ...'} for <picture> sources, or None"""
+    if not variants:
+        return None
+    srcset = {}
+    for variant in variants.values():
+        for fmt, name in variant['files'].items():
+            srcset.setdefault(fmt, []).append(f"{url(name)} {variant['width']}w")
+    return {fmt: ', '.join(entries) for fmt, entries in srcset.items()}
+
+
+# Columns each RoomSerializer field is built from
+ROOM_FIELD_COLUMNS = {
+    'id': ['id'],
+    'title': ['title'],
+    'description': ['description'],
+    'price': ['price'],
+    'location': ['location'],
+    'image': ['image'],
+    'image_url': ['image'],
+    'thumbnail_url': ['image', 'image_variants'],
+    'image_srcset': ['image', 'image_variants'],
+    'phone': ['phone'],
+    'email': ['email'],
+    'owner': ['owner_id'],
+    'owner_name': ['owner__username', 'owner__first_name', 'owner__last_name'],
+    'owner_phone': ['phone'],
+    'owner_email': ['email'],
+    'created_at': ['created_at'],
+}
+
+# Named response shapes for room lists; 'card' is what the room list page renders
+ROOM_VIEWS = {
+    'card': ['id', 'title', 'description', 'price', 'location', 'image_url', 'thumbnail_url', 'image_srcset'],
+}
+# Cards show three lines of description at most
+CARD_DESCRIPTION_LENGTH = 200
+
+
+def room_list_fields(fields=None, view=None):
+    """Resolve ?fields= / ?view= into (field names, description length), raising ValueError on unknown names"""
+    if fields:
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = requested - set(ROOM_FIELD_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return [name for name in ROOM_FIELD_COLUMNS if name in requested], None
+    if view in (None, '', 'full'):
+        return list(ROOM_FIELD_COLUMNS), None
+    if view in ROOM_VIEWS:
+        return ROOM_VIEWS[view], CARD_DESCRIPTION_LENGTH
+    raise ValueError('view must be card or full')
+
+
+class _UrlBuilder:
+    """Absolute media and static URLs with the scheme, host and prefixes worked out once per request"""
+
+    def __init__(self, request):
+        self.request = request
+        self.origin = request.build_absolute_uri('/')[:-1] if request else ''
+        self.local_media = isinstance(default_storage, FileSystemStorage)
+        self.media_prefix = self.origin + default_storage.base_url if self.local_media else None
+        self._static_urls = {}
+
+    def media(self, name):
+        if self.local_media:
+            return self.media_prefix + filepath_to_uri(name).lstrip('/')
+        url = default_storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request else url
+
+    def image_url(self, name):
+        """RoomSerializer.get_image_url: bundled r*.jpg images are served from static files"""
+        if not name:
+            return None
+        if is_static_fallback(name):
+            # Manifest lookups are repeated for every room sharing a bundled photo
+            if name not in self._static_urls:
+                url = static_fallback_url(name)
+                self._static_urls[name] = iri_to_uri(self.origin + url) if self.request else url
+            return self._static_urls[name]
+        return self.media(name)
+
+
+def serialize_room_rows(rooms, request=None, fields=None, description_length=None):
+    """Same output as RoomSerializer(rooms, many=True).data, built from values() rows.
+
+    Skips the per-object field machinery for read-only list endpoints and only
+    selects the columns behind the requested fields; the price and created_at
+    formatting still come from the serializer's own fields so the two can never
+    drift apart.
+    """
+    fields = fields or list(ROOM_FIELD_COLUMNS)
+    columns = list(dict.fromkeys(column for name in fields for column in ROOM_FIELD_COLUMNS[name]))
+    if description_length and 'description' in columns:
+        rooms = rooms.annotate(short_description=Substr('description', 1, description_length))
+        columns[columns.index('description')] = 'short_description'
+
+    serializer_fields = RoomSerializer().fields
+    price, created_at = serializer_fields['price'], serializer_fields['created_at']
+    urls = _UrlBuilder(request)
+    builders = {
+        'id': lambda row: row['id'],
+        'title': lambda row: row['title'],
+        'description': lambda row: row['short_description' if description_length else 'description'],
+        'price': lambda row: price.to_representation(row['price']),
+        'location': lambda row: row['location'],
+        'image': lambda row: urls.media(row['image']) if row['image'] else None,
+        'image_url': lambda row: urls.image_url(row['image']),
+        'thumbnail_url': lambda row: thumbnail_url(current_variants(row['image_variants'], row['image']), urls.media),
+        'image_srcset': lambda row: image_srcset(current_variants(row['image_variants'], row['image']), urls.media),
+        'phone': lambda row: row['phone'],
+        'email': lambda row: row['email'],
+        'owner': lambda row: row['owner_id'],
+        'owner_name': lambda row: (f"{row['owner__first_name']} {row['owner__last_name']}".strip()
+                                   or row['owner__username']),
+        'owner_phone': lambda row: row['phone'],
+        'owner_email': lambda row: row['email'],
+        'created_at': lambda row: created_at.to_representation(row['created_at']),
+    }
+    build = [(name, builders[name]) for name in fields]
+    return [{name: builder(row) for name, builder in build} for row in rooms.values(*columns)]
+
 class BookingSerializer(serializers.ModelSerializer):
     room_title = serializers.CharField(source='room.title', read_only=True)
     room_location = serializers.CharField(source='room.location', read_only=True)
@@ -89,8 +248,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
         fields = ['id', 'booking', 'booking_details', 'invoice_number', 'issued_date', 'due_date',
-                  'subtotal', 'tax_rate', 'tax_amount', 'total_amount', 'status', 'pdf_file', 'created_at']
-        read_only_fields = ['id', 'issued_date', 'created_at', 'pdf_file']
+                  'subtotal', 'tax_rate', 'tax_amount', 'total_amount', 'status', 'pdf_file', 'pdf_status', 'created_at']
+        read_only_fields = ['id', 'issued_date', 'created_at', 'pdf_file', 'pdf_status']
     
     def get_booking_details(self, obj):
         return {
@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from .models import Room, Booking, Notification, UserProfile
+from . import agreement_cache
+from .availability import rebuild_occupancy
+from .caching import bump_catalogue_version, bump_namespace
+from .image_worker import delete_variant_files, enqueue_image_variants, needs_variants
+from .metrics import NOTIFICATIONS
+from .user_context import invalidate_user_context
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking_agreement(sender, instance, **kwargs):
+    agreement_cache.invalidate_bookings([instance.id])
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_status(sender, instance, **kwargs):
+    # Status transitions use update() and set this themselves before sending post_save
+    instance._saved_status = (Booking.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+                              if instance.pk else None)
+
+
+def _changes_availability(booking, signal, update_fields=None, **kwargs):
+    """Only approved bookings block dates, so only bookings entering, leaving or deleted in that status count"""
+    if signal is post_delete:
+        return booking.status == 'approved'
+    saved_status = getattr(booking, '_saved_status', None)
+    if 'approved' not in (saved_status, booking.status):
+        return False
+    # A full save of an approved booking may have moved its dates
+    return saved_status != booking.status or not update_fields
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def update_room_occupancy(sender, instance, **kwargs):
+    # The bitmap is only read with AVAILABILITY_BITMAP on
+    if settings.AVAILABILITY_BITMAP and _changes_availability(instance, **kwargs):
+        rebuild_occupancy(instance.room_id)
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_room_agreements(sender, instance, **kwargs):
+    booking_ids = Booking.objects.filter(room_id=instance.id).values_list('id', flat=True)
+    agreement_cache.invalidate_bookings(booking_ids)
+
+
+def _invalidate_user_agreements(user_id):
+    booking_ids = Booking.objects.filter(Q(user_id=user_id) | Q(room__owner_id=user_id)).values_list('id', flat=True)
+    agreement_cache.invalidate_bookings(booking_ids)
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_profile_agreements(sender, instance, **kwargs):
+    _invalidate_user_agreements(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_agreements(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which never appears in an agreement
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    _invalidate_user_agreements(instance.id)
+
+
+@receiver(post_save, sender=Room)
+def generate_image_variants(sender, instance, **kwargs):
+    if needs_variants(instance):
+        # After commit, so a worker never reads a room that was rolled back
+        transaction.on_commit(lambda: enqueue_image_variants(instance))
+
+
+@receiver(post_delete, sender=Room)
+def delete_image_variants(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_variant_files(instance.image_variants))
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_room_caches(sender, instance, **kwargs):
+    bump_catalogue_version()
+    bump_namespace('recommendations')
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking_caches(sender, instance, **kwargs):
+    # Availability filters on the room list depend on approved bookings
+    if _changes_availability(instance, **kwargs):
+        bump_catalogue_version()
+        bump_namespace('recommendations')
+
+
+# What room listings show of the owner, see RoomSerializer.get_owner_name
+OWNER_NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _owner_name(user):
+    return tuple(getattr(user, field) for field in OWNER_NAME_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+def remember_owner_name(sender, instance, update_fields=None, **kwargs):
+    instance._saved_owner_name = None
+    if instance.pk is None or (update_fields and not set(update_fields) & set(OWNER_NAME_FIELDS)):
+        return
+    instance._saved_owner_name = User.objects.filter(pk=instance.pk).values_list(*OWNER_NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_owner_catalogue(sender, instance, created, **kwargs):
+    # Room listings embed the owner's name; a new user owns no rooms yet
+    saved = getattr(instance, '_saved_owner_name', None)
+    if not created and saved is not None and saved != _owner_name(instance):
+        bump_catalogue_version()
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_profile_context(sender, instance, **kwargs):
+    invalidate_user_context(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_snapshot(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_user_context(instance.id)
+
+
+@receiver(post_save, sender=Notification)
+def count_notification(sender, instance, created, **kwargs):
+    if created:
+        NOTIFICATIONS.inc(title=instance.title)
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import re
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# Same fingerprint format as ManifestStaticFilesStorage: name.0123456789ab.ext
+HASHED_NAME_RE = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[^./]+)?$')
+# Hashed URLs never change content, so they may be cached for a year without revalidation
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def content_hash(content):
+    """First 12 hex digits of the SHA-256 of a File, leaving it rewound"""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()[:12]
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.match(os.path.basename(name or '')))
+
+
+def original_name(name):
+    """File name without its content hash, e.g. for download filenames"""
+    basename = os.path.basename(name or '')
+    match = HASHED_NAME_RE.match(basename)
+    return f"{match['stem']}{match['ext'] or ''}" if match else basename
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """FileSystemStorage that names every upload after its content hash.
+
+    'room_images/loft.jpg' is stored as 'room_images/loft.3f2a9c0d1b7e.jpg', so a
+    URL always refers to the same bytes and can be served as immutable. Saving
+    identical content twice under the same name reuses the stored file.
+    """
+
+    def save(self, name, content, max_length=None):
+        if content is None:
+            raise ValueError('content is required')
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content_hash(content), max_length)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def hashed_name(self, name, file_hash, max_length=None):
+        directory, basename = os.path.split(name)
+        match = HASHED_NAME_RE.match(basename)
+        if match:
+            # Re-saving a hashed file must not stack fingerprints
+            basename = f"{match['stem']}{match['ext'] or ''}"
+        stem, ext = os.path.splitext(basename)
+        hashed = os.path.join(directory, f"{stem}.{file_hash}{ext}")
+        if max_length and len(hashed) > max_length:
+            # Shorten the stem rather than let get_available_name cut off the hash
+            stem = stem[:max(len(stem) - (len(hashed) - max_length), 1)]
+            hashed = os.path.join(directory, f"{stem}.{file_hash}{ext}")
+        return hashed
+
+
+def is_static_fallback(name):
+    """Bundled r*.jpg photos referenced by bare file name (see fix_room_images)"""
+    name = (name or '').lstrip('/')
+    return bool(name) and '/' not in name and name.lower().startswith('r') and name.lower().endswith('.jpg')
+
+
+def static_fallback_url(name):
+    """Site-relative URL of a bundled photo, hashed through the static files manifest"""
+    path = f"images/about/{name.lstrip('/')}"
+    try:
+        return staticfiles_storage.url(path)
+    except ValueError:
+        # No manifest entry (collectstatic not run yet): fall back to the plain name
+        return f"{settings.STATIC_URL}{path}"
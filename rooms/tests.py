@@ -1,3 +1,828 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth.models import User
+from .availability import is_available
+from .booking_states import transition, TransitionError
+from .compression import carries_secrets
+from .caching import cached_call, catalogue_version, versioned_key
+from .image_worker import needs_variants
+from .models import (Room, Booking, BookingTransition, Invoice, Notification, NumberSequence, RoomOccupancy,
+                     UserProfile)
+from .notifications import email_configured
+from .profiling import RATE_SEQUENCE, allow
+from .renderers import ORJSONRenderer
+from .serializers import RoomSerializer, serialize_room_rows, thumbnail_url
+from .sequences import BlockAllocator
 
-# Create your tests here.
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, INVOICE_PDF_WORKERS=0)
+class InvoiceTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        self.tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.room = Room.objects.create(owner=self.owner, title='Studio', description='Nice',
+                                        price=500, location='Downtown')
+        self.booking = Booking.objects.create(room=self.room, user=self.tenant, owner=self.owner,
+                                              start_date=date(2026, 1, 1), end_date=date(2026, 3, 1),
+                                              months=2, total_rent=1000, status='approved')
+        self.client.force_login(self.tenant)
+
+    def test_create_invoice_renders_pdf_and_marks_sent(self):
+        res = self.client.post(f'/api/invoices/create/{self.booking.id}/')
+        self.assertEqual(res.status_code, 201)
+        invoice = Invoice.objects.get(booking=self.booking)
+        self.assertEqual(invoice.status, 'sent')
+        self.assertEqual(invoice.pdf_status, 'ready')
+        self.assertTrue(invoice.pdf_file.name.endswith('.pdf'))
+
+        res = self.client.get(res.json()['status_url'])
+        self.assertTrue(res.json()['pdf_ready'])
+
+    def test_generate_invoices_leaves_recent_pending_pdfs_to_the_web_pool(self):
+        from .management.commands.generate_invoices import Command
+        from .invoicing import build_invoice
+        invoice = build_invoice(self.booking, invoice_number='INV-TEST-1')
+        invoice.save()
+        self.assertEqual(Command()._claim_leftovers(stale_after=30), [])
+        Invoice.objects.filter(id=invoice.id).update(pdf_status='failed')
+        self.assertEqual(Command()._claim_leftovers(stale_after=30), [invoice.id])
+        # Claimed: back to pending and fresh, so a concurrent run skips it
+        self.assertEqual(Command()._claim_leftovers(stale_after=30), [])
+
+    def test_download_invoice_supports_etag_and_range(self):
+        self.client.post(f'/api/invoices/create/{self.booking.id}/')
+        invoice = Invoice.objects.get(booking=self.booking)
+        url = f'/api/invoices/{invoice.id}/download/'
+
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        body = b''.join(res.streaming_content)
+        etag = res['ETag']
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        res = self.client.get(url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), body[:10])
+        self.assertEqual(res['Content-Range'], f'bytes 0-9/{len(body)}')
+
+
+@override_settings(AGREEMENT_CACHE_DIR=os.path.join(MEDIA_ROOT, 'agreements'))
+class AgreementCacheTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        self.tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.room = Room.objects.create(owner=self.owner, title='Studio', description='Nice',
+                                        price=500, location='Downtown')
+        self.booking = Booking.objects.create(room=self.room, user=self.tenant, owner=self.owner,
+                                              start_date=date(2026, 1, 1), end_date=date(2026, 3, 1),
+                                              months=2, total_rent=1000, status='approved')
+        self.client.force_login(self.tenant)
+
+    def _cached_files(self):
+        return os.listdir(os.path.join(MEDIA_ROOT, 'agreements'))
+
+    def test_agreement_pdf_is_cached_and_invalidated(self):
+        first = self.client.post('/api/generate-agreement/', {'booking_id': self.booking.id})
+        second = self.client.post('/api/generate-agreement/', {'booking_id': self.booking.id})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(b''.join(first.streaming_content), b''.join(second.streaming_content))
+        self.assertEqual(len(self._cached_files()), 1)
+        # A POST is answered in full, whatever validators or range it sends
+        res = self.client.post('/api/generate-agreement/', {'booking_id': self.booking.id},
+                               HTTP_IF_NONE_MATCH=first['ETag'], HTTP_RANGE='bytes=0-9')
+        self.assertEqual(res.status_code, 200)
+
+        self.room.title = 'Renamed studio'
+        self.room.save()
+        self.assertEqual(self._cached_files(), [])
+
+
+class CatalogueCacheTests(TestCase):
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        self.room = Room.objects.create(owner=self.owner, title='Studio', description='Nice',
+                                        price=500, location='Downtown')
+
+    def test_room_list_is_cached_until_a_room_changes(self):
+        self.assertEqual(self.client.get('/api/rooms/').json()[0]['title'], 'Studio')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/rooms/').json()[0]['title'], 'Studio')
+
+        self.room.title = 'Renamed studio'
+        self.room.save()
+        self.assertEqual(self.client.get('/api/rooms/').json()[0]['title'], 'Renamed studio')
+
+    def test_conditional_get_uses_catalogue_version(self):
+        res = self.client.get('/api/rooms/')
+        etag = res['ETag']
+        self.assertIn('public', res['Cache-Control'])
+        self.assertIn('Last-Modified', res)
+        self.assertEqual(self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(f'/api/rooms/{self.room.id}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.room.delete()
+        res = self.client.get('/api/rooms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.json(), [])
+
+        # Errors are neither public nor validated against the catalogue version
+        for url in ('/api/rooms/?available_from=soon', '/api/rooms/999/'):
+            res = self.client.get(url)
+            self.assertIn(res.status_code, (400, 404))
+            self.assertNotIn('ETag', res)
+            self.assertNotIn('public', res['Cache-Control'])
+
+    def test_each_representation_has_its_own_etag(self):
+        res = self.client.get('/api/rooms/')
+        self.assertIn('Accept', res['Vary'])
+        # The Browsable API renders with the plain static storage, without a manifest
+        storages = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+        with self.settings(STORAGES=storages):
+            html = self.client.get('/api/rooms/', HTTP_ACCEPT='text/html')
+            self.assertEqual(html['Content-Type'], 'text/html; charset=utf-8')
+            self.assertNotEqual(html['ETag'], res['ETag'])
+            self.assertEqual(self.client.get('/api/rooms/', HTTP_ACCEPT='text/html',
+                                             HTTP_IF_NONE_MATCH=res['ETag']).status_code, 200)
+        gzipped = self.client.get('/api/rooms/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(gzipped['ETag'].removeprefix('W/'), res['ETag'])
+
+    def test_catalogue_survives_unrelated_saves(self):
+        self.client.get('/api/rooms/')
+        tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        booking = Booking.objects.create(room=self.room, user=tenant, owner=self.owner, start_date=date(2026, 1, 1),
+                                         end_date=date(2026, 2, 1), months=1, total_rent=500)
+        cancelled = Booking.objects.create(room=self.room, user=tenant, owner=self.owner,
+                                           start_date=date(2026, 3, 1), end_date=date(2026, 4, 1), months=1,
+                                           total_rent=500)
+        # A pending booking never blocked any dates
+        transition(cancelled, 'cancelled', tenant)
+        self.owner.set_password('changed')
+        self.owner.save()
+        with self.assertNumQueries(0):
+            self.client.get('/api/rooms/')
+
+        version = catalogue_version()[0]
+        transition(booking, 'approved', self.owner)
+        self.assertNotEqual(catalogue_version()[0], version)
+        self.owner.first_name = 'Olive'
+        self.owner.save()
+        self.assertEqual(self.client.get('/api/rooms/').json()[0]['owner_name'], 'Olive')
+
+    def test_catalogue_is_served_precompressed(self):
+        for i in range(20):
+            Room.objects.create(owner=self.owner, title=f'Room {i}', description='Quiet and bright ' * 10,
+                                price=500, location='Downtown')
+        plain = self.client.get('/api/rooms/')
+        res = self.client.get('/api/rooms/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res['Vary'])
+        self.assertTrue(res['ETag'].startswith('W/'))
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotIn('Content-Encoding', self.client.get('/api/rooms/', HTTP_ACCEPT_ENCODING='gzip;q=0'))
+        self.assertEqual(self.client.get('/api/rooms/', HTTP_ACCEPT_ENCODING='gzip',
+                                         HTTP_IF_NONE_MATCH=res['ETag']).status_code, 304)
+
+    def test_middleware_compresses_html_pages(self):
+        res = self.client.get('/about/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(res.content))
+
+    def test_pages_with_a_csrf_token_are_not_brotli_compressed(self):
+        res = self.client.get('/login/', HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertIn(settings.CSRF_COOKIE_NAME, res.cookies)
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn(b'csrfmiddlewaretoken', gzip.decompress(res.content))
+        self.assertTrue(carries_secrets(res.wsgi_request, res))
+        # Public, anonymous responses are fine
+        res = self.client.get('/api/rooms/', HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertFalse(carries_secrets(res.wsgi_request, res))
+
+    def test_concurrent_fill_runs_once(self):
+        calls = []
+
+        def fill():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        threads = [threading.Thread(target=cached_call, args=('default', ('stampede',), fill)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+
+    def test_keys_are_hashed_whatever_the_input(self):
+        key = versioned_key('catalogue', 'search', 'furnished 2bhk, near metro!' * 20)
+        self.assertRegex(key, r'^v\d+:search:[0-9a-f]{64}$')
+        self.assertNotEqual(key, versioned_key('catalogue', 'search:furnished'))
+
+
+class RoomRowSerializationTests(TestCase):
+    def test_rows_match_room_serializer_output(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pass', first_name='Asha')
+        Room.objects.create(owner=owner, title='Studio', description='Nice', price=500, location='Downtown',
+                            image='r3.jpg')
+        Room.objects.create(owner=owner, title='Loft', description='Big \u2028', price='900.50',
+                            location='Uptown', image='room_images/loft 1.jpg')
+        Room.objects.create(owner=owner, title='Attic', description='Small', price=300, location='Old town')
+        request = RequestFactory().get('/api/rooms/')
+        rooms = Room.objects.order_by('id')
+
+        expected = JSONRenderer().render(RoomSerializer(rooms, many=True, context={'request': request}).data)
+        self.assertEqual(ORJSONRenderer().render(serialize_room_rows(rooms, request)), expected)
+
+    def test_sparse_fields_and_card_view(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+        Room.objects.create(owner=owner, title='Studio', description='x' * 500, price=500, location='Downtown')
+        caches['catalogue'].clear()
+
+        card = self.client.get('/api/rooms/', {'view': 'card'}).json()[0]
+        self.assertEqual(list(card), ['id', 'title', 'description', 'price', 'location', 'image_url',
+                                      'thumbnail_url', 'image_srcset'])
+        self.assertEqual(len(card['description']), 200)
+        self.assertEqual(self.client.get('/api/rooms/', {'fields': 'price,id'}).json(), [{'id': card['id'], 'price': '500.00'}])
+        self.assertEqual(self.client.get('/api/rooms/', {'fields': 'id,password'}).status_code, 400)
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+    def _jpeg(self, size):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', size, (200, 120, 40)).save(buffer, format='JPEG')
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_upload_generates_variants_and_srcset(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+        with self.settings(MEDIA_ROOT=self.media_root, IMAGE_WORKERS=0, IMAGE_VARIANT_FORMATS=['webp', 'jpeg']):
+            with self.captureOnCommitCallbacks(execute=True):
+                room = Room.objects.create(owner=owner, title='Studio', description='Nice', price=500,
+                                           location='Downtown', image=self._jpeg((800, 600)))
+            room.refresh_from_db()
+            self.assertEqual(room.image_variants['source'], room.image.name)
+            self.assertEqual([v['width'] for v in room.image_variants['variants'].values()], [320, 640, 800])
+            for variant in room.image_variants['variants'].values():
+                for name in variant['files'].values():
+                    self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+
+            request = RequestFactory().get('/api/rooms/')
+            rooms = Room.objects.order_by('id')
+            data = RoomSerializer(rooms, many=True, context={'request': request}).data
+            self.assertEqual(sorted(data[0]['image_srcset']), ['jpeg', 'webp'])
+            self.assertIn(' 640w', data[0]['image_srcset']['webp'])
+            self.assertTrue(data[0]['thumbnail_url'].endswith('.jpg'))
+            self.assertEqual(ORJSONRenderer().render(serialize_room_rows(rooms, request)), JSONRenderer().render(data))
+
+            # A replaced image has no srcset until its own variants are generated
+            Room.objects.filter(id=room.id).update(image='room_images/other.jpg')
+            self.assertIsNone(RoomSerializer(Room.objects.get(id=room.id)).data['image_srcset'])
+
+    def test_failed_images_are_retried_up_to_the_limit(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+        with self.settings(MEDIA_ROOT=self.media_root, IMAGE_WORKERS=0, IMAGE_VARIANT_MAX_ATTEMPTS=2):
+            with self.captureOnCommitCallbacks(execute=True):
+                room = Room.objects.create(owner=owner, title='Studio', description='Nice', price=500,
+                                           location='Downtown', image='room_images/missing.jpg')
+            room.refresh_from_db()
+            self.assertEqual(room.image_variants['attempts'], 1)
+            self.assertTrue(needs_variants(room))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                room.save()
+            room.refresh_from_db()
+            self.assertEqual(room.image_variants['attempts'], 2)
+            self.assertFalse(needs_variants(room))
+
+    def test_thumbnail_falls_back_to_another_format(self):
+        variants = {'thumb': {'width': 320, 'files': {'avif': 'a.avif', 'webp': 'a.webp'}}}
+        self.assertEqual(thumbnail_url(variants, str), 'a.webp')
+        variants['thumb']['files'] = {}
+        self.assertIsNone(thumbnail_url(variants, str))
+
+
+class MediaStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_uploads_are_content_hashed_and_served_immutable(self):
+        with self.settings(MEDIA_ROOT=self.root):
+            name = default_storage.save('room_images/loft.jpg', ContentFile(b'photo'))
+            self.assertRegex(name, r'^room_images/loft\.[0-9a-f]{12}\.jpg$')
+            self.assertEqual(default_storage.save('room_images/loft.jpg', ContentFile(b'photo')), name)
+            self.assertNotEqual(default_storage.save('room_images/loft.jpg', ContentFile(b'other')), name)
+
+            res = self.client.get(f'/media/{name}')
+            self.assertEqual(b''.join(res.streaming_content), b'photo')
+            self.assertIn('immutable', res['Cache-Control'])
+            self.assertEqual(self.client.get(f'/media/{name}', HTTP_IF_NONE_MATCH=res['ETag']).status_code, 304)
+
+            invoice = default_storage.save('invoices/invoice_1.pdf', ContentFile(b'%PDF'))
+            self.assertEqual(self.client.get(f'/media/{invoice}').status_code, 404)
+            self.assertEqual(self.client.get(f'/media/room_images/../{invoice}').status_code, 404)
+
+    def test_bundled_photos_use_manifest_names(self):
+        with open(os.path.join(self.root, 'staticfiles.json'), 'w') as f:
+            f.write('{"paths": {"images/about/r3.jpg": "images/about/r3.0123456789ab.jpg"}, "version": "1.1"}')
+        storages = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'}}
+        with self.settings(STATIC_ROOT=self.root, STORAGES=storages):
+            room = Room(owner=User(username='owner'), title='Studio', price=500, image='r3.jpg')
+            request = RequestFactory().get('/api/rooms/')
+            self.assertEqual(RoomSerializer(room, context={'request': request}).data['image_url'],
+                             'http://testserver/static/images/about/r3.0123456789ab.jpg')
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class CurrentUserCacheTests(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+        self.user = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.client.force_login(self.user)
+
+    def test_current_user_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/user/').json()['username'], 'tenant')
+        with self.assertNumQueries(0):
+            res = self.client.get('/api/user/')
+        self.assertTrue(res.json()['is_authenticated'])
+
+    def test_role_and_password_changes_invalidate_snapshot(self):
+        self.client.get('/api/user/')
+        self.user.is_staff = True
+        self.user.save()
+        self.assertTrue(self.client.get('/api/user/').json()['is_staff'])
+
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertFalse(self.client.get('/api/user/').json()['is_authenticated'])
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        caches['catalogue'].clear()
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        self.tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.room = Room.objects.create(owner=self.owner, title='Studio', description='Nice',
+                                        price=500, location='Downtown')
+        self.other = Room.objects.create(owner=self.owner, title='Loft', description='Big',
+                                         price=900, location='Uptown')
+        Booking.objects.create(room=self.room, user=self.tenant, owner=self.owner,
+                               start_date=date(2026, 1, 1), end_date=date(2026, 3, 1),
+                               months=2, total_rent=1000, status='approved')
+        self.client.force_login(self.tenant)
+
+    def test_overlapping_booking_is_rejected(self):
+        res = self.client.post('/api/bookings/add/', {'room_id': self.room.id, 'start_date': '2026-02-01', 'months': 1})
+        self.assertEqual(res.status_code, 409)
+        # Back-to-back is fine: the approved booking ends the day this one starts
+        res = self.client.post('/api/bookings/add/', {'room_id': self.room.id, 'start_date': '2026-03-01', 'months': 1})
+        self.assertEqual(res.status_code, 201)
+
+    def test_room_list_filters_by_availability(self):
+        res = self.client.get('/api/rooms/', {'available_from': '2026-02-01', 'available_to': '2026-04-01'})
+        self.assertEqual([room['id'] for room in res.json()], [self.other.id])
+        res = self.client.get('/api/rooms/availability/', {'available_from': '2026-02-01', 'room_id': self.room.id})
+        self.assertFalse(res.json()['available'])
+        self.assertEqual(self.client.get('/api/rooms/', {'available_from': 'soon'}).status_code, 400)
+
+    def test_month_search_uses_occupancy_bitmap(self):
+        params = {'available_from': '2026-02-01', 'months': 6}
+        expected = [self.other.id]
+        self.assertEqual([room['id'] for room in self.client.get('/api/rooms/', params).json()], expected)
+        # Bookings saved with the bitmap off leave it alone
+        self.assertFalse(RoomOccupancy.objects.exists())
+        with override_settings(AVAILABILITY_BITMAP=True):
+            call_command('rebuild_occupancy', stdout=io.StringIO())
+            caches['catalogue'].clear()
+            self.assertEqual([room['id'] for room in self.client.get('/api/rooms/', params).json()], expected)
+            caches['catalogue'].clear()
+            res = self.client.get('/api/rooms/', {'available_from': '2026-03-01', 'months': 6})
+            self.assertEqual(len(res.json()), 2)
+
+    @override_settings(AVAILABILITY_BITMAP=True)
+    def test_occupancy_is_rebuilt_on_approval_only(self):
+        booking = Booking.objects.create(room=self.other, user=self.tenant, owner=self.owner,
+                                         start_date=date(2026, 5, 1), end_date=date(2026, 7, 1),
+                                         months=2, total_rent=1800)
+        self.assertFalse(RoomOccupancy.objects.filter(room=self.other).exists())
+        transition(booking, 'approved', self.owner)
+        self.assertEqual(RoomOccupancy.objects.get(room=self.other, year=2026).months, 0b110000)
+
+
+@override_settings(SEQUENCE_BLOCK_SIZE=4)
+class SequenceTests(TransactionTestCase):
+    """Outside a transaction, so take() goes through the per-process block"""
+
+    def test_blocks_are_reserved_once_per_block_size(self):
+        allocator = BlockAllocator('test')
+        values = allocator.take(3) + allocator.take(3) + [allocator.next()]
+        self.assertEqual(values, list(range(1, 8)))
+        # Two blocks of four so far; the eighth value is still cached
+        self.assertEqual(NumberSequence.objects.get(name='test').value, 8)
+        # Another process (allocator) continues after the reserved blocks
+        self.assertEqual(BlockAllocator('test').take(5), [9, 10, 11, 12, 13])
+        self.assertEqual(allocator.next(), 8)
+
+    def test_concurrent_takes_never_repeat_a_value(self):
+        allocators = [BlockAllocator('test'), BlockAllocator('test')]
+        taken = []
+
+        def worker(allocator):
+            try:
+                for _ in range(15):
+                    for _ in range(50):
+                        try:
+                            taken.extend(allocator.take(2))
+                            break
+                        except OperationalError:
+                            # SQLite reports a busy shared-cache database instead of waiting
+                            time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(allocators[i % 2],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(taken), 6 * 15 * 2)
+        self.assertEqual(len(set(taken)), len(taken))
+
+
+class BookingStateTests(TransactionTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        UserProfile.objects.create(user=self.owner, staff_approved=True)
+        self.tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.room = Room.objects.create(owner=self.owner, title='Studio', description='Nice',
+                                        price=500, location='Downtown')
+        self.booking = Booking.objects.create(room=self.room, user=self.tenant, owner=self.owner,
+                                              start_date=date(2026, 1, 1), end_date=date(2026, 3, 1),
+                                              months=2, total_rent=1000)
+
+    def test_final_states_cannot_change(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.put(f'/api/bookings/reject/{self.booking.id}/').status_code, 200)
+        self.assertEqual(self.client.put(f'/api/bookings/approve/{self.booking.id}/').status_code, 400)
+        self.assertEqual(list(self.booking.transitions.values_list('to_status', flat=True)), ['rejected'])
+
+    def test_concurrent_transitions_have_one_winner(self):
+        attempts = [('approved', self.owner), ('rejected', self.owner), ('cancelled', self.tenant)] * 3
+        barrier = threading.Barrier(len(attempts))
+        results = []
+
+        def worker(to_status, actor):
+            booking = Booking.objects.select_related('room').get(id=self.booking.id)
+            barrier.wait()
+            try:
+                for _ in range(50):
+                    try:
+                        transition(booking, to_status, actor)
+                        results.append(to_status)
+                        return
+                    except OperationalError:
+                        # SQLite reports a busy shared-cache database instead of waiting
+                        time.sleep(0.01)
+            except TransitionError:
+                pass
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=attempt) for attempt in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 1)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, results[0])
+        self.assertEqual(self.booking.transitions.count(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+
+
+class BulkBookingActionTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        UserProfile.objects.create(user=self.owner, staff_approved=True)
+        self.other_owner = User.objects.create_user('other', 'other@example.com', 'pass', is_staff=True)
+        self.tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        room = Room.objects.create(owner=self.owner, title='Studio', description='Nice', price=500, location='Downtown')
+        other_room = Room.objects.create(owner=self.other_owner, title='Loft', description='Big',
+                                         price=900, location='Uptown')
+
+        def book(room, start, end):
+            return Booking.objects.create(room=room, user=self.tenant, owner=room.owner, start_date=start,
+                                          end_date=end, months=2, total_rent=1000)
+
+        self.first = book(room, date(2026, 1, 1), date(2026, 3, 1))
+        self.overlapping = book(room, date(2026, 2, 1), date(2026, 4, 1))
+        self.later = book(room, date(2026, 3, 1), date(2026, 5, 1))
+        self.foreign = book(other_room, date(2026, 1, 1), date(2026, 3, 1))
+        self.client.force_login(self.owner)
+
+    @override_settings(EMAIL_WORKERS=0)
+    def test_bulk_approve_reports_each_booking(self):
+        ids = [self.first.id, self.overlapping.id, self.later.id, self.foreign.id]
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post('/api/bookings/bulk/', {'booking_ids': ids, 'action': 'approve'},
+                                   content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        ok = {result['id']: result['ok'] for result in res.json()['results']}
+        self.assertEqual(ok, {self.first.id: True, self.overlapping.id: False, self.later.id: True, self.foreign.id: False})
+        self.assertEqual(Booking.objects.filter(status='approved').count(), 2)
+        self.assertEqual(Notification.objects.filter(user=self.tenant).count(), 2)
+        self.assertEqual(BookingTransition.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST_USER='')
+    def test_bulk_emails_are_skipped_without_smtp_credentials(self):
+        self.assertFalse(email_configured())
+        # Would otherwise try to reach an SMTP server on localhost
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/bookings/bulk/', {'booking_ids': [self.first.id], 'action': 'approve'},
+                             content_type='application/json')
+        self.assertEqual(Booking.objects.get(id=self.first.id).status, 'approved')
+
+
+class LoadDataTests(TestCase):
+    def test_generates_consistent_history(self):
+        call_command('generate_load_data', users=60, rooms=20, bookings=150, notifications=80, batch_size=50,
+                     stdout=io.StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='load0-').count(), 60)
+        self.assertEqual(Room.objects.count(), 20)
+        self.assertEqual(Booking.objects.count(), 150)
+        self.assertEqual(Notification.objects.count(), 80)
+        # Approved stays never overlap and every invoice belongs to one
+        for room in Room.objects.all():
+            self.assertTrue(all(is_available(room.id, b.start_date, b.end_date, exclude_booking_id=b.id)
+                                for b in room.bookings.filter(status='approved')))
+        self.assertFalse(Invoice.objects.exclude(booking__status='approved').exists())
+        self.assertEqual(Invoice.objects.filter(status='paid', payments__status='completed').count(),
+                         Invoice.objects.filter(status='paid').count())
+        self.assertGreater(len({room.created_at.date() for room in Room.objects.all()}), 1)
+
+        with self.assertRaises(CommandError):
+            call_command('generate_load_data', users=1, stdout=io.StringIO())
+
+
+class EndpointBenchmarkTests(TestCase):
+    def test_baseline_round_trip_and_query_regression(self):
+        baseline = os.path.join(tempfile.mkdtemp(), 'endpoints.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(baseline), ignore_errors=True)
+        # Two iterations make p95 pure noise; only the query counts are checked here
+        options = dict(baseline=baseline, users=30, rooms=10, bookings=40, notifications=30, iterations=2,
+                       warmup=0, threshold=100, only=['api_rooms?fields', 'api_unread_notifications_count'],
+                       stdout=io.StringIO())
+        call_command('benchmark_endpoints', update_baseline=True, **options)
+        with open(baseline) as f:
+            recorded = json.load(f)
+        self.assertEqual(sorted(recorded['results']), ['api_rooms?fields', 'api_unread_notifications_count'])
+        self.assertGreater(recorded['results']['api_rooms?fields']['queries'], 0)
+        # The generated dataset is rolled back
+        self.assertFalse(Room.objects.exists())
+
+        call_command('benchmark_endpoints', **options)
+        recorded['results']['api_rooms?fields']['queries'] -= 1
+        with open(baseline, 'w') as f:
+            json.dump(recorded, f)
+        with self.assertRaisesMessage(CommandError, 'api_rooms?fields'):
+            call_command('benchmark_endpoints', **options)
+
+    def test_price_prediction_trains_on_generated_data(self):
+        baseline = os.path.join(tempfile.mkdtemp(), 'endpoints.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(baseline), ignore_errors=True)
+        call_command('benchmark_endpoints', baseline=baseline, update_baseline=True, users=30, rooms=10,
+                     bookings=40, notifications=30, iterations=1, warmup=0, only=['api_ml_predict_price'],
+                     stdout=io.StringIO())
+        with open(baseline) as f:
+            result = json.load(f)['results']['api_ml_predict_price']
+        self.assertNotIn('error', result)
+
+
+@override_settings(SERVER_TIMING=True, SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=1)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pass')
+        Room.objects.create(owner=owner, title='Studio', description='Nice', price=500, location='Downtown')
+
+    def test_server_timing_and_slow_request_log(self):
+        with self.assertLogs('rooms.slow_requests', 'WARNING') as logs:
+            response = self.client.get('/api/rooms/')
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", cache;desc="\d+ hits, \d+ misses"')
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['path'], entry['status']), ('/api/rooms/', 200))
+        self.assertGreater(entry['db_queries'], 0)
+        self.assertEqual(len(entry['queries']), entry['db_queries'])
+        self.assertTrue(any('rooms_room' in query['sql'] for query in entry['queries']))
+
+    @override_settings(SLOW_REQUEST_MS=60_000)
+    def test_external_calls_are_timed(self):
+        from .instrumentation import external_call, start_request, end_request
+        metrics, token = start_request()
+        try:
+            with external_call('openai'):
+                pass
+            with external_call('openai'):
+                pass
+        finally:
+            end_request(token)
+        self.assertEqual(metrics.external['openai'][0], 2)
+        # Outside a request nothing is recorded
+        with external_call('smtp'):
+            pass
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_scrape_requires_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.get('/api/rooms/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE roombook_http_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'roombook_http_request_duration_seconds_bucket\{view="api_rooms",method="GET",le="\+Inf"\} [1-9]')
+        self.assertRegex(body, r'roombook_http_requests_total\{view="api_rooms",method="GET",status="2xx"\} [1-9]')
+
+    def test_processes_are_aggregated(self):
+        from . import metrics
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        # A worker that has exited since: its counters still count, its gauges do not
+        dead_pid = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        with open(os.path.join(directory, f'{dead_pid}-1.json'), 'w') as f:
+            json.dump({'pid': int(dead_pid), 'metrics': {
+                'roombook_notifications_created_total': {
+                    'type': 'counter', 'help': 'Notifications', 'buckets': [],
+                    'samples': [[{'title': 'Welcome to RoomBook!'}, 5]]},
+                'roombook_email_queue_depth': {
+                    'type': 'gauge', 'help': 'Emails', 'buckets': [], 'samples': [[{}, 7]]},
+            }}, f)
+
+        with override_settings(METRICS_DIR=directory):
+            before = {tuple(labels.items()): value for labels, value in
+                      metrics.collect()['roombook_notifications_created_total']['samples']}
+            User.objects.create_user('welcomed', 'welcomed@example.com', 'pass').notifications.create(
+                title='Welcome to RoomBook!', message='Hi')
+            collected = metrics.collect()
+        key = (('title', 'Welcome to RoomBook!'),)
+        self.assertGreaterEqual(before[key], 5)
+        samples = {tuple(labels.items()): value for labels, value in
+                   collected['roombook_notifications_created_total']['samples']}
+        self.assertEqual(samples[key], before[key] + 1)
+        self.assertNotIn([{}, 7], collected['roombook_email_queue_depth']['samples'])
+        self.assertIn('roombook_notifications_created_total{title="Welcome to RoomBook!"}', metrics.render(collected))
+
+
+PROFILING_DIR = os.path.join(MEDIA_ROOT, 'profiles')
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_DIR=PROFILING_DIR, PROFILING_RATE_LIMIT=2)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        Room.objects.create(owner=self.staff, title='Studio', description='Nice', price=500, location='Downtown')
+        self.client.force_login(self.staff)
+
+    def _token(self, username='staff'):
+        out = io.StringIO()
+        call_command('profiling_token', username, stdout=out, stderr=io.StringIO())
+        return out.getvalue().strip()
+
+    def test_profiles_are_stored_with_sql_and_rate_limited(self):
+        token = self._token()
+        response = self.client.get('/api/rooms/', HTTP_X_PROFILE=token, HTTP_X_PROFILER='sampling')
+        self.assertEqual(response.status_code, 200)
+        sampled_id = response['X-Profile-Id']
+        response = self.client.get('/api/rooms/', HTTP_X_PROFILE=token)
+        cprofile_id = response['X-Profile-Id']
+        # Third one in the window is over PROFILING_RATE_LIMIT
+        response = self.client.get('/api/rooms/', HTTP_X_PROFILE=token)
+        self.assertEqual(response['X-Profile-Skipped'], 'rate-limited')
+        # Never taken from the query string, where it would end up in logs and cache keys
+        response = self.client.get('/api/rooms/', {'_profile': token})
+        self.assertFalse(response.has_header('X-Profile-Id') or response.has_header('X-Profile-Skipped'))
+
+        profiles = self.client.get('/api/admin/profiles/').json()['profiles']
+        self.assertEqual([p['id'] for p in profiles], [cprofile_id, sampled_id])
+        # The first request filled the catalogue cache
+        self.assertTrue(any('rooms_room' in query['sql'] for query in profiles[1]['queries']))
+
+        speedscope = json.loads(b''.join(self.client.get(f'/api/admin/profiles/{sampled_id}/').streaming_content))
+        self.assertEqual(speedscope['profiles'][0]['type'], 'sampled')
+        response = self.client.get(f'/api/admin/profiles/{cprofile_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('.pstats', response['Content-Disposition'])
+
+    def test_token_is_bound_to_a_staff_session(self):
+        token = self._token()
+        tenant = User.objects.create_user('tenant', 'tenant@example.com', 'pass')
+        self.client.force_login(tenant)
+        response = self.client.get('/api/rooms/', HTTP_X_PROFILE=token)
+        self.assertEqual(response['X-Profile-Skipped'], 'forbidden')
+        self.assertEqual(self.client.get('/api/admin/profiles/').status_code, 403)
+        with self.assertRaises(CommandError):
+            self._token('tenant')
+
+    def test_rate_counter_row_comes_from_the_migration(self):
+        # Inserting it on the first profiled request races between workers
+        self.assertEqual(NumberSequence.objects.filter(name=RATE_SEQUENCE).count(), 1)
+        NumberSequence.objects.filter(name=RATE_SEQUENCE).delete()
+        self.assertEqual([allow() for _ in range(3)], [True, True, False])
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_profiling_ignores_the_flag(self):
+        response = self.client.get('/api/rooms/', HTTP_X_PROFILE=self._token())
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(response.has_header('X-Profile-Skipped'))
+
+
+class AIViewTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pass', is_staff=True)
+        Room.objects.create(owner=self.owner, title='Studio', description='Nice', price=500, location='Downtown')
+        self.client.force_login(self.owner)
+
+    def test_recommendations_load_ml_stack_on_demand(self):
+        res = self.client.get('/api/ml/recommendations/')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('recommendations', res.json())
+
+
+class StartupImportTests(SimpleTestCase):
+    """Plain page views must not pay for the ML, PDF and LLM stacks.
+
+    A fresh interpreter under `python -X importtime` sets up Django, builds
+    the WSGI handler (so every middleware is loaded) and imports the URLconf,
+    then reports what ended up in sys.modules.
+    """
+    HEAVY_MODULES = ['numpy', 'pandas', 'sklearn', 'joblib', 'openai', 'reportlab']
+    # Documented in replit.md; the URLconf takes a few milliseconds, so this only trips on a real regression
+    URLCONF_IMPORT_BUDGET = 0.5
+
+    def _import(self):
+        """(modules loaded, {module: cumulative import seconds})"""
+        code = ('import sys, django; from django.core.wsgi import get_wsgi_application; '
+                'get_wsgi_application(); import rooms.urls; print("\\n".join(sorted(sys.modules)))')
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='roombook.settings')
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True)
+        # import time: self [us] | cumulative | imported package
+        times = {}
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+                times[parts[2].strip()] = int(parts[1]) / 1e6
+        return result.stdout.split(), times
+
+    def test_heavy_dependencies_load_lazily(self):
+        modules, times = self._import()
+        self.assertIn('rooms.urls', modules)
+        self.assertLess(times['rooms.urls'], self.URLCONF_IMPORT_BUDGET)
+        loaded = [name for name in modules if name.split('.')[0] in self.HEAVY_MODULES]
+        self.assertEqual(loaded, [])
+        # View modules are imported by rooms.routing on their first request
+        self.assertEqual([name for name in modules if name.startswith('rooms.views.')], [])
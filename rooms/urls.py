@@ -1,77 +1,83 @@
 from django.urls import path
-from . import views
+from .routing import lazy
 
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('rooms/', views.room_list_page, name='room_list'),
-    path('rooms/<int:room_id>/', views.room_detail_page, name='room_detail'),
-    path('about/', views.about_page, name='about'),
-    path('services/', views.services_page, name='services'),
-    path('contact/', views.contact_page, name='contact'),
-    path('owner/rooms/', views.owner_rooms_page, name='owner_rooms'),
-    path('owner/rooms/add/', views.owner_room_add_page, name='owner_room_add'),
-    path('owner/rooms/<int:room_id>/edit/', views.owner_room_edit_page, name='owner_room_edit'),
-    path('my-bookings/', views.my_bookings_page, name='my_bookings'),
-    path('owner/bookings/', views.owner_bookings_page, name='owner_bookings'),
-    path('profile/', views.profile_page, name='profile'),
-    path('notifications/', views.notifications_page, name='notifications'),
-    path('privacy/', views.privacy_page, name='privacy'),
-    path('terms/', views.terms_page, name='terms'),
-    path('login/', views.login_page, name='login'),
-    path('register/', views.register_page, name='register'),
-    path('verify-otp/', views.verify_otp_page, name='verify_otp'),
-    path('logout/', views.logout_view, name='logout'),
+    path('', lazy('rooms.views.catalogue.home'), name='home'),
+    path('rooms/', lazy('rooms.views.catalogue.room_list_page'), name='room_list'),
+    path('rooms/<int:room_id>/', lazy('rooms.views.catalogue.room_detail_page'), name='room_detail'),
+    path('about/', lazy('rooms.views.catalogue.about_page'), name='about'),
+    path('services/', lazy('rooms.views.catalogue.services_page'), name='services'),
+    path('contact/', lazy('rooms.views.catalogue.contact_page'), name='contact'),
+    path('owner/rooms/', lazy('rooms.views.catalogue.owner_rooms_page'), name='owner_rooms'),
+    path('owner/rooms/add/', lazy('rooms.views.catalogue.owner_room_add_page'), name='owner_room_add'),
+    path('owner/rooms/<int:room_id>/edit/', lazy('rooms.views.catalogue.owner_room_edit_page'), name='owner_room_edit'),
+    path('my-bookings/', lazy('rooms.views.bookings.my_bookings_page'), name='my_bookings'),
+    path('owner/bookings/', lazy('rooms.views.bookings.owner_bookings_page'), name='owner_bookings'),
+    path('profile/', lazy('rooms.views.auth.profile_page'), name='profile'),
+    path('notifications/', lazy('rooms.views.auth.notifications_page'), name='notifications'),
+    path('privacy/', lazy('rooms.views.catalogue.privacy_page'), name='privacy'),
+    path('terms/', lazy('rooms.views.catalogue.terms_page'), name='terms'),
+    path('login/', lazy('rooms.views.auth.login_page'), name='login'),
+    path('register/', lazy('rooms.views.auth.register_page'), name='register'),
+    path('verify-otp/', lazy('rooms.views.auth.verify_otp_page'), name='verify_otp'),
+    path('logout/', lazy('rooms.views.auth.logout_view'), name='logout'),
     
-    path('api/rooms/', views.api_rooms, name='api_rooms'),
-    path('api/rooms/<int:room_id>/', views.api_room_detail, name='api_room_detail'),
-    path('api/owner/rooms/', views.api_owner_rooms, name='api_owner_rooms'),
-    path('api/owner/rooms/<int:room_id>/', views.api_owner_room_detail, name='api_owner_room_detail'),
-    path('api/bookings/add/', views.api_create_booking, name='api_create_booking'),
-    path('api/bookings/my/', views.api_my_bookings, name='api_my_bookings'),
-    path('api/bookings/received/', views.api_received_bookings, name='api_received_bookings'),
-    path('api/bookings/approve/<int:booking_id>/', views.api_approve_booking, name='api_approve_booking'),
-    path('api/bookings/reject/<int:booking_id>/', views.api_reject_booking, name='api_reject_booking'),
-    path('api/bookings/cancel/<int:booking_id>/', views.api_cancel_booking, name='api_cancel_booking'),
-    path('api/user/', views.api_current_user, name='api_current_user'),
-    path('api/profile/', views.api_profile, name='api_profile'),
-    path('api/notifications/', views.api_notifications, name='api_notifications'),
-    path('api/notifications/unread-count/', views.api_unread_notifications_count, name='api_unread_notifications_count'),
-    path('api/notifications/<int:notification_id>/read/', views.api_mark_notification_read, name='api_mark_notification_read'),
-    path('api/notifications/read-all/', views.api_mark_all_notifications_read, name='api_mark_all_notifications_read'),
-    path('api/invoices/', views.api_my_invoices, name='api_my_invoices'),
-    path('api/invoices/create/<int:booking_id>/', views.api_create_invoice, name='api_create_invoice'),
-    path('api/invoices/<int:invoice_id>/download/', views.api_download_invoice, name='api_download_invoice'),
-    path('api/payments/process/', views.api_process_payment, name='api_process_payment'),
-    path('api/payments/razorpay/callback/', views.api_razorpay_callback, name='api_razorpay_callback'),
-    path('api/payments/', views.api_my_payments, name='api_my_payments'),
-    path('api/admin/users/', views.api_admin_users, name='api_admin_users'),
-    path('api/admin/users/<int:user_id>/delete/', views.api_admin_delete_user, name='api_admin_delete_user'),
-    path('api/admin/users/<int:user_id>/promote/', views.api_admin_promote_user, name='api_admin_promote_user'),
-    path('api/admin/users/<int:user_id>/demote/', views.api_admin_demote_user, name='api_admin_demote_user'),
-    path('api/admin/users/<int:user_id>/toggle-status/', views.api_admin_toggle_user_status, name='api_admin_toggle_user_status'),
-    path('manage-users/', views.manage_users_page, name='manage_users'),
+    path('api/rooms/', lazy('rooms.views.catalogue.api_rooms'), name='api_rooms'),
+    path('api/rooms/availability/', lazy('rooms.views.catalogue.api_room_availability'), name='api_room_availability'),
+    path('api/rooms/<int:room_id>/', lazy('rooms.views.catalogue.api_room_detail'), name='api_room_detail'),
+    path('api/owner/rooms/', lazy('rooms.views.catalogue.api_owner_rooms'), name='api_owner_rooms'),
+    path('api/owner/rooms/<int:room_id>/', lazy('rooms.views.catalogue.api_owner_room_detail'), name='api_owner_room_detail'),
+    path('api/bookings/add/', lazy('rooms.views.bookings.api_create_booking'), name='api_create_booking'),
+    path('api/bookings/my/', lazy('rooms.views.bookings.api_my_bookings'), name='api_my_bookings'),
+    path('api/bookings/received/', lazy('rooms.views.bookings.api_received_bookings'), name='api_received_bookings'),
+    path('api/bookings/bulk/', lazy('rooms.views.bookings.api_bulk_booking_action'), name='api_bulk_booking_action'),
+    path('api/bookings/approve/<int:booking_id>/', lazy('rooms.views.bookings.api_approve_booking'), name='api_approve_booking'),
+    path('api/bookings/reject/<int:booking_id>/', lazy('rooms.views.bookings.api_reject_booking'), name='api_reject_booking'),
+    path('api/bookings/cancel/<int:booking_id>/', lazy('rooms.views.bookings.api_cancel_booking'), name='api_cancel_booking'),
+    path('api/user/', lazy('rooms.views.auth.api_current_user'), name='api_current_user'),
+    path('api/profile/', lazy('rooms.views.auth.api_profile'), name='api_profile'),
+    path('api/notifications/', lazy('rooms.views.auth.api_notifications'), name='api_notifications'),
+    path('api/notifications/unread-count/', lazy('rooms.views.auth.api_unread_notifications_count'), name='api_unread_notifications_count'),
+    path('api/notifications/<int:notification_id>/read/', lazy('rooms.views.auth.api_mark_notification_read'), name='api_mark_notification_read'),
+    path('api/notifications/read-all/', lazy('rooms.views.auth.api_mark_all_notifications_read'), name='api_mark_all_notifications_read'),
+    path('api/invoices/', lazy('rooms.views.billing.api_my_invoices'), name='api_my_invoices'),
+    path('api/invoices/create/<int:booking_id>/', lazy('rooms.views.billing.api_create_invoice'), name='api_create_invoice'),
+    path('api/invoices/<int:invoice_id>/status/', lazy('rooms.views.billing.api_invoice_status'), name='api_invoice_status'),
+    path('api/invoices/<int:invoice_id>/download/', lazy('rooms.views.billing.api_download_invoice'), name='api_download_invoice'),
+    path('api/payments/process/', lazy('rooms.views.billing.api_process_payment'), name='api_process_payment'),
+    path('api/payments/razorpay/callback/', lazy('rooms.views.billing.api_razorpay_callback'), name='api_razorpay_callback'),
+    path('api/payments/', lazy('rooms.views.billing.api_my_payments'), name='api_my_payments'),
+    path('api/admin/users/', lazy('rooms.views.admin.api_admin_users'), name='api_admin_users'),
+    path('api/admin/users/<int:user_id>/delete/', lazy('rooms.views.admin.api_admin_delete_user'), name='api_admin_delete_user'),
+    path('api/admin/users/<int:user_id>/promote/', lazy('rooms.views.admin.api_admin_promote_user'), name='api_admin_promote_user'),
+    path('api/admin/users/<int:user_id>/demote/', lazy('rooms.views.admin.api_admin_demote_user'), name='api_admin_demote_user'),
+    path('api/admin/users/<int:user_id>/toggle-status/', lazy('rooms.views.admin.api_admin_toggle_user_status'), name='api_admin_toggle_user_status'),
+    path('manage-users/', lazy('rooms.views.admin.manage_users_page'), name='manage_users'),
+    path('metrics', lazy('rooms.views.admin.metrics'), name='metrics'),
+    path('api/admin/profiles/', lazy('rooms.views.admin.api_admin_profiles'), name='api_admin_profiles'),
+    path('api/admin/profiles/<str:profile_id>/', lazy('rooms.views.admin.api_admin_profile_download'), name='api_admin_profile_download'),
     
     # AI Negotiation Assistant URLs
-    path('negotiation/', views.negotiation_assistant_page, name='negotiation_assistant'),
-    path('negotiation/<int:room_id>/', views.negotiation_assistant_page, name='negotiation_assistant_room'),
-    path('api/negotiation/analyze/', views.api_negotiation_analyze, name='api_negotiation_analyze'),
+    path('negotiation/', lazy('rooms.views.ai.negotiation_assistant_page'), name='negotiation_assistant'),
+    path('negotiation/<int:room_id>/', lazy('rooms.views.ai.negotiation_assistant_page'), name='negotiation_assistant_room'),
+    path('api/negotiation/analyze/', lazy('rooms.views.ai.api_negotiation_analyze'), name='api_negotiation_analyze'),
     
     # Google OAuth URLs
-    path('auth/google/', views.google_oauth_login, name='google_oauth_login'),
-    path('auth/google/callback/', views.google_oauth_callback, name='google_oauth_callback'),
+    path('auth/google/', lazy('rooms.views.auth.google_oauth_login'), name='google_oauth_login'),
+    path('auth/google/callback/', lazy('rooms.views.auth.google_oauth_callback'), name='google_oauth_callback'),
     
     # AI Recommendations URLs
-    path('recommendations/', views.recommendations_page, name='recommendations'),
-    path('api/ml/recommendations/', views.api_ml_recommendations, name='api_ml_recommendations'),
-    path('api/ml/train-recommender/', views.api_ml_train_recommender, name='api_ml_train_recommender'),
-    path('api/ml/predict-price/', views.api_ml_predict_price, name='api_ml_predict_price'),
+    path('recommendations/', lazy('rooms.views.ai.recommendations_page'), name='recommendations'),
+    path('api/ml/recommendations/', lazy('rooms.views.ai.api_ml_recommendations'), name='api_ml_recommendations'),
+    path('api/ml/train-recommender/', lazy('rooms.views.ai.api_ml_train_recommender'), name='api_ml_train_recommender'),
+    path('api/ml/predict-price/', lazy('rooms.views.ai.api_ml_predict_price'), name='api_ml_predict_price'),
     
     # Chatbot URLs
-    path('chatbot/', views.chatbot_page, name='chatbot'),
-    path('api/chatbot/message/', views.api_chatbot_message, name='api_chatbot_message'),
+    path('chatbot/', lazy('rooms.views.ai.chatbot_page'), name='chatbot'),
+    path('api/chatbot/message/', lazy('rooms.views.ai.api_chatbot_message'), name='api_chatbot_message'),
     
     # Rental Agreement Generator URLs
-    path('agreement-generator/', views.agreement_generator_page, name='agreement_generator'),
-    path('agreement-generator/<int:booking_id>/', views.agreement_generator_page, name='agreement_generator_booking'),
-    path('api/generate-agreement/', views.api_generate_agreement, name='api_generate_agreement'),
+    path('agreement-generator/', lazy('rooms.views.billing.agreement_generator_page'), name='agreement_generator'),
+    path('agreement-generator/<int:booking_id>/', lazy('rooms.views.billing.agreement_generator_page'), name='agreement_generator_booking'),
+    path('api/generate-agreement/', lazy('rooms.views.billing.api_generate_agreement'), name='api_generate_agreement'),
 ]
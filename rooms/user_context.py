@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.utils.crypto import constant_time_compare
+from .caching import get_cache
+from .instrumentation import record_cache
+from .models import UserProfile
+
+
+def _key(user_id):
+    return f"user-context:{user_id}"
+
+
+def user_context(user):
+    """The payload returned by /api/user/ for an authenticated user"""
+    staff_approved = False
+    if user.is_superuser:
+        staff_approved = True
+    elif user.is_staff:
+        try:
+            staff_approved = user.profile.staff_approved
+        except UserProfile.DoesNotExist:
+            staff_approved = False
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'staff_approved': staff_approved,
+        'is_authenticated': True
+    }
+
+
+def resolve_user_context(request):
+    """Return the /api/user/ payload, answering from the session and the snapshot cache when possible.
+
+    A snapshot is only used when the session still carries the auth hash it was
+    built with, so password changes log the user out exactly as they would
+    through get_user(). Anything unusual falls back to the regular lookup.
+    """
+    session = request.session
+    user_id = session.get(SESSION_KEY)
+    if user_id is None:
+        return {'is_authenticated': False}
+    if session.get(BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS:
+        snapshot = get_cache('sessions').get(_key(user_id))
+        if snapshot and constant_time_compare(snapshot['session_hash'], session.get(HASH_SESSION_KEY, '')):
+            record_cache(True)
+            return snapshot['context']
+        record_cache(False)
+
+    # Same lookup AuthenticationMiddleware does for request.user
+    user = get_user(request)
+    if not user.is_authenticated:
+        return {'is_authenticated': False}
+    context = user_context(user)
+    get_cache('sessions').set(_key(user.id), {
+        'session_hash': user.get_session_auth_hash(),
+        'context': context,
+    }, settings.USER_CONTEXT_CACHE_TIMEOUT)
+    return context
+
+
+def invalidate_user_context(user_id):
+    get_cache('sessions').delete(_key(user_id))
@@ -0,0 +1,3 @@
+# Views are split by feature (catalogue, bookings, billing, ai, auth, admin).
+# rooms/urls.py references them by dotted path so each module is only
+# imported the first time one of its URLs is hit; see rooms/routing.py.
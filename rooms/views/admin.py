@@ -0,0 +1,234 @@
+from django.conf import settings
+from django.shortcuts import render, redirect
+from django.contrib.auth.models import User
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from ..file_serving import serve_file
+
+@login_required
+def manage_users_page(request):
+    """User management page for superusers"""
+    if not request.user.is_superuser:
+        return redirect('home')
+    
+    return render(request, 'admin/users.html')
+
+@api_view(['GET'])
+@login_required
+def api_admin_users(request):
+    """Get all users for admin management"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Superuser access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        users = User.objects.all().order_by('-date_joined')
+        
+        user_data = []
+        for user in users:
+            # Count user's rooms
+            room_count = user.rooms.count()
+            
+            # Count user's bookings
+            booking_count = user.user_bookings.count()
+            
+            user_data.append({
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'is_staff': user.is_staff,
+                'is_superuser': user.is_superuser,
+                'is_active': user.is_active,
+                'date_joined': user.date_joined.strftime('%Y-%m-%d %H:%M'),
+                'last_login': user.last_login.strftime('%Y-%m-%d %H:%M') if user.last_login else 'Never',
+                'room_count': room_count,
+                'booking_count': booking_count,
+                'status': 'Active' if user.is_active else 'Inactive',
+                'role': 'Superuser' if user.is_superuser else 'Staff' if user.is_staff else 'User'
+            })
+        
+        return Response(user_data)
+        
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@login_required
+def api_admin_promote_user(request, user_id):
+    """Promote a user to staff or superuser"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Superuser access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        user_to_promote = User.objects.get(id=user_id)
+        
+        # Prevent promoting other superusers (only superusers can promote to superuser)
+        if user_to_promote.is_superuser and user_to_promote != request.user:
+            return Response({'error': 'Cannot modify other superuser accounts'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prevent self-promotion to avoid accidental privilege escalation
+        if user_to_promote == request.user:
+            return Response({'error': 'Cannot modify your own account'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = request.data
+        role = data.get('role')  # 'staff' or 'superuser'
+        
+        if role == 'staff':
+            user_to_promote.is_staff = True
+            user_to_promote.is_superuser = False
+            user_to_promote.save()
+            message = f'User {user_to_promote.username} promoted to Staff'
+        elif role == 'superuser':
+            user_to_promote.is_staff = True
+            user_to_promote.is_superuser = True
+            user_to_promote.save()
+            message = f'User {user_to_promote.username} promoted to Superuser'
+        else:
+            return Response({'error': 'Invalid role specified'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'message': message})
+        
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@login_required
+def api_admin_demote_user(request, user_id):
+    """Demote a user from staff or superuser"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Superuser access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        user_to_demote = User.objects.get(id=user_id)
+        
+        # Prevent demoting other superusers
+        if user_to_demote.is_superuser and user_to_demote != request.user:
+            return Response({'error': 'Cannot modify other superuser accounts'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prevent self-demotion
+        if user_to_demote == request.user:
+            return Response({'error': 'Cannot modify your own account'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = request.data
+        role = data.get('role')  # 'staff' or 'user'
+        
+        if role == 'staff':
+            user_to_demote.is_staff = True
+            user_to_demote.is_superuser = False
+            user_to_demote.save()
+            message = f'User {user_to_demote.username} demoted to Staff'
+        elif role == 'user':
+            user_to_demote.is_staff = False
+            user_to_demote.is_superuser = False
+            user_to_demote.save()
+            message = f'User {user_to_demote.username} demoted to regular User'
+        else:
+            return Response({'error': 'Invalid role specified'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'message': message})
+        
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@login_required
+def api_admin_toggle_user_status(request, user_id):
+    """Activate or deactivate a user account"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Superuser access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        user_to_toggle = User.objects.get(id=user_id)
+        
+        # Prevent deactivating other superusers
+        if user_to_toggle.is_superuser and user_to_toggle != request.user:
+            return Response({'error': 'Cannot modify other superuser accounts'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prevent self-deactivation
+        if user_to_toggle == request.user:
+            return Response({'error': 'Cannot modify your own account'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Toggle user status
+        user_to_toggle.is_active = not user_to_toggle.is_active
+        user_to_toggle.save()
+        
+        status = 'activated' if user_to_toggle.is_active else 'deactivated'
+        message = f'User {user_to_toggle.username} {status}'
+        
+        return Response({'message': message, 'is_active': user_to_toggle.is_active})
+        
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['DELETE'])
+@login_required
+def api_admin_delete_user(request, user_id):
+    """Delete a user and all associated data"""
+    if not request.user.is_superuser:
+        return Response({'error': 'Superuser access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        user_to_delete = User.objects.get(id=user_id)
+        
+        # Prevent deletion of superusers
+        if user_to_delete.is_superuser:
+            return Response({'error': 'Cannot delete superuser accounts'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Prevent self-deletion
+        if user_to_delete == request.user:
+            return Response({'error': 'Cannot delete your own account'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Delete user and all related data
+        user_to_delete.delete()
+        
+        return Response({'message': 'User deleted successfully'})
+        
+    except User.DoesNotExist:
+        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@require_safe
+def metrics(request):
+    """Prometheus scrape endpoint: METRICS_TOKEN as a bearer token, or a superuser session"""
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if not request.user.is_superuser and not (token and constant_time_compare(authorization, f'Bearer {token}')):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    from .. import metrics as app_metrics
+    response = HttpResponse(app_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
+
+@api_view(['GET'])
+@login_required
+def api_admin_profiles(request):
+    """Stored request profiles with their SQL, newest first"""
+    if not request.user.is_staff:
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+    from ..profiling import list_profiles
+    return Response({'profiles': list_profiles()})
+
+@require_safe
+@login_required
+def api_admin_profile_download(request, profile_id):
+    """Download a stored profile: .pstats for cProfile, speedscope JSON for the sampling profiler"""
+    if not request.user.is_staff:
+        return HttpResponse('Staff access required', status=403, content_type='text/plain')
+    from ..profiling import PROFILE_EXTENSIONS, profile_file
+    found = profile_file(profile_id)
+    if found is None:
+        raise Http404('No such profile')
+    path, profiler_name = found
+    content_type = 'application/octet-stream' if profiler_name == 'cprofile' else 'application/json'
+    return serve_file(request, path, content_type, filename=profile_id + PROFILE_EXTENSIONS[profiler_name])
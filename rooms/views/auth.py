@@ -0,0 +1,353 @@
+from django.shortcuts import render, redirect
+from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth.models import User
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes
+from rest_framework.response import Response
+from datetime import timedelta
+from ..models import UserProfile, Notification
+from ..serializers import UserProfileSerializer, NotificationSerializer
+from ..instrumentation import external_call
+from ..user_context import resolve_user_context
+from ..notifications import _generate_otp, _send_otp_email
+
+def login_page(request):
+    next_url = request.GET.get('next') or request.POST.get('next')
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        password = request.POST.get('password')
+        user = authenticate(request, username=username, password=password)
+        if user:
+            login(request, user)
+            return redirect(next_url or 'room_list')
+        if User.objects.filter(username=username, is_active=False).exists():
+            return render(request, 'auth/login.html', {'error': 'Account not verified. Please verify OTP first.'})
+        return render(request, 'auth/login.html', {'error': 'Invalid credentials'})
+    return render(request, 'auth/login.html', {'next': next_url})
+
+def register_page(request):
+    if request.method == 'POST':
+        username = request.POST.get('username')
+        email = request.POST.get('email')
+        password = request.POST.get('password')
+        first_name = request.POST.get('first_name', '')
+        last_name = request.POST.get('last_name', '')
+        account_type = request.POST.get('account_type', 'user')
+        
+        if User.objects.filter(username=username).exists():
+            return render(request, 'auth/register.html', {'error': 'Username already exists'})
+
+        if User.objects.filter(email=email).exists():
+            return render(request, 'auth/register.html', {'error': 'Email already exists'})
+        
+        user = User.objects.create_user(
+            username=username,
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name
+        )
+        user.is_active = False
+        user.save()
+
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        if account_type == 'staff':
+            profile.staff_requested = True
+            profile.staff_approved = False
+
+        otp = _generate_otp()
+        profile.otp_code = otp
+        profile.otp_created_at = timezone.now()
+        profile.email_verified = False
+        profile.save()
+
+        try:
+            _send_otp_email(email, otp)
+        except RuntimeError:
+            # Email not configured (common on Render). Auto-verify for demo deployments.
+            profile.email_verified = True
+            profile.otp_code = ''
+            profile.save()
+            user.is_active = True
+            user.save()
+            login(request, user)
+            return redirect('room_list')
+        except Exception as e:
+            return render(request, 'auth/register.html', {'error': str(e)})
+
+        request.session['pending_user_id'] = user.id
+        return redirect('verify_otp')
+    return render(request, 'auth/register.html')
+
+def verify_otp_page(request):
+    pending_user_id = request.session.get('pending_user_id')
+    if not pending_user_id:
+        return redirect('register')
+
+    try:
+        user = User.objects.get(id=pending_user_id)
+    except User.DoesNotExist:
+        request.session.pop('pending_user_id', None)
+        return redirect('register')
+
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+
+    if request.method == 'POST':
+        action = request.POST.get('action', 'verify')
+        if action == 'resend':
+            otp = _generate_otp()
+            profile.otp_code = otp
+            profile.otp_created_at = timezone.now()
+            profile.save()
+            try:
+                _send_otp_email(user.email, otp)
+            except Exception as e:
+                return render(request, 'auth/verify_otp.html', {'email': user.email, 'error': str(e)})
+            return render(request, 'auth/verify_otp.html', {'email': user.email, 'message': 'OTP resent successfully'})
+
+        otp_input = (request.POST.get('otp') or '').strip()
+        if not otp_input or len(otp_input) != 6:
+            return render(request, 'auth/verify_otp.html', {'email': user.email, 'error': 'Invalid OTP'})
+
+        if not profile.otp_code or otp_input != profile.otp_code:
+            return render(request, 'auth/verify_otp.html', {'email': user.email, 'error': 'Incorrect OTP'})
+
+        if not profile.otp_created_at or timezone.now() - profile.otp_created_at > timedelta(minutes=10):
+            return render(request, 'auth/verify_otp.html', {'email': user.email, 'error': 'OTP expired. Please resend OTP.'})
+
+        profile.email_verified = True
+        profile.otp_code = ''
+        profile.save()
+        user.is_active = True
+        user.save()
+
+        request.session.pop('pending_user_id', None)
+        login(request, user)
+        return redirect('room_list')
+
+    return render(request, 'auth/verify_otp.html', {'email': user.email})
+
+def logout_view(request):
+    logout(request)
+    return redirect('home')
+
+# Google OAuth Views
+def google_oauth_login(request):
+    """Initiate Google OAuth login"""
+    if not settings.GOOGLE_OAUTH2_CLIENT_ID or not settings.GOOGLE_OAUTH2_CLIENT_SECRET:
+        return JsonResponse({'error': 'Google OAuth not configured'}, status=500)
+
+    # Build redirect URI dynamically from current host/scheme (works on Render)
+    redirect_uri = request.build_absolute_uri(reverse('google_oauth_callback'))
+    request.session['google_oauth_redirect_uri'] = redirect_uri
+    
+    # Build the OAuth URL
+    auth_url = 'https://accounts.google.com/o/oauth2/v2/auth'
+    params = {
+        'client_id': settings.GOOGLE_OAUTH2_CLIENT_ID,
+        'redirect_uri': redirect_uri,
+        'scope': ' '.join(settings.GOOGLE_OAUTH2_SCOPES),
+        'response_type': 'code',
+        'access_type': 'offline',
+        'prompt': 'consent'
+    }
+    
+    # Redirect to Google OAuth
+    from urllib.parse import urlencode
+    redirect_url = f"{auth_url}?{urlencode(params)}"
+    return redirect(redirect_url)
+
+def google_oauth_callback(request):
+    """Handle Google OAuth callback"""
+    import requests
+
+    if not settings.GOOGLE_OAUTH2_CLIENT_ID or not settings.GOOGLE_OAUTH2_CLIENT_SECRET:
+        return JsonResponse({'error': 'Google OAuth not configured'}, status=500)
+    
+    # Get authorization code from Google
+    code = request.GET.get('code')
+    if not code:
+        return JsonResponse({'error': 'Authorization code not found'}, status=400)
+    
+    try:
+        redirect_uri = request.session.get('google_oauth_redirect_uri') or request.build_absolute_uri(reverse('google_oauth_callback'))
+
+        # Exchange authorization code for access token
+        token_url = 'https://oauth2.googleapis.com/token'
+        token_data = {
+            'client_id': settings.GOOGLE_OAUTH2_CLIENT_ID,
+            'client_secret': settings.GOOGLE_OAUTH2_CLIENT_SECRET,
+            'code': code,
+            'grant_type': 'authorization_code',
+            'redirect_uri': redirect_uri
+        }
+        
+        with external_call('google'):
+            token_response = requests.post(token_url, data=token_data)
+        token_response.raise_for_status()
+        token_info = token_response.json()
+        
+        # Get user info from Google
+        user_info_url = 'https://www.googleapis.com/oauth2/v2/userinfo'
+        headers = {'Authorization': f'Bearer {token_info["access_token"]}'}
+        with external_call('google'):
+            user_info_response = requests.get(user_info_url, headers=headers)
+        user_info_response.raise_for_status()
+        user_info = user_info_response.json()
+        
+        # Process user information
+        email = user_info.get('email')
+        first_name = user_info.get('given_name', '')
+        last_name = user_info.get('family_name', '')
+        google_id = user_info.get('id')
+        
+        if not email:
+            return JsonResponse({'error': 'Email not provided by Google'}, status=400)
+        
+        # Check if user already exists
+        try:
+            user = User.objects.get(email=email)
+            if not user.is_active:
+                user.is_active = True
+                user.save()
+            UserProfile.objects.get_or_create(user=user)
+            login(request, user)
+            return redirect('room_list')
+        except User.DoesNotExist:
+            # Create new user
+            username = email.split('@')[0]
+            counter = 1
+            while User.objects.filter(username=username).exists():
+                username = f"{email.split('@')[0]}{counter}"
+                counter += 1
+            
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                is_active=True  # Google users are pre-verified
+            )
+            
+            # Create/update user profile
+            profile, _ = UserProfile.objects.get_or_create(user=user)
+            profile.email_verified = True
+            profile.google_id = google_id
+            profile.save()
+            
+            # Log in the new user
+            login(request, user)
+            
+            # Create welcome notification
+            Notification.objects.create(
+                user=user,
+                title='Welcome to RoomBook!',
+                message='Your account has been created successfully using Google.',
+                link='/rooms/'
+            )
+            
+            return redirect('home')
+            
+    except requests.exceptions.RequestException as e:
+        return JsonResponse({'error': f'Google API error: {str(e)}'}, status=500)
+    except Exception as e:
+        return JsonResponse({'error': f'OAuth callback error: {str(e)}'}, status=500)
+
+# Account Views
+@login_required
+def profile_page(request):
+    return render(request, 'profile.html')
+
+@login_required
+def notifications_page(request):
+    return render(request, 'notifications.html')
+
+@api_view(['GET'])
+@authentication_classes([])
+def api_current_user(request):
+    # Requested on every page load: the session user is resolved in
+    # resolve_user_context so that cached hits never touch the database
+    return Response(resolve_user_context(request._request))
+
+@api_view(['GET', 'PUT'])
+def api_profile(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+
+    if request.method == 'GET':
+        return Response({
+            'user': {
+                'username': request.user.username,
+                'email': request.user.email,
+                'first_name': request.user.first_name,
+                'last_name': request.user.last_name,
+            },
+            'profile': UserProfileSerializer(profile).data
+        })
+
+    user_data = request.data.get('user', {}) if isinstance(request.data, dict) else {}
+    profile_data = request.data.get('profile', {}) if isinstance(request.data, dict) else {}
+
+    request.user.first_name = user_data.get('first_name', request.user.first_name)
+    request.user.last_name = user_data.get('last_name', request.user.last_name)
+    request.user.email = user_data.get('email', request.user.email)
+    request.user.save()
+
+    serializer = UserProfileSerializer(profile, data=profile_data, partial=True)
+    if serializer.is_valid():
+        serializer.save()
+        return Response({
+            'user': {
+                'username': request.user.username,
+                'email': request.user.email,
+                'first_name': request.user.first_name,
+                'last_name': request.user.last_name,
+            },
+            'profile': serializer.data
+        })
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+def api_notifications(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    serializer = NotificationSerializer(notifications, many=True)
+    return Response(serializer.data)
+
+@api_view(['GET'])
+def api_unread_notifications_count(request):
+    if not request.user.is_authenticated:
+        return Response({'count': 0})
+    count = Notification.objects.filter(user=request.user, is_read=False).count()
+    return Response({'count': count})
+
+@api_view(['PUT'])
+def api_mark_notification_read(request, notification_id):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    try:
+        notification = Notification.objects.get(id=notification_id, user=request.user)
+    except Notification.DoesNotExist:
+        return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    notification.is_read = True
+    notification.save()
+    return Response({'success': True})
+
+@api_view(['PUT'])
+def api_mark_all_notifications_read(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    return Response({'success': True})
@@ -0,0 +1,480 @@
+from django.shortcuts import render, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+import io
+import logging
+import os
+from ..models import Booking, Notification, Invoice, Payment
+from ..serializers import InvoiceSerializer, PaymentSerializer
+from ..invoicing import build_invoice
+from ..sequences import next_transaction_id
+from ..invoice_worker import enqueue_invoice_pdf
+from ..file_serving import serve_file
+from ..storage import IMMUTABLE_MAX_AGE, is_hashed_name, original_name
+from ..agreement_cache import get_or_create_agreement_pdf
+from ..instrumentation import external_call
+from ..notifications import _send_payment_confirmation_email
+
+logger = logging.getLogger(__name__)
+
+@api_view(['POST'])
+def api_create_invoice(request, booking_id):
+    """Create invoice for an approved booking"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    try:
+        booking = Booking.objects.get(id=booking_id, user=request.user)
+    except Booking.DoesNotExist:
+        return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if booking.status != 'approved':
+        return Response({'error': 'Invoice can only be created for approved bookings'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if hasattr(booking, 'invoice'):
+        return Response({'error': 'Invoice already exists for this booking'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        invoice = build_invoice(booking)
+        invoice.save()
+        
+        # Render the PDF off-request; the invoice flips to 'sent' once it is ready
+        enqueue_invoice_pdf(invoice)
+        invoice.refresh_from_db()
+        
+        serializer = InvoiceSerializer(invoice)
+        return Response({
+            'data': serializer.data,
+            'status_url': reverse('api_invoice_status', args=[invoice.id]),
+            'message': 'Invoice created. The PDF is being generated and will be emailed to you shortly.'
+        }, status=status.HTTP_202_ACCEPTED if invoice.status == 'draft' else status.HTTP_201_CREATED)
+            
+    except Exception as e:
+        return Response({'error': f'Invoice creation failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def api_invoice_status(request, invoice_id):
+    """Poll the PDF generation status of an invoice"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    try:
+        invoice = Invoice.objects.get(id=invoice_id, booking__user=request.user)
+    except Invoice.DoesNotExist:
+        return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'id': invoice.id,
+        'invoice_number': invoice.invoice_number,
+        'status': invoice.status,
+        'pdf_status': invoice.pdf_status,
+        'pdf_ready': invoice.pdf_status == 'ready',
+    })
+
+@api_view(['GET'])
+def api_download_invoice(request, invoice_id):
+    """Download invoice PDF"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    try:
+        invoice = Invoice.objects.get(id=invoice_id, booking__user=request.user)
+    except Invoice.DoesNotExist:
+        return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if not invoice.pdf_file:
+        return Response({'error': 'PDF file not available'}, status=status.HTTP_404_NOT_FOUND)
+    
+    # Stream the PDF file, honouring ETag/Last-Modified and Range requests
+    pdf_file = invoice.pdf_file.path
+    if os.path.exists(pdf_file):
+        cache_control = (f'private, max-age={IMMUTABLE_MAX_AGE}, immutable' if is_hashed_name(pdf_file)
+                         else 'private, no-cache')
+        return serve_file(request, pdf_file, 'application/pdf', original_name(pdf_file),
+                          storage_name=invoice.pdf_file.name, cache_control=cache_control)
+    else:
+        return Response({'error': 'PDF file not found'}, status=status.HTTP_404_NOT_FOUND)
+
+@api_view(['GET'])
+def api_my_invoices(request):
+    """Get all invoices for the current user"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    invoices = Invoice.objects.filter(booking__user=request.user).order_by('-created_at')
+    serializer = InvoiceSerializer(invoices, many=True)
+    return Response(serializer.data)
+
+@api_view(['POST'])
+def api_process_payment(request):
+    """Process payment for an invoice using Razorpay"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    invoice_id = request.data.get('invoice_id')
+    
+    if not invoice_id:
+        return Response({'error': 'Invoice ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        invoice = Invoice.objects.get(id=invoice_id, booking__user=request.user)
+    except Invoice.DoesNotExist:
+        return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if invoice.status == 'paid':
+        return Response({'error': 'Invoice is already paid'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Check if there's already a completed payment for this invoice
+    existing_payment = Payment.objects.filter(invoice=invoice, status='completed').first()
+    if existing_payment:
+        return Response({'error': 'Payment already completed for this invoice'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Import Razorpay here to avoid import issues if not configured
+    try:
+        import razorpay
+        from django.conf import settings
+    except ImportError:
+        return Response({'error': 'Razorpay not installed. Please install razorpay package.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    # Initialize Razorpay client
+    try:
+        razorpay_client = razorpay.Client(
+            auth=(getattr(settings, 'RAZORPAY_KEY_ID', ''), 
+                  getattr(settings, 'RAZORPAY_KEY_SECRET', ''))
+        )
+    except Exception as e:
+        return Response({'error': f'Razorpay configuration error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    # Generate transaction ID
+    transaction_id = next_transaction_id()
+    
+    try:
+        # Create Razorpay order
+        with external_call('razorpay'):
+            razorpay_order = razorpay_client.order.create({
+                'amount': int(invoice.total_amount * 100),  # Amount in paise
+                'currency': 'INR',
+                'receipt': invoice.invoice_number,
+                'notes': {
+                    'invoice_id': invoice.id,
+                    'user_id': request.user.id,
+                    'booking_id': invoice.booking.id
+                }
+            })
+        
+        # Create payment record
+        payment = Payment.objects.create(
+            invoice=invoice,
+            payment_method='razorpay',
+            transaction_id=transaction_id,
+            amount=invoice.total_amount,
+            status='processing',
+            gateway_response={
+                'razorpay_order_id': razorpay_order['id'],
+                'amount': razorpay_order['amount'],
+                'currency': razorpay_order['currency'],
+                'status': 'created'
+            }
+        )
+        
+        return Response({
+            'payment_id': payment.id,
+            'razorpay_order_id': razorpay_order['id'],
+            'razorpay_key_id': getattr(settings, 'RAZORPAY_KEY_ID', ''),
+            'amount_paise': razorpay_order['amount'],
+            'currency': razorpay_order['currency'],
+            'invoice_number': invoice.invoice_number,
+            'description': f'Payment for {invoice.invoice_number}',
+            'customer_name': f"{invoice.booking.user.first_name} {invoice.booking.user.last_name}".strip() or invoice.booking.user.username,
+            'customer_email': invoice.booking.user.email,
+            'callback_url': f"{getattr(settings, 'BASE_URL', 'http://localhost:8000')}/api/payments/razorpay/callback/"
+        }, status=status.HTTP_201_CREATED)
+        
+    except Exception as e:
+        return Response({'error': f'Failed to create Razorpay order: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def api_razorpay_callback(request):
+    """Handle Razorpay payment callback"""
+    payment_id = request.data.get('payment_id')
+    razorpay_order_id = request.data.get('razorpay_order_id')
+    razorpay_signature = request.data.get('razorpay_signature')
+    
+    # The signature stays out of the logs
+    logger.debug("Razorpay callback: payment_id=%s order_id=%s", payment_id, razorpay_order_id)
+    
+    if not all([payment_id, razorpay_order_id, razorpay_signature]):
+        logger.warning("Razorpay callback missing parameters: payment_id=%s order_id=%s", payment_id, razorpay_order_id)
+        return Response({'error': 'Missing required Razorpay parameters'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        # Find the payment by Razorpay order ID
+        payment = Payment.objects.filter(
+            payment_method='razorpay',
+            status='processing'
+        ).first()
+        
+        if not payment:
+            logger.warning("Razorpay callback for order %s: no processing payment", razorpay_order_id)
+            return Response({'error': 'Payment not found or already processed'}, status=status.HTTP_404_NOT_FOUND)
+            
+        # Check if this payment matches the order ID
+        stored_order_id = payment.gateway_response.get('razorpay_order_id')
+        
+        # If order IDs don't match, find the correct payment
+        if stored_order_id != razorpay_order_id:
+            all_processing_payments = Payment.objects.filter(
+                payment_method='razorpay',
+                status='processing'
+            )
+            for p in all_processing_payments:
+                if p.gateway_response.get('razorpay_order_id') == razorpay_order_id:
+                    payment = p
+                    break
+            else:
+                logger.warning("Razorpay callback for order %s: no matching payment", razorpay_order_id)
+                return Response({'error': 'Payment not found or already processed'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Update payment status (without Razorpay capture for now)
+        payment.status = 'completed'
+        payment.payment_date = timezone.now()
+        payment.gateway_response.update({
+            'razorpay_payment_id': payment_id,
+            'razorpay_signature': razorpay_signature,
+            'status': 'success',
+            'captured': True
+        })
+        payment.save()
+        
+        # Update invoice status
+        payment.invoice.status = 'paid'
+        payment.invoice.save()
+        
+        # Send email notification
+        try:
+            _send_payment_confirmation_email(payment)
+        except Exception as e:
+            logger.warning("Failed to send payment confirmation email for payment %s: %s", payment.id, e)
+        
+        # Create notification
+        try:
+            Notification.objects.create(
+                user=payment.invoice.booking.user,
+                title='Payment Successful',
+                message=f"Payment of ${payment.invoice.total_amount:.2f} for invoice {payment.invoice.invoice_number} has been processed successfully via Razorpay.",
+                link='/my-bookings/'
+            )
+        except Exception as e:
+            logger.warning("Failed to create payment notification for payment %s: %s", payment.id, e)
+        
+        logger.info("Razorpay payment %s completed for invoice %s", payment.id, payment.invoice.invoice_number)
+        return Response({'success': True, 'message': 'Payment processed successfully'}, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.exception("Razorpay payment processing failed for order %s", razorpay_order_id)
+        return Response({'error': f'Payment processing failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def api_my_payments(request):
+    """Get current user's payments"""
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    payments = Payment.objects.filter(invoice__booking__user=request.user).order_by('-created_at')
+    serializer = PaymentSerializer(payments, many=True)
+    return Response(serializer.data)
+
+# Rental Agreement Generator Views
+@login_required
+def agreement_generator_page(request, booking_id=None):
+    """Rental agreement generator page"""
+    booking = None
+    if booking_id:
+        booking = get_object_or_404(Booking, id=booking_id, user=request.user)
+    
+    return render(request, 'legal/agreement_generator.html', {'booking': booking})
+
+@api_view(['POST'])
+@login_required
+def api_generate_agreement(request):
+    """API endpoint for generating rental agreement"""
+    try:
+        data = request.data
+        booking_id = data.get('booking_id')
+        
+        if booking_id:
+            # Generate agreement for existing booking
+            booking = get_object_or_404(Booking, id=booking_id, user=request.user)
+            agreement_text = generate_rental_agreement(booking)
+        else:
+            # Generate agreement with provided details
+            required_fields = ['owner_name', 'tenant_name', 'property_address', 'rent_amount', 'duration_months']
+            for field in required_fields:
+                if field not in data:
+                    return JsonResponse({'error': f'Missing required field: {field}'}, status=400)
+            
+            agreement_text = generate_custom_agreement(data)
+        
+        # Reuse the cached PDF when the rendered agreement is unchanged
+        pdf_path = get_or_create_agreement_pdf(
+            agreement_text,
+            data.get('title', 'Rental Agreement'),
+            create_agreement_pdf,
+            booking_id=booking_id
+        )
+        
+        return serve_file(request, pdf_path, 'application/pdf', 'rental_agreement.pdf')
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def generate_rental_agreement(booking):
+    """Generate rental agreement text for a booking"""
+    start_date = booking.start_date.strftime('%B %d, %Y')
+    end_date = booking.end_date.strftime('%B %d, %Y')
+    duration = (booking.end_date - booking.start_date).days
+    
+    agreement = f"""
+RENTAL AGREEMENT
+
+This Rental Agreement is made and entered into on {timezone.now().strftime('%B %d, %Y')} 
+
+BETWEEN:
+{booking.room.owner.get_full_name() or booking.room.owner.username} (hereinafter "Owner")
+Address: {booking.room.owner.profile.address if hasattr(booking.room.owner, 'profile') else 'Not specified'}
+
+AND:
+{booking.user.get_full_name() or booking.user.username} (hereinafter "Tenant")
+Address: {booking.user.profile.address if hasattr(booking.user, 'profile') else 'Not specified'}
+
+PROPERTY:
+{booking.room.title}
+Location: {booking.room.location}
+Description: {booking.room.description}
+
+TERM:
+This agreement shall commence on {start_date} and expire on {end_date} (Duration: {duration} days).
+
+RENT:
+Monthly Rent: ${booking.room.price}
+Total Rent: ${booking.total_rent}
+Payment Method: Online payment through RoomBook platform
+
+TERMS AND CONDITIONS:
+
+1. USE OF PREMISES: The premises shall be used for residential purposes only.
+
+2. MAINTENANCE: The Tenant shall keep the premises in clean and good condition.
+
+3. UTILITIES: Utilities are included/excluded as specified in the room listing.
+
+4. SECURITY DEPOSIT: A security deposit may be required as per platform policies.
+
+5. TERMINATION: This agreement may be terminated by either party with proper notice as per platform terms.
+
+6. HOUSE RULES: Tenant agrees to abide by all house rules specified in the room listing.
+
+7. PAYMENT TERMS: Rent shall be paid through the RoomBook platform according to the payment schedule.
+
+This agreement constitutes the entire understanding between the parties and supersedes all prior agreements.
+
+OWNER SIGNATURE: _________________________ Date: ___________
+
+TENANT SIGNATURE: _________________________ Date: ___________
+
+Generated by RoomBook AI Agreement Generator
+{timezone.now().strftime('%B %d, %Y')}
+"""
+    return agreement.strip()
+
+def generate_custom_agreement(data):
+    """Generate custom rental agreement text"""
+    agreement = f"""
+RENTAL AGREEMENT
+
+This Rental Agreement is made and entered into on {timezone.now().strftime('%B %d, %Y')}
+
+BETWEEN:
+{data['owner_name']} (hereinafter "Owner")
+
+AND:
+{data['tenant_name']} (hereinafter "Tenant")
+
+PROPERTY:
+{data['property_address']}
+{data.get('property_description', '')}
+
+TERM:
+Duration: {data['duration_months']} months
+Commencement Date: {data.get('start_date', 'To be determined')}
+
+RENT:
+Monthly Rent: ${data['rent_amount']}
+Payment Due: {data.get('payment_due_date', 'First day of each month')}
+
+TERMS AND CONDITIONS:
+
+1. USE OF PREMISES: The premises shall be used for residential purposes only.
+
+2. MAINTENANCE: The Tenant shall maintain the premises in good condition.
+
+3. UTILITIES: All utilities and additional charges as specified.
+
+4. SECURITY DEPOSIT: {data.get('security_deposit', 'As per local laws')}
+
+5. TERMINATION: Notice period as per local rental laws.
+
+6. ADDITIONAL TERMS: {data.get('additional_terms', 'None specified')}
+
+This agreement is legally binding and constitutes the entire understanding between parties.
+
+OWNER SIGNATURE: _________________________ Date: ___________
+
+TENANT SIGNATURE: _________________________ Date: ___________
+
+Generated by RoomBook AI Agreement Generator
+{timezone.now().strftime('%B %d, %Y')}
+"""
+    return agreement.strip()
+
+def create_agreement_pdf(agreement_text, title):
+    """Create PDF from agreement text"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.enums import TA_CENTER
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Title
+    title_style = styles['Title']
+    title_style.alignment = TA_CENTER
+    story.append(Paragraph(title, title_style))
+    story.append(Spacer(1, 12))
+    
+    # Agreement content
+    content_style = styles['Normal']
+    paragraphs = agreement_text.split('\n\n')
+    
+    for paragraph in paragraphs:
+        if paragraph.strip():
+            if paragraph.strip().endswith(':'):
+                # Header
+                header_style = styles['Heading2']
+                story.append(Paragraph(paragraph.strip(), header_style))
+            else:
+                # Regular text
+                story.append(Paragraph(paragraph.strip(), content_style))
+            story.append(Spacer(1, 6))
+    
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
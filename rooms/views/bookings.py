@@ -0,0 +1,193 @@
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from ..availability import is_available
+from ..booking_states import bulk_transition, transition, TransitionError
+from ..models import Room, Booking, Notification
+from ..serializers import BookingSerializer
+from .common import _can_manage_as_staff
+
+@login_required
+def my_bookings_page(request):
+    return render(request, 'bookings/my_bookings.html')
+
+@login_required
+def owner_bookings_page(request):
+    if not _can_manage_as_staff(request.user):
+        return redirect('home')
+    return render(request, 'bookings/owner_bookings.html')
+
+@api_view(['POST'])
+def api_create_booking(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    room_id = request.data.get('room_id')
+    start_date_str = request.data.get('start_date')
+    months_str = request.data.get('months', 1)
+    
+    if not room_id:
+        return Response({'error': 'Room ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not start_date_str:
+        return Response({'error': 'Start date is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        months = int(months_str)
+        if months < 1 or months > 24:
+            return Response({'error': 'Months must be between 1 and 24'}, status=status.HTTP_400_BAD_REQUEST)
+    except (ValueError, TypeError):
+        return Response({'error': 'Invalid months value'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        room = Room.objects.get(id=room_id)
+    except Room.DoesNotExist:
+        return Response({'error': 'Room not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if room.owner == request.user:
+        return Response({'error': 'You cannot book your own room'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    end_date = start_date + relativedelta(months=months)
+    total_rent = float(room.price) * months
+    
+    with transaction.atomic():
+        # Lock the room so two requests cannot both pass the overlap check
+        Room.objects.select_for_update().filter(id=room.id).first()
+        if not is_available(room.id, start_date, end_date):
+            return Response({'error': 'Room is already booked for these dates'}, status=status.HTTP_409_CONFLICT)
+        booking = Booking.objects.create(
+            room=room,
+            user=request.user,
+            owner=room.owner,
+            start_date=start_date,
+            end_date=end_date,
+            months=months,
+            total_rent=total_rent
+        )
+
+    Notification.objects.create(
+        user=room.owner,
+        title='New booking request',
+        message=f"{request.user.username} requested to book '{room.title}' for {months} month(s).",
+        link='/owner/bookings/'
+    )
+
+    serializer = BookingSerializer(booking)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+@api_view(['GET'])
+def api_my_bookings(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    bookings = Booking.objects.filter(user=request.user).order_by('-created_at')
+    serializer = BookingSerializer(bookings, many=True)
+    return Response(serializer.data)
+
+@api_view(['GET'])
+def api_received_bookings(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    bookings = Booking.objects.filter(owner=request.user).order_by('-created_at')
+    serializer = BookingSerializer(bookings, many=True)
+    return Response(serializer.data)
+
+def _transition_response(booking, to_status, actor):
+    try:
+        transition(booking, to_status, actor)
+    except TransitionError as e:
+        code = status.HTTP_409_CONFLICT if e.code == 'conflict' else status.HTTP_400_BAD_REQUEST
+        return Response({'error': str(e)}, status=code)
+    serializer = BookingSerializer(booking)
+    return Response(serializer.data)
+
+@api_view(['PUT'])
+def api_approve_booking(request, booking_id):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        booking = Booking.objects.select_related('room', 'user').get(id=booking_id, owner=request.user)
+    except Booking.DoesNotExist:
+        return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return _transition_response(booking, 'approved', request.user)
+
+@api_view(['PUT'])
+def api_reject_booking(request, booking_id):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        booking = Booking.objects.select_related('room', 'user').get(id=booking_id, owner=request.user)
+    except Booking.DoesNotExist:
+        return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return _transition_response(booking, 'rejected', request.user)
+
+@api_view(['PUT'])
+def api_cancel_booking(request, booking_id):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    try:
+        booking = Booking.objects.select_related('room').get(id=booking_id, user=request.user)
+    except Booking.DoesNotExist:
+        return Response({'error': 'Booking not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return _transition_response(booking, 'cancelled', request.user)
+
+BULK_ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+BULK_LIMIT = 200
+
+@api_view(['POST'])
+def api_bulk_booking_action(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    to_status = BULK_ACTIONS.get(request.data.get('action'))
+    if not to_status:
+        return Response({'error': 'Action must be approve or reject'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    booking_ids = request.data.get('booking_ids')
+    try:
+        if not isinstance(booking_ids, list):
+            raise TypeError
+        booking_ids = list(dict.fromkeys(int(booking_id) for booking_id in booking_ids))
+    except (TypeError, ValueError):
+        return Response({'error': 'booking_ids must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if not booking_ids or len(booking_ids) > BULK_LIMIT:
+        return Response({'error': f'Send between 1 and {BULK_LIMIT} booking ids'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Ownership is checked for the whole batch in one query
+    bookings = list(Booking.objects.select_related('room', 'user').filter(id__in=booking_ids, owner=request.user))
+    outcome = bulk_transition(bookings, to_status, request.user)
+    
+    results = []
+    for booking_id in booking_ids:
+        if booking_id not in outcome:
+            results.append({'id': booking_id, 'ok': False, 'error': 'Booking not found'})
+        elif outcome[booking_id]:
+            results.append({'id': booking_id, 'ok': False, 'error': outcome[booking_id]})
+        else:
+            results.append({'id': booking_id, 'ok': True, 'status': to_status})
+    return Response({'results': results})
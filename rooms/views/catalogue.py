@@ -0,0 +1,305 @@
+import functools
+import mimetypes
+import os
+import posixpath
+import orjson
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.utils.cache import add_never_cache_headers, patch_vary_headers
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+from django.views.decorators.vary import vary_on_headers
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes
+from rest_framework.decorators import parser_classes
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.parsers import MultiPartParser, FormParser
+from ..availability import available_rooms, booked_periods, parse_period
+from ..caching import cached_call, catalogue_version
+from ..compression import accepted_encodings, choose_encoding, precompress
+from ..file_serving import serve_file
+from ..models import Room
+from ..renderers import ORJSONRenderer
+from ..serializers import RoomSerializer, room_list_fields, serialize_room_rows
+from ..storage import IMMUTABLE_MAX_AGE, is_hashed_name
+from .common import _can_manage_as_staff
+
+def home(request):
+    return render(request, 'home.html')
+
+def room_list_page(request):
+    return render(request, 'rooms/room_list.html')
+
+def room_detail_page(request, room_id):
+    return render(request, 'rooms/room_detail.html', {'room_id': room_id})
+
+def about_page(request):
+    return render(request, 'about/about.html')
+
+def services_page(request):
+    return render(request, 'services/services.html')
+
+def contact_page(request):
+    return render(request, 'contact/contact.html')
+
+def privacy_page(request):
+    """Privacy Policy page"""
+    return render(request, 'legal/privacy.html')
+
+def terms_page(request):
+    """Terms of Service page"""
+    return render(request, 'legal/terms.html')
+
+@login_required
+def owner_rooms_page(request):
+    if not _can_manage_as_staff(request.user):
+        return redirect('home')
+    return render(request, 'rooms/owner_rooms.html')
+
+@login_required
+def owner_room_add_page(request):
+    if not _can_manage_as_staff(request.user):
+        return redirect('home')
+    return render(request, 'rooms/room_form.html', {'room_id': None})
+
+@login_required
+def owner_room_edit_page(request, room_id):
+    if not _can_manage_as_staff(request.user):
+        return redirect('home')
+    return render(request, 'rooms/room_form.html', {'room_id': room_id})
+
+def _renderer_format(request):
+    """Format of the renderer DRF will pick: 'json', or 'api' for the Browsable API"""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        return DefaultContentNegotiation().select_renderer(Request(request), renderers)[0].format
+    except NotAcceptable:
+        return renderers[0].format
+
+def _catalogue_etag(request, *args, **kwargs):
+    # One tag per representation: the JSON and HTML renderings and each encoding differ byte for byte
+    encoding = choose_encoding(request) or 'identity'
+    return f'"catalogue-{catalogue_version()[0]}-{_renderer_format(request)}-{encoding}"'
+
+def _catalogue_last_modified(request, *args, **kwargs):
+    return catalogue_version()[1]
+
+def _cache_only_success(view):
+    """Drop the catalogue validators and public caching from error responses.
+
+    Otherwise a 400 or 404 would carry the same ETag as the listing, and a
+    client revalidating with it could get a 304 for a body it never received.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+                response.headers.pop(header, None)
+            add_never_cache_headers(response)
+        return response
+    return wrapper
+
+def _clean(value):
+    value = (value or '').strip()
+    return value or None
+
+# Anonymous and identical for every user, so authentication (and the Vary: Cookie
+# that comes with reading the session) is skipped and the response is public
+@_cache_only_success
+@cache_control(public=True, max_age=settings.CATALOGUE_MAX_AGE)
+@vary_on_headers('Accept')
+@condition(etag_func=_catalogue_etag, last_modified_func=_catalogue_last_modified)
+@api_view(['GET'])
+@authentication_classes([])
+def api_rooms(request):
+    q = _clean(request.GET.get('q'))
+    location = _clean(request.GET.get('location'))
+    min_price = _clean(request.GET.get('min_price'))
+    max_price = _clean(request.GET.get('max_price'))
+    sort = request.GET.get('sort')
+    if sort not in ('price_asc', 'price_desc'):
+        sort = 'newest'
+    try:
+        period = parse_period(request.GET.get('available_from'), request.GET.get('available_to'),
+                              request.GET.get('months'))
+        fields, description_length = room_list_fields(request.GET.get('fields'), request.GET.get('view'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    shape = (tuple(fields), description_length)
+
+    # image_url is absolute, so the scheme and host are part of the key
+    key = (catalogue_version()[0], request.scheme, request.get_host(), q, location, min_price, max_price, sort,
+           period, shape)
+    # Rendered and compressed once per cache fill rather than on every request
+    bodies = cached_call('catalogue', key, lambda: precompress(ORJSONRenderer().render(
+        _search_rooms(request, q, location, min_price, max_price, sort, period, shape)
+    )))
+    if request.accepted_renderer.format != 'json':
+        # Browsable API
+        return Response(orjson.loads(bodies['identity']))
+    return _precompressed_response(request, bodies)
+
+def _precompressed_response(request, bodies):
+    accepted = accepted_encodings(request)
+    encoding = next((name for name in ('br', 'gzip') if name in bodies and name in accepted), None)
+    response = HttpResponse(bodies[encoding or 'identity'], content_type='application/json')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+def _search_rooms(request, q, location, min_price, max_price, sort, period, shape):
+    rooms = Room.objects.all()
+    if period:
+        rooms = available_rooms(rooms, *period)
+
+    if q:
+        rooms = rooms.filter(Q(title__icontains=q) | Q(description__icontains=q) | Q(location__icontains=q))
+    if location:
+        rooms = rooms.filter(location__icontains=location)
+    if min_price:
+        try:
+            rooms = rooms.filter(price__gte=min_price)
+        except (ValueError, TypeError):
+            pass
+    if max_price:
+        try:
+            rooms = rooms.filter(price__lte=max_price)
+        except (ValueError, TypeError):
+            pass
+
+    if sort == 'price_asc':
+        rooms = rooms.order_by('price')
+    elif sort == 'price_desc':
+        rooms = rooms.order_by('-price')
+    else:
+        rooms = rooms.order_by('-created_at')
+
+    fields, description_length = shape
+    return serialize_room_rows(rooms, request, fields, description_length)
+
+@api_view(['GET'])
+def api_room_availability(request):
+    try:
+        period = parse_period(request.GET.get('available_from'), request.GET.get('available_to'),
+                              request.GET.get('months'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if not period:
+        return Response({'error': 'available_from is required'}, status=status.HTTP_400_BAD_REQUEST)
+    start, end = period
+
+    room_id = request.GET.get('room_id')
+    if room_id:
+        if not room_id.isdigit():
+            return Response({'error': 'Invalid room_id'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Room.objects.filter(id=room_id).exists():
+            return Response({'error': 'Room not found'}, status=status.HTTP_404_NOT_FOUND)
+        booked = booked_periods(room_id, start, end)
+        return Response({
+            'room_id': int(room_id),
+            'available_from': start,
+            'available_to': end,
+            'available': not booked,
+            'booked': booked,
+        })
+
+    room_ids = available_rooms(Room.objects.all(), start, end).order_by('id').values_list('id', flat=True)
+    return Response({
+        'available_from': start,
+        'available_to': end,
+        'room_ids': list(room_ids),
+    })
+
+@api_view(['GET', 'POST'])
+@parser_classes([MultiPartParser, FormParser])
+def api_owner_rooms(request):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    if request.method == 'GET':
+        rooms = Room.objects.filter(owner=request.user).order_by('-created_at')
+        return Response(serialize_room_rows(rooms, request))
+
+    data = request.data.copy()
+    serializer = RoomSerializer(data=data, context={'request': request})
+    if serializer.is_valid():
+        room = serializer.save(owner=request.user)
+        return Response(RoomSerializer(room, context={'request': request}).data, status=status.HTTP_201_CREATED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@parser_classes([MultiPartParser, FormParser])
+def api_owner_room_detail(request, room_id):
+    if not request.user.is_authenticated:
+        return Response({'error': 'Login required'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not _can_manage_as_staff(request.user):
+        return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        room = Room.objects.get(id=room_id, owner=request.user)
+    except Room.DoesNotExist:
+        return Response({'error': 'Room not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        return Response(RoomSerializer(room, context={'request': request}).data)
+
+    if request.method == 'DELETE':
+        room.delete()
+        return Response({'success': True})
+
+    serializer = RoomSerializer(room, data=request.data, partial=True, context={'request': request})
+    if serializer.is_valid():
+        serializer.save()
+        return Response(serializer.data)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@_cache_only_success
+@cache_control(public=True, max_age=settings.CATALOGUE_MAX_AGE)
+@vary_on_headers('Accept')
+@condition(etag_func=_catalogue_etag, last_modified_func=_catalogue_last_modified)
+@api_view(['GET'])
+@authentication_classes([])
+def api_room_detail(request, room_id):
+    def fill():
+        room = Room.objects.filter(id=room_id).first()
+        return dict(RoomSerializer(room, context={'request': request}).data) if room else None
+
+    key = (catalogue_version()[0], 'room', request.scheme, request.get_host(), room_id)
+    data = cached_call('catalogue', key, fill)
+    if data is None:
+        return Response({'error': 'Room not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(data)
+
+
+@require_safe
+def serve_media(request, path):
+    """Public uploads (room photos) with long-lived caching for content-hashed names"""
+    name = posixpath.normpath(path).lstrip('/')
+    if not any(name.startswith(prefix) for prefix in settings.PUBLIC_MEDIA_PREFIXES):
+        raise Http404
+    try:
+        full_path = default_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    if is_hashed_name(name):
+        cache = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        # Files uploaded before names were hashed can still change in place
+        cache = 'public, no-cache'
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    return serve_file(request, full_path, content_type, storage_name=name, cache_control=cache)
@@ -0,0 +1,17 @@
+from ..models import UserProfile
+
+
+def _can_manage_as_staff(user):
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    if not user.is_staff:
+        return False
+    try:
+        profile = user.profile
+        return profile.staff_approved or True  # Allow all staff users for now
+    except UserProfile.DoesNotExist:
+        return False
+    except:
+        return user.is_staff  # Fallback to staff status if no profile
@@ -11,7 +11,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'roombook.settings')
 django.setup()
 
 # Now test the view directly
-from rooms.views import api_chatbot_message
+from rooms.views.ai import api_chatbot_message
 from django.test import RequestFactory
 from django.contrib.auth.models import User
 from rooms.genai_chatbot import RoomBookChatbot